@@ -7,13 +7,10 @@ import json
 # Custom imports
 from src.config import (
     OCR_CONFIDENCE_THRESHOLD, PARSER_CONFIDENCE_THRESHOLD,
-    VERIFIER_CONFIDENCE_THRESHOLD
+    VERIFIER_CONFIDENCE_THRESHOLD, ENABLE_WARMUP
 )
-from src.input_processing.image_processor import ImageProcessor
-from src.input_processing.audio_processor import AudioProcessor
-from src.rag.knowledge_base import KnowledgeBase
-from src.memory.store import MemoryStore
-from src.orchestration.workflow import MathMentorWorkflow
+from src.orchestration.registry import get_registry
+from src.orchestration.warmup import get_warmup_manager
 
 # Page configuration
 st.set_page_config(
@@ -52,17 +49,71 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
+# Heavy resources are loaded once per process and shared by every session.
+# Warmup loads them (OCR and ASR models included) in the background at
+# startup and keeps the Ollama model resident.
+registry = get_registry()
+warmup = get_warmup_manager()
+if ENABLE_WARMUP:
+    warmup.start()
 if 'workflow' not in st.session_state:
-    st.session_state.workflow = MathMentorWorkflow()
+    st.session_state.workflow = registry.workflow()
 if 'memory_store' not in st.session_state:
-    st.session_state.memory_store = MemoryStore()
-if 'image_processor' not in st.session_state:
-    st.session_state.image_processor = ImageProcessor()
-if 'audio_processor' not in st.session_state:
-    st.session_state.audio_processor = AudioProcessor("base")
+    st.session_state.memory_store = registry.memory_store()
 if 'history' not in st.session_state:
     st.session_state.history = []
 
+STAGE_LABELS = {
+    'guardrail': "Checking input",
+    'parse': "Parsing problem",
+    'route': "Routing",
+    'retrieve': "Retrieving knowledge",
+    'speculate': "Selecting tools",
+    'reuse': "Checking solved problems",
+    'solve': "Solving",
+    'verify': "Verifying",
+    'explain': "Writing explanation"
+}
+
+
+def stream_solve(problem_text, target=None, **kwargs):
+    """Run the workflow, rendering stage progress and streamed tokens as they arrive"""
+    return render_stream(lambda: st.session_state.workflow.solve_stream(problem_text, **kwargs), target)
+
+
+def stream_resume(problem_id, patch, target=None):
+    """Resume a paused problem from its checkpoint, rendering progress like stream_solve"""
+    return render_stream(lambda: st.session_state.workflow.resume_stream(problem_id, patch), target)
+
+
+def render_stream(make_events, target=None):
+    placeholder = (target or st).empty()
+    
+    async def consume():
+        result = None
+        with placeholder.container():
+            status = st.status("Processing...", expanded=True)
+            token_boxes, streamed = {}, {}
+            async for event in make_events():
+                stage = event.get('stage')
+                if event['type'] == 'stage_started' and stage in STAGE_LABELS:
+                    status.update(label=f"{STAGE_LABELS[stage]}...")
+                elif event['type'] == 'stage_finished' and stage in STAGE_LABELS:
+                    status.write(f"✓ {STAGE_LABELS[stage]} ({event['duration']:.1f}s)")
+                elif event['type'] == 'token':
+                    if stage not in token_boxes:
+                        st.markdown(f"**{STAGE_LABELS.get(stage, stage)}**")
+                        token_boxes[stage] = st.empty()
+                    streamed[stage] = streamed.get(stage, '') + event['text']
+                    token_boxes[stage].markdown(streamed[stage])
+                elif event['type'] == 'result':
+                    result = event['result']
+        return result
+    
+    result = asyncio.run(consume())
+    placeholder.empty()
+    return result
+
 # Main header
 st.markdown("# 📐 Math Mentor", unsafe_allow_html=True)
 st.markdown("**AI-Powered Mathematics Tutoring System** - JEE Ready")
@@ -99,6 +150,64 @@ with st.sidebar:
     
     st.divider()
     
+    # Stage latency from persisted traces
+    with st.expander("⏱️ Stage Latency (last hour)"):
+        latency = st.session_state.workflow.latency_report(window_minutes=60)
+        if latency:
+            st.dataframe(
+                [
+                    {'stage': name, 'n': r['count'], 'p50 (s)': round(r['p50'], 2),
+                     'p95 (s)': round(r['p95'], 2), 'p99 (s)': round(r['p99'], 2)}
+                    for name, r in sorted(latency.items(), key=lambda item: -item[1]['p95'])
+                ],
+                hide_index=True
+            )
+        else:
+            st.caption("No traces recorded yet.")
+        cache = st.session_state.workflow.result_cache
+        if cache:
+            st.caption(f"Result cache: {cache.stats['hits']} hits / {cache.stats['misses']} misses")
+        queue = st.session_state.workflow.llm.limiter.metrics()
+        st.caption(
+            f"LLM queue: {queue['active']}/{queue['max_concurrency']} active, {queue['waiting']} waiting, "
+            f"p95 wait {queue['wait_p95']:.2f}s, {queue['rejected']} rejected"
+        )
+        llm_cache = st.session_state.workflow.llm.cache
+        if llm_cache:
+            st.caption(f"LLM cache: {llm_cache.stats['hits']} hits / {llm_cache.stats['misses']} misses")
+        kb_searches = st.session_state.workflow.kb.search_stats
+        st.caption(
+            f"KB search: {kb_searches['lexical']} lexical-only, {kb_searches['hybrid']} hybrid, "
+            f"{kb_searches['dense']} dense"
+        )
+        embedding_cache = registry.embeddings().stats
+        st.caption(f"Embedding cache: {embedding_cache['hits']} hits / {embedding_cache['misses']} misses")
+        reuse = st.session_state.workflow.memory_reuse_agent
+        if reuse:
+            st.caption(f"Memory reuse: {reuse.stats['reused']} of {reuse.stats['checked']} problems")
+        speculation = st.session_state.workflow.speculation_stats
+        if speculation['started']:
+            st.caption(
+                f"Speculative solving: {speculation['hits']} hits / {speculation['started']} started, "
+                f"{speculation['misses']} misses, {speculation['failed']} failed, "
+                f"{speculation['wasted']} wasted ({speculation['wasted_seconds']:.1f}s)"
+            )
+    
+    # Shared resources
+    with st.expander("🧠 Loaded Models"):
+        for res in registry.report():
+            memory = f"{res['memory_bytes'] / 1024 ** 2:.0f} MB" if res['memory_bytes'] is not None else "n/a"
+            st.markdown(f"**{res['name']}** - {memory}, loaded in {res['load_seconds']:.1f}s")
+        if ENABLE_WARMUP:
+            for component in warmup.readiness():
+                seconds = f" ({component['seconds']:.1f}s)" if 'seconds' in component else ""
+                st.caption(f"{component['name']}: {component['status']}{seconds}")
+        process_memory = registry.process_memory()
+        if process_memory is not None:
+            st.caption(f"Process memory: {process_memory / 1024 ** 2:.0f} MB")
+    
+    st.divider()
+    
     # Features
     st.markdown("### 🎯 Features")
     st.checkbox("✓ Human-in-Loop Review", value=True)
@@ -121,14 +230,14 @@ with col_input:
         
         if st.button("🔍 Solve Problem", key="solve_text", use_container_width=True):
             if problem_text.strip():
-                with st.spinner("Processing..."):
-                    # Process problem
-                    result = asyncio.run(st.session_state.workflow.solve(
-                        problem_text,
-                        input_mode="text"
-                    ))
-                    st.session_state.current_result = result
-                    st.session_state.feedback_given = False
+                # Process problem (streamed into the output column)
+                result = stream_solve(
+                    problem_text,
+                    target=col_output,
+                    input_mode="text"
+                )
+                st.session_state.current_result = result
+                st.session_state.feedback_given = False
             else:
                 st.warning("Please enter a problem")
     
@@ -165,7 +274,7 @@ with col_input:
                         f.write(uploaded_image.getbuffer())
                     
                     # Process image
-                    st.session_state.ocr_result = st.session_state.image_processor.process_image(image_path)
+                    st.session_state.ocr_result = registry.image_processor().process_image(image_path)
             
             # If OCR result exists (persisted in session state)
             if 'ocr_result' in st.session_state and st.session_state.ocr_result:
@@ -179,21 +288,21 @@ with col_input:
                 )
                 
                 if st.button("✅ Confirm & Solve", use_container_width=True):
-                    with st.spinner("Solving..."):
-                        result = asyncio.run(st.session_state.workflow.solve(
-                            extracted_text,
-                            input_mode="image",
-                            ocr_confidence=st.session_state.ocr_result['confidence']
-                        ))
-                        st.session_state.current_result = result
-                        st.session_state.feedback_given = False
-                        # Clear OCR result after solving to reset flow? 
-                        # Or keep it? keeping it allows re-solving.
-                        # But typically we want to show result.
-                        # The result is shown in the main area.
-                        # We might want to clear ocr_result if user uploads a new image?
-                        # Streamlit file uploader key change might handle that, but let's just make it work first.
-                        st.rerun()    
+                    result = stream_solve(
+                        extracted_text,
+                        target=col_output,
+                        input_mode="image",
+                        ocr_confidence=st.session_state.ocr_result['confidence']
+                    )
+                    st.session_state.current_result = result
+                    st.session_state.feedback_given = False
+                    # Clear OCR result after solving to reset flow? 
+                    # Or keep it? keeping it allows re-solving.
+                    # But typically we want to show result.
+                    # The result is shown in the main area.
+                    # We might want to clear ocr_result if user uploads a new image?
+                    # Streamlit file uploader key change might handle that, but let's just make it work first.
+                    st.rerun()    
     elif input_mode == "🎙️ Audio":
         st.markdown("### Provide Audio Input")
         tab_upload, tab_record = st.tabs(["📁 Upload File", "🎙️ Record Voice"])
@@ -240,7 +349,7 @@ with col_input:
                         f.write(audio_file.read())
                     
                     # Process audio
-                    st.session_state.asr_result = st.session_state.audio_processor.process_audio(audio_path)
+                    st.session_state.asr_result = registry.audio_processor().process_audio(audio_path)
             
             # If transcript exists (persisted)
             if 'asr_result' in st.session_state and st.session_state.asr_result:
@@ -253,15 +362,15 @@ with col_input:
                 )
                 
                 if st.button("✅ Confirm & Solve", key="confirm_audio", use_container_width=True):
-                    with st.spinner("Solving..."):
-                        result = asyncio.run(st.session_state.workflow.solve(
-                            transcript,
-                            input_mode="audio",
-                            asr_confidence=st.session_state.asr_result.get('confidence', 0.9)
-                        ))
-                        st.session_state.current_result = result
-                        st.session_state.feedback_given = False
-                        st.rerun()
+                    result = stream_solve(
+                        transcript,
+                        target=col_output,
+                        input_mode="audio",
+                        asr_confidence=st.session_state.asr_result.get('confidence', 0.9)
+                    )
+                    st.session_state.current_result = result
+                    st.session_state.feedback_given = False
+                    st.rerun()
 
 # Output area
 with col_output:
@@ -270,23 +379,28 @@ with col_output:
         
         status = result.get('status', 'completed')
         
+        # --- Backend busy: ask the user to retry ---
+        if status == 'overloaded':
+            st.warning(f"⏳ The model is busy right now. Please try again in about {result.get('retry_after', 5):.0f}s.")
+        
+        elif status == 'timeout':
+            st.error("⌛ This problem took too long to solve. Please try again.")
+        
+        elif status == 'error':
+            st.error(f"❌ Something went wrong: {result.get('error', 'unknown error')}")
+        
         # --- HITL: Ambiguity Handler ---
-        if status == 'needs_clarification':
+        elif status == 'needs_clarification':
             st.warning("🤔 I need a bit more clarity.")
             st.info(result.get('clarification_message', "Could not parse clearly."))
             
             clarification = st.text_input("Please clarify the problem:", key="clarify_input")
             if st.button("Resubmit with Clarification"):
-                with st.spinner("Retrying with clarification..."):
-                    new_text = f"{result.get('problem_text')} {clarification}"
-                    new_result = asyncio.run(st.session_state.workflow.solve(
-                        new_text,
-                        input_mode=result.get('input_mode', 'text'),
-                        input_path=result.get('input_path')
-                    ))
-                    st.session_state.current_result = new_result
-                    st.session_state.feedback_given = False
-                    st.rerun()
+                # Continues from the checkpoint: only parse / route / retrieve onwards re-run
+                new_result = stream_resume(result['id'], {'clarification': clarification})
+                st.session_state.current_result = new_result
+                st.session_state.feedback_given = False
+                st.rerun()
                     
         # --- HITL: Verification Handler ---
         elif status == 'human_review_required':
@@ -299,11 +413,9 @@ with col_output:
             col_approve, col_reject = st.columns(2)
             with col_approve:
                 if st.button("✅ Approve & Learn", use_container_width=True):
-                    # Manual store
-                    result['success'] = True
-                    st.session_state.memory_store.store_solution(result)
+                    # Finishes the paused run (stored in memory like any completed solve)
+                    st.session_state.current_result = stream_resume(result['id'], {'approved': True})
                     st.success("Approved! solution learned.")
-                    st.session_state.current_result['status'] = 'completed'
                     st.session_state.feedback_given = False
                     st.rerun()
             
@@ -322,15 +434,37 @@ with col_output:
             
             with tab_answer:
                 st.markdown(result.get('solution', 'No solution found.'))
+                if result.get('degraded_stages'):
+                    skipped = ", ".join(d['stage'] for d in result['degraded_stages'] if d.get('stage'))
+                    st.caption(f"Shortened to answer in time: {skipped}")
                 if result.get('confidence'):
                     st.metric("Confidence", f"{result['confidence']:.0%}")
             
             with tab_steps:
                 st.subheader("Step-by-Step Explanation")
-                explanation = result.get('explanation', 'No explanation available')
-                st.markdown(explanation)
+                explanation = result.get('explanation')
+                if explanation:
+                    st.markdown(explanation)
+                elif result.get('explanation_pending') or result.get('fast_path_solved'):
+                    # Explanations are generated on request and cached by problem id
+                    if result.get('fast_path_solved'):
+                        st.caption("Solved directly with SymPy.")
+                    if st.button("✨ Explain this solution", key="explain_solution"):
+                        with st.spinner("Writing explanation..."):
+                            result['explanation'] = asyncio.run(st.session_state.workflow.explain(result))
+                        st.rerun()
+                else:
+                    st.markdown('No explanation available')
             
             with tab_trace:
+                fan_out = result.get('trace', {}).get('fan_out')
+                if fan_out:
+                    st.caption(
+                        f"Parallel stages: {fan_out['sequential_seconds']:.2f}s of work "
+                        f"in {fan_out['wall_seconds']:.2f}s ({fan_out['overlap_seconds']:.2f}s overlapped)"
+                    )
+                if result.get('stage_timings'):
+                    st.json(result['stage_timings'], expanded=False)
                 st.json(result.get('agents', {}))
 
             st.divider()
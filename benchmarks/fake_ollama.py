@@ -0,0 +1,302 @@
+"""Stand-in for the Ollama HTTP API, for benchmarks and offline runs.
+
+Implements /api/generate (streaming and non-streaming), /api/tags,
+/api/show and /api/version. Responses come from a script: an ordered list of
+{"match": <regex>, "response": <text>} rules checked against the prompt
+(first match wins). `{problem}` in a response is replaced with the problem
+text quoted in the prompt. The default script answers the prompts of this
+repo's agents with well-formed output.
+
+Latency is modelled as time-to-first-token plus a per-token delay, and at
+most `parallel` requests are generated at once (like OLLAMA_NUM_PARALLEL);
+the rest wait.
+
+    python -m benchmarks.fake_ollama --port 11435 --first-token-ms 150 --per-token-ms 20
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+PROBLEM_PATTERNS = [
+    re.compile(r'INPUT TEXT:\s*"(.*?)"', re.DOTALL),
+    re.compile(r'Problem:\s*"?(.*?)"?\s*\n', re.DOTALL),
+]
+
+DEFAULT_SCRIPT = [
+    {
+        'match': r"data extraction and routing system",
+        'response': json.dumps({
+            'problem_text': "{problem}", 'topic': "algebra", 'subtopic': "equations",
+            'variables': ["x"], 'constraints': [], 'needs_clarification': False,
+            'clarification_message': "", 'clarity_score': 0.95, 'difficulty': "medium",
+            'strategy': "symbolic", 'tools_needed': ["sympy"], 'reasoning': "Symbolic manipulation."
+        }, indent=2)
+    },
+    {
+        'match': r"data extraction system",
+        'response': json.dumps({
+            'problem_text': "{problem}", 'topic': "algebra", 'subtopic': "equations",
+            'variables': ["x"], 'constraints': [], 'needs_clarification': False,
+            'clarification_message': "", 'clarity_score': 0.95
+        }, indent=2)
+    },
+    {
+        'match': r"Analyze this math problem",
+        'response': json.dumps({
+            'topic': "algebra", 'subtopic': "equations", 'difficulty': "medium",
+            'strategy': "symbolic", 'tools_needed': ["sympy"], 'reasoning': "Symbolic manipulation."
+        }, indent=2)
+    },
+    {
+        'match': r"precision math assistant",
+        'response': "NO TOOL"
+    },
+    {
+        'match': r"expert mathematics tutor",
+        'response': (
+            "1. Problem breakdown\nWe restate the problem: {problem}\n\n"
+            "2. Solution strategy\nIsolate the unknown and simplify.\n\n"
+            "3. Step-by-step solution\nStep 1: Collect like terms.\nStep 2: Simplify both sides.\n"
+            "Step 3: Solve for the unknown.\n\n"
+            "4. Verification\nSubstituting back satisfies the original statement.\n\n"
+            "5. Key insights\nKeep the equation balanced at every step."
+        )
+    },
+    {
+        'match': r"Explain this solution",
+        'response': (
+            "Problem Understanding: we are asked to solve {problem}.\n"
+            "Solution Strategy: simplify, then isolate the unknown.\n"
+            "Step-by-Step: each step keeps both sides equal.\n"
+            "Key Concepts: inverse operations.\n"
+            "Why This Works: equal operations on both sides preserve equality.\n"
+            "Related Problems: linear and quadratic equations.\n"
+            "Common Mistakes: sign errors when moving terms."
+        )
+    },
+    {'match': r".", 'response': "OK"},
+]
+
+TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+class FakeOllama:
+    """Scripted responses and latency model shared by all request handlers"""
+
+    def __init__(self, script: Optional[List[Dict]] = None, first_token_ms: float = 100.0,
+                 per_token_ms: float = 10.0, jitter: float = 0.0, parallel: int = 4,
+                 model: str = "qwen2.5:1.5b", seed: Optional[int] = None):
+        self.rules = [(re.compile(rule['match'], re.DOTALL), rule['response']) for rule in (script or DEFAULT_SCRIPT)]
+        self.first_token = first_token_ms / 1000
+        self.per_token = per_token_ms / 1000
+        self.jitter = jitter
+        self.model = model
+        self._slots = threading.BoundedSemaphore(max(1, parallel))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'streamed': 0, 'max_waiting': 0}
+        self._waiting = 0
+
+    def respond(self, prompt: str) -> str:
+        problem = ""
+        for pattern in PROBLEM_PATTERNS:
+            found = pattern.search(prompt)
+            if found:
+                problem = found.group(1).strip()
+                break
+        for pattern, response in self.rules:
+            if pattern.search(prompt):
+                # JSON templates need the problem escaped like any other string value
+                escaped = json.dumps(problem)[1:-1] if response.lstrip().startswith("{") else problem
+                return response.replace("{problem}", escaped)
+        return ""
+
+    def delay(self, seconds: float):
+        if self.jitter:
+            with self._lock:
+                seconds *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def acquire(self):
+        with self._lock:
+            self._waiting += 1
+            self.stats['max_waiting'] = max(self.stats['max_waiting'], self._waiting)
+        self._slots.acquire()
+        with self._lock:
+            self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def make_handler(fake: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload: Dict, status: int = 200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> Dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._send_json({'models': [{'name': fake.model, 'model': fake.model, 'size': 0,
+                                             'modified_at': _timestamp(), 'details': {}}]})
+            elif self.path == "/api/version":
+                self._send_json({'version': "0.0.0-fake"})
+            elif self.path == "/":
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send_json({'error': "not found"}, status=404)
+
+        def do_POST(self):
+            if self.path == "/api/show":
+                self._read_json()
+                self._send_json({'modelfile': "", 'parameters': "", 'template': "", 'details': {}})
+            elif self.path == "/api/generate":
+                self._generate(self._read_json())
+            else:
+                self._send_json({'error': "not found"}, status=404)
+
+        def _generate(self, request: Dict):
+            prompt = request.get('prompt', '')
+            stream = request.get('stream', True)
+            model = request.get('model') or fake.model
+            text = fake.respond(prompt)
+            tokens = TOKEN.findall(text) or [""]
+            counts = {'prompt_eval_count': max(1, len(prompt) // 4), 'eval_count': len(tokens)}
+
+            with fake._lock:
+                fake.stats['requests'] += 1
+                fake.stats['streamed'] += 1 if stream else 0
+
+            fake.acquire()
+            try:
+                started = time.perf_counter()
+                if not stream:
+                    fake.delay(fake.first_token + fake.per_token * len(tokens))
+                    self._send_json({
+                        'model': model, 'created_at': _timestamp(), 'response': text, 'done': True,
+                        'done_reason': "stop", 'context': [],
+                        'total_duration': int((time.perf_counter() - started) * 1e9), **counts
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                fake.delay(fake.first_token)
+                for token in tokens:
+                    self._write_chunk({'model': model, 'created_at': _timestamp(), 'response': token, 'done': False})
+                    fake.delay(fake.per_token)
+                self._write_chunk({
+                    'model': model, 'created_at': _timestamp(), 'response': "", 'done': True,
+                    'done_reason': "stop", 'context': [],
+                    'total_duration': int((time.perf_counter() - started) * 1e9), **counts
+                })
+                self.wfile.write(b"0\r\n\r\n")
+            finally:
+                fake.release()
+
+        def _write_chunk(self, payload: Dict):
+            line = (json.dumps(payload) + "\n").encode('utf-8')
+            self.wfile.write(f"{len(line):X}\r\n".encode('ascii') + line + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+class FakeOllamaServer:
+    """Run a FakeOllama HTTP server on a background thread"""
+
+    def __init__(self, fake: Optional[FakeOllama] = None, host: str = "127.0.0.1", port: int = 0):
+        self.fake = fake or FakeOllama()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.fake))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeOllamaServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--first-token-ms", type=float, default=100.0, help="Time to first token")
+    parser.add_argument("--per-token-ms", type=float, default=10.0, help="Delay between tokens")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative latency jitter, e.g. 0.2")
+    parser.add_argument("--parallel", type=int, default=4, help="Requests generated at once")
+    parser.add_argument("--script", help="JSON file with [{'match': regex, 'response': text}, ...]")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def fake_from_args(args: argparse.Namespace) -> FakeOllama:
+    script = None
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+    return FakeOllama(script=script, first_token_ms=args.first_token_ms, per_token_ms=args.per_token_ms,
+                      jitter=args.jitter, parallel=args.parallel, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(fake_from_args(args), host=args.host, port=args.port)
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
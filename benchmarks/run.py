@@ -0,0 +1,221 @@
+"""End-to-end latency benchmark for MathMentorWorkflow.solve.
+
+Drives the full graph (embeddings, vector search, SymPy, agents) against a
+fake Ollama server so model latency is fixed and our own overhead is
+visible. For each concurrency level it reports end-to-end and per-stage
+p50/p95/p99 and throughput, and compares them with a stored baseline.
+
+    python -m benchmarks.run                            # 1/4/16/64, diff against benchmarks/baseline.json
+    python -m benchmarks.run --concurrency 1 4 --save-baseline
+    python -m benchmarks.run --ollama-url http://localhost:11434   # real model instead of the fake
+    python -m benchmarks.run --no-compare               # just report
+
+Latencies depend on the machine, so no baseline is committed: record one
+with --save-baseline first. Without a baseline (and without --save-baseline
+or --no-compare) the run stops with status 2 before benchmarking. Exits with
+status 1 when a metric regresses by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.fake_ollama import FakeOllamaServer, add_latency_arguments, fake_from_args
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_CORPUS = BENCH_DIR / "corpus.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def configure_environment(args: argparse.Namespace, ollama_url: str, data_dir: Path):
+    """Point the app at the benchmark backend and scratch databases (before src.config is imported)"""
+    source_chroma = Path(os.getenv("CHROMA_DB_PATH", "./data/chroma_db"))
+    if source_chroma.exists():
+        # Work on a copy: solved problems are written back to the vector store
+        shutil.copytree(source_chroma, data_dir / "chroma_db")
+    source_index = Path(os.getenv("VECTOR_INDEX_PATH", "./data/vector_index"))
+    if source_index.exists():
+        shutil.copytree(source_index, data_dir / "vector_index")
+
+    os.environ.update({
+        'OLLAMA_BASE_URL': ollama_url,
+        'CHROMA_DB_PATH': str(data_dir / "chroma_db"),
+        'VECTOR_INDEX_PATH': str(data_dir / "vector_index"),
+        'MEMORY_DB_PATH': str(data_dir / "memory.db"),
+        'LLM_CACHE_PATH': str(data_dir / "llm_cache.db"),
+        # Measure the pipeline, not the caches, unless asked to
+        'ENABLE_RESULT_CACHE': "true" if args.with_caches else "false",
+        'ENABLE_LLM_CACHE': "true" if args.with_caches else "false",
+        # Queue instead of rejecting: the benchmark measures queueing too
+        'OLLAMA_MAX_QUEUE': str(max(1024, max(args.concurrency) * 16)),
+        'REQUEST_DEADLINE_SECONDS': "0",
+    })
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    from src.utils.tracing import percentile
+
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'p50': round(percentile(ordered, 50), 4),
+        'p95': round(percentile(ordered, 95), 4),
+        'p99': round(percentile(ordered, 99), 4),
+        'mean': round(sum(ordered) / len(ordered), 4) if ordered else 0.0
+    }
+
+
+async def run_level(workflow, problems: List[str], concurrency: int) -> Dict:
+    """Solve `problems` with `concurrency` interactive solves in flight"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for problem in problems:
+        queue.put_nowait(problem)
+
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+
+    async def worker():
+        while not queue.empty():
+            problem = queue.get_nowait()
+            started = time.perf_counter()
+            result = await workflow.solve(problem, deadline=None)
+            latencies.append(time.perf_counter() - started)
+            statuses[result.get('status', 'unknown')] = statuses.get(result.get('status', 'unknown'), 0) + 1
+            for stage, timing in result.get('stage_timings', {}).items():
+                stages.setdefault(stage, []).append(timing['duration'])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(problems),
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(problems) / wall, 3) if wall > 0 else 0.0,
+        'end_to_end': summarize(latencies),
+        'stages': {stage: summarize(values) for stage, values in sorted(stages.items())},
+        'statuses': statuses
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Human-readable diff lines; regressions beyond `tolerance` are marked with '!'"""
+    lines = []
+
+    def line(label: str, now: float, before: float, higher_is_better: bool = False):
+        if not before:
+            return
+        change = (now - before) / before
+        worse = -change if higher_is_better else change
+        mark = "!" if worse > tolerance else " "
+        lines.append(f"{mark} {label:<32} {before:>9.3f} -> {now:>9.3f}  ({change:+.1%})")
+
+    for level, result in current.items():
+        previous = baseline.get(level)
+        if not previous:
+            continue
+        line(f"c={level} throughput (req/s)", result['throughput_rps'], previous['throughput_rps'], True)
+        for pct in ('p50', 'p95', 'p99'):
+            line(f"c={level} end-to-end {pct} (s)", result['end_to_end'][pct], previous['end_to_end'][pct])
+        for stage, stats in result['stages'].items():
+            before = previous['stages'].get(stage)
+            if before:
+                line(f"c={level} {stage} p95 (s)", stats['p95'], before['p95'])
+    return lines
+
+
+def print_report(results: Dict[str, Dict]):
+    for level, result in results.items():
+        e2e = result['end_to_end']
+        print(f"\n== concurrency {level}: {result['requests']} requests in {result['wall_seconds']:.2f}s "
+              f"({result['throughput_rps']:.2f} req/s) statuses={result['statuses']}")
+        print(f"   {'stage':<12} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+        print(f"   {'end_to_end':<12} {e2e['count']:>5} {e2e['p50']:>8.3f} {e2e['p95']:>8.3f} {e2e['p99']:>8.3f}")
+        for stage, stats in result['stages'].items():
+            print(f"   {stage:<12} {stats['count']:>5} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f}")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    from src.orchestration.workflow import MathMentorWorkflow
+
+    with open(args.corpus, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    workflow = MathMentorWorkflow()
+    # Warm up models and connections so the first level isn't penalized
+    await workflow.solve(corpus[0], deadline=None)
+
+    results = {}
+    for concurrency in args.concurrency:
+        count = max(args.requests or len(corpus), concurrency * args.rounds)
+        problems = [corpus[i % len(corpus)] for i in range(count)]
+        results[str(concurrency)] = await run_level(workflow, problems, concurrency)
+
+    if workflow.trace_recorder:
+        workflow.trace_recorder.flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MathMentorWorkflow latency benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--requests", type=int, default=None, help="Requests per level (default: corpus size)")
+    parser.add_argument("--rounds", type=int, default=2, help="At least this many requests per worker")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--no-compare", action="store_true", help="Report only, without a baseline")
+    parser.add_argument("--output", help="Also write results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    parser.add_argument("--with-caches", action="store_true", help="Keep the result and LLM caches enabled")
+    parser.add_argument("--ollama-url", help="Use this Ollama server instead of the fake one")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    if not (args.no_compare or args.save_baseline or baseline_path.exists()):
+        print(f"No baseline at {baseline_path}: record one with --save-baseline, or pass --no-compare",
+              file=sys.stderr)
+        sys.exit(2)
+
+    server = None if args.ollama_url else FakeOllamaServer(fake_from_args(args)).start()
+    data_dir = Path(tempfile.mkdtemp(prefix="mathmentor-bench-"))
+    try:
+        configure_environment(args, args.ollama_url or server.url, data_dir)
+        results = asyncio.run(run(args))
+    finally:
+        if server:
+            server.stop()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    regressions = 0
+    if not args.no_compare and baseline_path.exists():
+        diff = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+        if diff:
+            print(f"\n== vs baseline {baseline_path} (tolerance {args.tolerance:.0%})")
+            print("\n".join(diff))
+        regressions = sum(1 for line in diff if line.startswith("!"))
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved baseline to {baseline_path}")
+    elif regressions:
+        print(f"\n{regressions} metric(s) regressed beyond {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
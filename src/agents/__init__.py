@@ -9,6 +9,9 @@ from src.agents.explainer_agent import ExplainerAgent
 from src.agents.guardrail_agent import GuardrailAgent
 from src.agents.evaluator_agent import EvaluatorAgent
 from src.agents.web_search_agent import WebSearchAgent
+from src.agents.fast_path_agent import FastPathAgent
+from src.agents.parse_route_agent import ParseRouteAgent
+from src.agents.memory_reuse_agent import MemoryReuseAgent
 
 __all__ = [
     'BaseAgent',
@@ -19,5 +22,8 @@ __all__ = [
     'ExplainerAgent',
     'GuardrailAgent',
     'EvaluatorAgent',
-    'WebSearchAgent'
+    'WebSearchAgent',
+    'FastPathAgent',
+    'ParseRouteAgent',
+    'MemoryReuseAgent'
 ]
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any
+from src.utils.events import emit_event, is_streaming, TOKEN
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,3 +26,14 @@ class BaseAgent(ABC):
             'confidence': confidence,
             'error': None if success else data.get('error', 'Unknown error')
         }
+
+    async def _generate(self, prompt: str) -> str:
+        """Call `self.llm`, streaming tokens to the workflow's event sink when one is active"""
+        if not is_streaming():
+            return await self.llm.ainvoke(prompt)
+        
+        chunks = []
+        async for chunk in self.llm.astream(prompt):
+            chunks.append(chunk)
+            emit_event(TOKEN, text=chunk)
+        return "".join(chunks)
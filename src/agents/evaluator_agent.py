@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from langchain_ollama import OllamaLLM
+from src.llm.client import LLMClient
 from src.agents.base_agent import BaseAgent
 import json
 import logging
@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 class EvaluatorAgent(BaseAgent):
     """Self-assessment and improvement suggestions"""
     
-    def __init__(self, llm: OllamaLLM):
+    def __init__(self, llm: LLMClient):
         super().__init__("evaluator")
         self.llm = llm
     
@@ -35,7 +35,7 @@ Rate and provide:
 
 Format as JSON."""
             
-            response = self.llm.invoke(prompt)
+            response = await self.llm.ainvoke(prompt)
             
             try:
                 evaluation = json.loads(response)
@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from langchain_ollama import OllamaLLM
+from src.llm.client import LLMClient
 from src.agents.base_agent import BaseAgent
 import logging
 
@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 class ExplainerAgent(BaseAgent):
     """Generate student-friendly explanations"""
     
-    def __init__(self, llm: OllamaLLM):
+    def __init__(self, llm: LLMClient):
         super().__init__("explainer")
         self.llm = llm
     
@@ -17,12 +17,13 @@ class ExplainerAgent(BaseAgent):
         
         try:
             problem = solution.get('problem', {})
+            problem_text = problem.get('problem_text') or solution.get('problem_text', '')
             answer = solution.get('answer', '')
             steps = solution.get('steps', [])
             
             prompt = f"""Explain this solution to a student in simple terms.
 
-Problem: {problem.get('problem_text', '')}
+Problem: {problem_text}
 Answer: {answer}
 
 Create a clear explanation with:
@@ -34,7 +35,7 @@ Create a clear explanation with:
 6. Related Problems - Similar problem types
 7. Common Mistakes - What to avoid"""
             
-            explanation = self.llm.invoke(prompt)
+            explanation = await self._generate(prompt)
             
             return self.format_output(
                 success=True,
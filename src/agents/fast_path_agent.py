@@ -0,0 +1,169 @@
+import asyncio
+import re
+from typing import Dict, Any, List, Optional
+from src.agents.base_agent import BaseAgent
+from src.config import FAST_PATH_TIMEOUT_SECONDS
+from src.utils.math_tools import (
+    clean_equation, parse_equation, solve_equation, evaluate_arithmetic, has_bounded_powers, run_sympy,
+    MAX_EXPONENT
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Instruction phrases that don't change the math ("What is 123*456?")
+LEAD_IN = re.compile(
+    r"^(?:please\s+)?(?:"
+    r"what\s+is|what's|calculate|compute|evaluate|find\s+the\s+value\s+of|"
+    r"find\s+[a-z]\s*[:,]|"
+    r"solve(?:\s+the\s+equation)?(?:\s+for\s+[a-z])?\s*[:,]?"
+    r")\s*"
+)
+TRAILING_PUNCTUATION = re.compile(r"[?.!]+\s*$")
+MATH_ONLY = re.compile(r"^[0-9a-z+\-*/().=\s]+$")
+
+MAX_INPUT_LENGTH = 200
+MAX_SOLUTION_LENGTH = 120
+MAX_EQUATION_DEGREE = 6  # Higher powers go to the LLM solver rather than SymPy's general solver
+
+
+class FastPathAgent(BaseAgent):
+    """Solve plain equations and arithmetic directly with SymPy (no LLM).
+
+    Only inputs that are pure math after stripping instruction phrases are
+    accepted: a single-variable equation or an arithmetic expression.
+    Anything else is reported as not matched and goes through the full
+    LLM pipeline, as are equations without a real solution. Arithmetic
+    uses the bounded AST evaluator. Equations reach SymPy only if their
+    expanded degree is at most MAX_EQUATION_DEGREE (has_bounded_powers);
+    SymPy then runs on the SymPy worker pool under FAST_PATH_TIMEOUT_SECONDS
+    so it never blocks the event loop.
+    """
+
+    def __init__(self):
+        super().__init__("fast_path")
+
+    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Try to solve the problem deterministically"""
+
+        try:
+            expression = self.extract_expression(input_data.get('problem_text', ''))
+            if expression is None:
+                return self.format_output(success=True, data={'matched': False}, confidence=0.0)
+
+            if "=" in expression:
+                data = await run_sympy(self._solve_equation, expression, timeout=FAST_PATH_TIMEOUT_SECONDS)
+            else:
+                data = self._evaluate(expression)
+
+            if data is None:
+                return self.format_output(success=True, data={'matched': False}, confidence=0.0)
+
+            data['solution'] = self._render(data['answer'], data['steps'])
+            return self.format_output(success=True, data=data, confidence=1.0 if data['verified'] else 0.8)
+
+        except asyncio.TimeoutError:
+            logger.info(f"Fast path gave up after {FAST_PATH_TIMEOUT_SECONDS}s")
+            return self.format_output(success=True, data={'matched': False, 'reason': 'timeout'}, confidence=0.0)
+
+        except Exception as e:
+            # Anything SymPy can't handle falls back to the LLM pipeline
+            logger.debug(f"Fast path skipped: {str(e)}")
+            return self.format_output(success=True, data={'matched': False, 'reason': str(e)}, confidence=0.0)
+
+    def extract_expression(self, text: str) -> Optional[str]:
+        """Return the bare math expression if `text` is directly solvable, else None"""
+        if not text or len(text) > MAX_INPUT_LENGTH:
+            return None
+
+        expression = LEAD_IN.sub("", text.strip().lower(), count=1)
+        expression = TRAILING_PUNCTUATION.sub("", expression)
+        for symbol, replacement in (("×", "*"), ("·", "*"), ("÷", "/"), ("−", "-"), ("^", "**")):
+            expression = expression.replace(symbol, replacement)
+        expression = clean_equation(expression)
+
+        if not expression or not MATH_ONLY.match(expression) or not re.search(r"\d", expression):
+            return None
+        if expression.count("=") > 1:
+            return None
+
+        # Only single-letter variables, and at most one of them (no words)
+        names = set(re.findall(r"[a-z]+", expression))
+        if any(len(name) > 1 for name in names) or len(names) > 1:
+            return None
+        # Equations need a variable; arithmetic must not have one
+        if ("=" in expression) != bool(names):
+            return None
+        # Small literal exponents and low degree only: 2**10 yes, 9**(99*99), x**50 and (x**3)**3 no
+        if not has_bounded_powers(expression, MAX_EQUATION_DEGREE if names else MAX_EXPONENT):
+            return None
+
+        return expression
+
+    def _solve_equation(self, expression: str) -> Optional[Dict]:
+        from sympy import expand, simplify, degree
+
+        variables, solutions = solve_equation(expression)
+        if len(variables) != 1 or not solutions:
+            return None
+        # Complex roots (x^2 + 1 = 0) deserve an explanation, not a terse fast-path answer
+        if any(sol.is_real is not True for sol in solutions):
+            return None
+        variable = variables[0]
+        if any(len(str(sol)) > MAX_SOLUTION_LENGTH for sol in solutions):
+            return None
+
+        lhs, rhs = parse_equation(expression)
+        moved = expand(lhs - rhs)
+        verified = all(simplify(moved.subs(variable, sol)) == 0 for sol in solutions)
+        answer = " or ".join(f"{variable} = {sol}" for sol in solutions)
+
+        try:
+            order = degree(moved, variable)
+        except Exception:
+            order = None
+        subtopic = {1: 'linear_equations', 2: 'quadratic_equations'}.get(order, 'polynomials')
+
+        steps = [
+            {'step': 1, 'description': "Write the equation", 'result': f"{lhs} = {rhs}"},
+            {'step': 2, 'description': "Move every term to one side", 'result': f"{moved} = 0"},
+            {'step': 3, 'description': f"Solve for {variable} (SymPy)", 'result': answer},
+            {'step': 4, 'description': "Check by substituting back into the equation",
+             'result': "Both sides agree" if verified else "Substitution check inconclusive"}
+        ]
+        return {
+            'matched': True,
+            'kind': 'equation',
+            'expression': expression,
+            'topic': 'algebra',
+            'subtopic': subtopic,
+            'answer': answer,
+            'steps': steps,
+            'verified': verified
+        }
+
+    def _evaluate(self, expression: str) -> Optional[Dict]:
+        value = evaluate_arithmetic(expression)
+        if isinstance(value, float):
+            value = int(value) if value.is_integer() else float(f"{value:.10g}")
+        answer = str(value)
+
+        steps = [
+            {'step': 1, 'description': "Evaluate the expression", 'result': f"{expression} = {answer}"}
+        ]
+        return {
+            'matched': True,
+            'kind': 'arithmetic',
+            'expression': expression,
+            'topic': 'algebra',
+            'subtopic': 'arithmetic',
+            'answer': answer,
+            'steps': steps,
+            'verified': True
+        }
+
+    def _render(self, answer: str, steps: List[Dict]) -> str:
+        lines = [f"**Answer:** {answer}", "", "**Steps:**"]
+        for step in steps:
+            lines.append(f"{step['step']}. {step['description']}: `{step['result']}`")
+        return "\n".join(lines)
@@ -1,11 +1,60 @@
-import json
 import logging
 from typing import Dict, Any
 
 from src.agents.base_agent import BaseAgent
+from src.utils.json_parsing import parse_llm_json
+from src.config import SUPPORTED_TOPICS
 
 logger = logging.getLogger(__name__)
 
+# Fields of a routing decision: {field: (type, default)}
+# topic and topic_confidence have no usable default, so a reply without them is recognizable
+ROUTER_SCHEMA = {
+    "topic": (str, ""),
+    "topic_confidence": (float, None),
+    "subtopic": (str, "general"),
+    "difficulty": (str, "medium"),
+    "strategy": (str, "symbolic"),
+    "tools_needed": (list, ["sympy"]),
+    "reasoning": (str, ""),
+}
+
+# Routing used when the LLM response can't be decoded
+ROUTER_FALLBACK = {
+    "topic": "algebra",
+    "subtopic": "general",
+    "difficulty": "medium",
+    "strategy": "symbolic",
+    "tools_needed": ["sympy"],
+    "reasoning": "Defaulting to symbolic solver due to router parsing error."
+}
+
+
+DEFAULT_TOPIC = ROUTER_FALLBACK["topic"]
+UNTRUSTED_ROUTING_CONFIDENCE = 0.3
+UNRATED_ROUTING_CONFIDENCE = 0.5
+
+
+def routing_confidence(routing: Dict[str, Any], decoded: bool) -> float:
+    """Trust in the routed topic, from the model's own `topic_confidence`.
+
+    Low for the fallback routing and for a missing or unsupported topic (it
+    would be defaulted or invented); middling when the model gave no rating.
+    """
+    if not decoded or routing.get("topic") not in SUPPORTED_TOPICS:
+        return UNTRUSTED_ROUTING_CONFIDENCE
+    rated = routing.get("topic_confidence")
+    if rated is None:
+        return UNRATED_ROUTING_CONFIDENCE
+    return min(max(rated, 0.0), 1.0)
+
+
+def finalize_routing(routing: Dict[str, Any], decoded: bool) -> Dict[str, Any]:
+    """Score the routing, then fill in the default topic if the model gave none"""
+    routing["confidence"] = routing_confidence(routing, decoded)
+    routing["topic"] = routing.get("topic") or DEFAULT_TOPIC
+    return routing
+
 
 class IntentRouterAgent(BaseAgent):
     """Route problem to appropriate solver strategy."""
@@ -31,6 +80,7 @@ Problem:
 Respond in JSON:
 {{
   "topic": "algebra/probability/calculus/linear_algebra",
+  "topic_confidence": 0.0-1.0 (how sure you are of the topic),
   "subtopic": "exact subtopic",
   "difficulty": "easy/medium/hard",
   "strategy": "symbolic/numerical/graphical/heuristic",
@@ -40,42 +90,18 @@ Respond in JSON:
 """.strip()
 
         try:
-            response = self.llm.invoke(prompt)
-
-            # --- Robust JSON Extraction ---
-            clean_response = response.strip()
-            # Remove markdown code blocks if present
-            if "```" in clean_response:
-                clean_response = clean_response.split("```")[-2] # take content between fences
-                if clean_response.startswith("json"):
-                    clean_response = clean_response[4:]
-            
-            # Find JSON brackets bounds
-            start_idx = clean_response.find("{")
-            end_idx = clean_response.rfind("}")
-            
-            if start_idx != -1 and end_idx != -1:
-                clean_response = clean_response[start_idx:end_idx+1]
-            # -----------------------------
-
-            try:
-                routing = json.loads(clean_response)
-            except json.JSONDecodeError:
+            response = await self.llm.ainvoke(prompt)
+
+            routing, ok = parse_llm_json(response, ROUTER_SCHEMA)
+            if not ok:
                 logger.warning(f"Router JSON Error. Raw: {response}")
-                # Fallback defaults
-                routing = {
-                    "topic": "algebra",
-                    "subtopic": "general",
-                    "difficulty": "medium",
-                    "strategy": "symbolic",
-                    "tools_needed": ["sympy"],
-                    "reasoning": "Defaulting to symbolic solver due to router parsing error."
-                }
+                routing = dict(ROUTER_FALLBACK, tools_needed=list(ROUTER_FALLBACK["tools_needed"]))
+            finalize_routing(routing, ok)
 
             return self.format_output(
                 success=True,
                 data=routing,
-                confidence=0.9,
+                confidence=routing["confidence"],
             )
 
         except Exception as e:
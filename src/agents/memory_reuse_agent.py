@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, Any, Optional
+from src.agents.base_agent import BaseAgent
+from src.utils.math_tools import structure_signature, check_solution, run_sympy
+from src.config import MEMORY_REUSE_THRESHOLD, MEMORY_REUSE_VERIFY, MEMORY_REUSE_TIMEOUT_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryReuseAgent(BaseAgent):
+    """Answer from memory when a verified near-duplicate was solved before (no LLM).
+
+    The best memory hit is reused only if its similarity is at least
+    `threshold`, the user marked it correct, and its math has the same
+    structure as the new problem. With `verify`, equation answers are
+    re-checked by SymPy substitution first. Both SymPy checks run on the
+    SymPy worker pool under `timeout` so they never block the event loop.
+    """
+
+    def __init__(self, threshold: float = MEMORY_REUSE_THRESHOLD, verify: bool = MEMORY_REUSE_VERIFY,
+                 timeout: float = MEMORY_REUSE_TIMEOUT_SECONDS):
+        super().__init__("memory_reuse")
+        self.threshold = threshold
+        self.verify = verify
+        self.timeout = timeout
+        self.stats = {
+            'checked': 0,
+            'reused': 0,
+            'no_match': 0,
+            'not_confirmed': 0,
+            'structure_mismatch': 0,
+            'verification_failed': 0,
+            'timeout': 0
+        }
+
+    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Look for a reusable solution among the retrieved examples"""
+
+        self.stats['checked'] += 1
+        try:
+            retrieval = input_data.get('retrieval')
+            examples = retrieval.examples if retrieval else []
+            problem_text = input_data.get('problem_text', '')
+
+            best = max(examples, key=lambda e: e.get('similarity', 0.0), default=None)
+            reason = await self._reject_reason(problem_text, best)
+            if reason:
+                self.stats[reason] += 1
+                return self.format_output(success=True, data={'matched': False, 'reason': reason}, confidence=0.0)
+
+            verified = None
+            if self.verify:
+                verified = await run_sympy(check_solution, problem_text, best.get('answer', ''), timeout=self.timeout)
+            if verified is False:
+                self.stats['verification_failed'] += 1
+                return self.format_output(
+                    success=True, data={'matched': False, 'reason': 'verification_failed'}, confidence=0.0
+                )
+
+            self.stats['reused'] += 1
+            return self.format_output(
+                success=True,
+                data={
+                    'matched': True,
+                    'source_id': best.get('id'),
+                    'similarity': best.get('similarity'),
+                    'solution': best.get('solution', ''),
+                    'answer': best.get('answer', ''),
+                    'verified': verified
+                },
+                confidence=best.get('confidence') or 0.9
+            )
+
+        except asyncio.TimeoutError:
+            logger.info(f"Memory reuse check gave up after {self.timeout:g}s")
+            self.stats['timeout'] += 1
+            return self.format_output(success=True, data={'matched': False, 'reason': 'timeout'}, confidence=0.0)
+
+        except Exception as e:
+            # Reuse is only a shortcut; the full pipeline still runs
+            logger.error(f"Memory reuse error: {str(e)}")
+            return self.format_output(success=True, data={'matched': False, 'reason': str(e)}, confidence=0.0)
+
+    async def _reject_reason(self, problem_text: str, best: Optional[Dict]) -> Optional[str]:
+        if not best or best.get('similarity', 0.0) < self.threshold:
+            return 'no_match'
+        if best.get('feedback') != 'correct':
+            return 'not_confirmed'
+        signature = await run_sympy(structure_signature, problem_text, timeout=self.timeout)
+        if signature is None or signature != await run_sympy(
+            structure_signature, best.get('problem', ''), timeout=self.timeout
+        ):
+            return 'structure_mismatch'
+        return None
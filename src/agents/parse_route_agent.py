@@ -0,0 +1,89 @@
+import logging
+from typing import Dict, Any
+
+from src.agents.base_agent import BaseAgent
+from src.agents.parser_agent import PARSER_SCHEMA, parser_fallback, apply_clarity_rules
+from src.agents.intent_router import ROUTER_SCHEMA, ROUTER_FALLBACK, finalize_routing
+from src.utils.json_parsing import parse_llm_json
+
+logger = logging.getLogger(__name__)
+
+# Union of the parser and router fields (topic/subtopic are shared)
+PARSE_ROUTE_SCHEMA = {**PARSER_SCHEMA, **ROUTER_SCHEMA}
+
+
+class ParseRouteAgent(BaseAgent):
+    """Parse and route a problem with a single LLM call.
+
+    Produces the same `parsed` and `routing` structures as ParserAgent and
+    IntentRouterAgent, saving one round-trip and one prompt prefill.
+    """
+
+    def __init__(self, llm):
+        super().__init__("parse_route")
+        self.llm = llm
+
+    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse problem into structured format and pick a solving strategy."""
+
+        raw_text = input_data.get("problem_text", "")
+
+        prompt = f"""
+You are a data extraction and routing system for math problems.
+
+INPUT TEXT:
+"{raw_text}"
+
+INSTRUCTIONS:
+1. "problem_text" must contain the EXACT content of INPUT TEXT. Do not paraphrase.
+2. Assign a "clarity_score" between 0.0 and 1.0 (1.0 = perfectly clear).
+3. Classify the topic, difficulty and recommended solving strategy.
+
+Respond in JSON:
+{{
+  "problem_text": "...",
+  "topic": "algebra/probability/calculus/linear_algebra",
+  "topic_confidence": 0.0-1.0 (how sure you are of the topic),
+  "subtopic": "exact subtopic",
+  "variables": [],
+  "constraints": [],
+  "needs_clarification": false,
+  "clarification_message": "",
+  "clarity_score": 0.95,
+  "difficulty": "easy/medium/hard",
+  "strategy": "symbolic/numerical/graphical/heuristic",
+  "tools_needed": ["sympy", "numpy"],
+  "reasoning": "why this strategy"
+}}
+""".strip()
+
+        try:
+            response = await self.llm.ainvoke(prompt)
+
+            combined, ok = parse_llm_json(response, PARSE_ROUTE_SCHEMA)
+            if ok:
+                parsed = {field: combined[field] for field in PARSER_SCHEMA}
+                routing = {field: combined[field] for field in ROUTER_SCHEMA}
+            else:
+                logger.warning(f"Parse/route JSON Error. Raw: {response}")
+                parsed = parser_fallback(raw_text)
+                routing = dict(ROUTER_FALLBACK, tools_needed=list(ROUTER_FALLBACK["tools_needed"]))
+            finalize_routing(routing, ok)
+            # A reply without a topic leaves it empty in the schema; use the routed default
+            parsed["topic"] = parsed.get("topic") or routing["topic"]
+
+            apply_clarity_rules(parsed)
+
+            return self.format_output(
+                success=True,
+                data={'parsed': parsed, 'routing': routing},
+                confidence=parsed.get("clarity_score", 0.5),
+            )
+
+        except Exception as e:
+            logger.exception("Parse/route error")
+            return self.format_output(
+                success=False,
+                data={"error": str(e)},
+                confidence=0.0,
+            )
@@ -1,11 +1,52 @@
-import json
 import logging
 from typing import Dict, Any
 
 from src.agents.base_agent import BaseAgent
+from src.utils.json_parsing import parse_llm_json
 
 logger = logging.getLogger(__name__)
 
+# Fields of a parsed problem: {field: (type, default)}
+PARSER_SCHEMA = {
+    "problem_text": (str, ""),
+    "topic": (str, "algebra"),
+    "subtopic": (str, "general"),
+    "variables": (list, []),
+    "constraints": (list, []),
+    "needs_clarification": (bool, False),
+    "clarification_message": (str, ""),
+    "clarity_score": (float, 0.5),
+}
+
+
+def parser_fallback(raw_text: str) -> Dict[str, Any]:
+    """Parsed problem used when the LLM response can't be decoded"""
+    # Assume the raw input IS the problem. Do NOT block user.
+    return {
+        "problem_text": raw_text,
+        "topic": "algebra", # default assumption
+        "subtopic": "general",
+        "variables": [],
+        "constraints": [],
+        "clarity_score": 0.9, # assume high to bypass check
+        "needs_clarification": False,
+        "clarification_message": "",
+    }
+
+
+def apply_clarity_rules(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Flag parsed problems that need human clarification"""
+    # Lower threshold to 0.4 to avoid aggressive blocking
+    if parsed.get("clarity_score", 0.5) < 0.4:
+         parsed["needs_clarification"] = True
+         parsed["clarification_message"] = "The problem statement is ambiguous. Please clarify."
+    
+    # If text is empty, definitely clarify
+    if not parsed.get("problem_text"):
+        parsed["needs_clarification"] = True
+        parsed["clarification_message"] = "No problem text found."
+    return parsed
+
 
 class ParserAgent(BaseAgent):
     """Parse and structure raw input into a math problem format."""
@@ -48,50 +89,14 @@ class ParserAgent(BaseAgent):
         """.strip()
 
         try:
-            response = self.llm.invoke(prompt)
+            response = await self.llm.ainvoke(prompt)
             
-            # --- Robust JSON Extraction ---
-            clean_response = response.strip()
-            # Remove markdown code blocks if present
-            if "```" in clean_response:
-                clean_response = clean_response.split("```")[-2] # take content between fences
-                if clean_response.startswith("json"):
-                    clean_response = clean_response[4:]
-            
-            # Find JSON brackets bounds
-            start_idx = clean_response.find("{")
-            end_idx = clean_response.rfind("}")
-            
-            if start_idx != -1 and end_idx != -1:
-                clean_response = clean_response[start_idx:end_idx+1]
-            # -----------------------------
-
-            try:
-                parsed = json.loads(clean_response)
-            except json.JSONDecodeError:
+            parsed, ok = parse_llm_json(response, PARSER_SCHEMA)
+            if not ok:
                 logger.warning(f"JSON Decode Failed. Raw response: {response}")
-                # FALLBACK: Assume the raw input IS the problem. Do NOT block user.
-                parsed = {
-                    "problem_text": raw_text,
-                    "topic": "algebra", # default assumption
-                    "subtopic": "general",
-                    "variables": [],
-                    "constraints": [],
-                    "clarity_score": 0.9, # assume high to bypass check
-                    "needs_clarification": False,
-                    "clarification_message": "",
-                }
-            
-            # [NEW] Enforce Low Confidence Check
-            # Lower threshold to 0.4 to avoid aggressive blocking
-            if parsed.get("clarity_score", 0.5) < 0.4:
-                 parsed["needs_clarification"] = True
-                 parsed["clarification_message"] = "The problem statement is ambiguous. Please clarify."
+                parsed = parser_fallback(raw_text)
             
-            # If text is empty, definitely clarify
-            if not parsed.get("problem_text"):
-                parsed["needs_clarification"] = True
-                parsed["clarification_message"] = "No problem text found."
+            apply_clarity_rules(parsed)
 
             return self.format_output(
                 success=True,
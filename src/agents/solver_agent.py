@@ -1,9 +1,13 @@
 from typing import Dict, Any, List
-from langchain_ollama import OllamaLLM
 from langchain_community.tools import Tool
 from src.agents.base_agent import BaseAgent
-from src.rag.retriever import RAGRetriever
-from src.memory.retriever import MemoryRetriever
+from src.llm.client import LLMClient
+from src.rag.context import RetrievalContext
+from src.rag.prompt_budget import PromptBudget
+from src.utils.tracing import trace_span
+from src.utils.math_tools import python_calculate, sympy_solve
+from src.utils.deadline import budget_below, note_degraded
+from src.config import SOLVER_WRITEUP_MIN_BUDGET_SECONDS
 import json
 import logging
 
@@ -12,11 +16,10 @@ logger = logging.getLogger(__name__)
 class SolverAgent(BaseAgent):
     """Solve math problems using RAG + Python tools + Memory"""
     
-    def __init__(self, llm: OllamaLLM, rag_retriever: RAGRetriever, memory_retriever: MemoryRetriever = None):
+    def __init__(self, llm: LLMClient):
         super().__init__("solver")
         self.llm = llm
-        self.rag_retriever = rag_retriever
-        self.memory_retriever = memory_retriever
+        self.prompt_budget = PromptBudget()
         self._setup_tools()
     
     def _setup_tools(self):
@@ -31,78 +34,20 @@ class SolverAgent(BaseAgent):
         """Solve problem with RAG + tools"""
         
         try:
-            # Retrieve relevant docs
-            retrieved_docs = self.rag_retriever.retrieve(
-                problem.get('problem_text', ''),
-                k=5
-            )
-            
-            # Retrieve similar problems from memory
-            similar_problems = []
-            if self.memory_retriever:
-                similar_problems = self.memory_retriever.find_similar(
-                    problem.get('problem_text', ''),
-                    top_k=3
-                )
-            
-            # Format context
-            context = "\n\n".join([
-                f"Source {i+1}: {doc['metadata'].get('source', 'Unknown')}\n{doc['page_content']}"
-                for i, doc in enumerate(retrieved_docs)
-            ])
-            
-            # Format similar examples
-            examples = ""
-            if similar_problems:
-                examples = "\n\nSimilar Solved Problems:\n" + "\n".join([
-                    f"Problem: {p['problem']}\nSolution: {p['solution']}\n---"
-                    for p in similar_problems
-                ])
+            # RAG documents and similar solved problems are retrieved once per
+            # request by the workflow's retrieve node
+            retrieval = problem.get('retrieval') or RetrievalContext(query=problem.get('problem_text', ''))
+            # Ranked, deduplicated and trimmed to the context token budget
+            fitted, context_usage = self.prompt_budget.fit(retrieval)
+            context = fitted.format_documents()
+            examples = fitted.format_examples()
                 
-            # -- Step 1: Tool Selection --
-            # Aggressively prompt for tool usage
-            tool_prompt = f"""
-            You are a precision math assistant. You MUST use a tool for any calculation or equation solving.
-            Do NOT calculate mentally.
-            
-            Problem: "{problem.get('problem_text', '')}"
-            
-            Decide:
-            1. If it implies solving an equation (e.g. "Find x", "Solve for y"), use 'sympy'.
-               Format: "TOOL: sympy | <equation>"
-               Note: Convert "=" to "==" for python if needed, or just write Eq(lhs, rhs). Or simply write the equation string.
-               Example: "TOOL: sympy | x**2 - 5*x + 6 = 0"
-               Example: "TOOL: sympy | x + 3/17 = 17/7"
-            
-            2. If it is pure arithmetic (e.g. "What is 123 * 456?"), use 'python_calc'.
-               Format: "TOOL: python_calc | <expression>"
-               Example: "TOOL: python_calc | 123 * 456"
-            
-            3. ONLY if the problem is purely conceptual (e.g. "What is a circle?"), respond "NO TOOL".
-            
-            Respond with the TOOL string only.
-            """
+            # -- Step 1: Tool Selection (may already have run speculatively) --
+            selection = problem.get('tool_selection') or await self.select_tool(problem.get('problem_text', ''))
+            tool_output = selection['output']
+            tool_result = selection['result']
+            tools_used = ['llm', 'rag'] + ([selection['tool']] if selection['tool'] else [])
             
-            tool_decision = self.llm.invoke(tool_prompt).strip()
-            tool_output = ""
-            tools_used = ['llm', 'rag']
-            
-            if "TOOL:" in tool_decision:
-                try:
-                    # Parse tool call
-                    parts = tool_decision.split("TOOL:")[1].strip().split("|")
-                    tool_name = parts[0].strip()
-                    expression = parts[1].strip()
-                    
-                    if tool_name in self.tools:
-                        result = self.tools[tool_name](expression)
-                        tool_output = f"\n[Tool ({tool_name}) Output]: {result}\n"
-                        tools_used.append(tool_name)
-                    else:
-                        tool_output = f"\n[System]: Tool {tool_name} not found.\n"
-                except Exception as e:
-                    tool_output = f"\n[System]: Tool execution failed: {str(e)}\n"
-
             # -- Step 2: Final Solution --
             # Generate solution with tool context
             prompt = f"""You are an expert mathematics tutor. 
@@ -130,7 +75,15 @@ Provide:
 
 Format your response in clear sections."""
             
-            response = self.llm.invoke(prompt)
+            if tool_result is not None and budget_below(SOLVER_WRITEUP_MIN_BUDGET_SECONDS):
+                # Out of time: the tool already has the answer, skip the write-up prompt
+                note_degraded('skipped_writeup', tool=tools_used[-1])
+                response = (
+                    f"**Answer ({tools_used[-1]}):** {tool_result}\n\n"
+                    "The full worked solution was skipped to meet the response deadline."
+                )
+            else:
+                response = await self._generate(prompt)
             
             # Parse solution
             solution_steps = self._parse_solution(response)
@@ -140,8 +93,9 @@ Format your response in clear sections."""
                 data={
                     'solution': response,
                     'steps': solution_steps,
-                    'retrieved_docs': retrieved_docs,
-                    'tools_used': tools_used
+                    'retrieved_docs': retrieval.documents,
+                    'tools_used': tools_used,
+                    'context_usage': context_usage
                 },
                 confidence=0.85
             )
@@ -154,6 +108,61 @@ Format your response in clear sections."""
                 confidence=0.0
             )
     
+    async def select_tool(self, problem_text: str) -> Dict[str, Any]:
+        """Ask the LLM which tool the problem needs and run it.
+
+        Depends only on the problem text, so the workflow can run it
+        speculatively while the problem is still being parsed and routed.
+        Returns {'decision', 'tool', 'result', 'output'}.
+        """
+        # -- Step 1: Tool Selection --
+        # Aggressively prompt for tool usage
+        tool_prompt = f"""
+        You are a precision math assistant. You MUST use a tool for any calculation or equation solving.
+        Do NOT calculate mentally.
+
+        Problem: "{problem_text}"
+
+        Decide:
+        1. If it implies solving an equation (e.g. "Find x", "Solve for y"), use 'sympy'.
+           Format: "TOOL: sympy | <equation>"
+           Note: Convert "=" to "==" for python if needed, or just write Eq(lhs, rhs). Or simply write the equation string.
+           Example: "TOOL: sympy | x**2 - 5*x + 6 = 0"
+           Example: "TOOL: sympy | x + 3/17 = 17/7"
+
+        2. If it is pure arithmetic (e.g. "What is 123 * 456?"), use 'python_calc'.
+           Format: "TOOL: python_calc | <expression>"
+           Example: "TOOL: python_calc | 123 * 456"
+
+        3. ONLY if the problem is purely conceptual (e.g. "What is a circle?"), respond "NO TOOL".
+
+        Respond with the TOOL string only.
+        """
+
+        tool_decision = (await self.llm.ainvoke(tool_prompt)).strip()
+        tool_output = ""
+        tool_result = None
+        tool_used = None
+
+        if "TOOL:" in tool_decision:
+            try:
+                # Parse tool call
+                parts = tool_decision.split("TOOL:")[1].strip().split("|")
+                tool_name = parts[0].strip()
+                expression = parts[1].strip()
+
+                if tool_name in self.tools:
+                    with trace_span('tool', tool_name):
+                        tool_result = self.tools[tool_name](expression)
+                    tool_output = f"\n[Tool ({tool_name}) Output]: {tool_result}\n"
+                    tool_used = tool_name
+                else:
+                    tool_output = f"\n[System]: Tool {tool_name} not found.\n"
+            except Exception as e:
+                tool_output = f"\n[System]: Tool execution failed: {str(e)}\n"
+
+        return {'decision': tool_decision, 'tool': tool_used, 'result': tool_result, 'output': tool_output}
+    
     def _parse_solution(self, response: str) -> List[Dict]:
         """Parse solution into steps"""
         steps = []
@@ -173,56 +182,11 @@ Format your response in clear sections."""
     
     def _python_calculator(self, expression: str) -> str:
         """Safe Python calculation"""
-        try:
-            result = eval(expression, {"__builtins__": {}}, {})
-            return str(result)
-        except:
-            return "Calculation error"
+        return python_calculate(expression)
     
     def _sympy_solver(self, equation: str) -> str:
         """Solve equation symbolically"""
-        try:
-            from sympy import symbols, Eq, solve
-            from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
-            import re
-            
-            # --- 1. Pre-processing / Cleaning ---
-            clean_eqn = equation.lower()
-            for trash in ["solve for x:", "solve for", "solve:", "calculate:", "find x:", "equation:"]:
-                clean_eqn = clean_eqn.replace(trash, "")
-            
-            # Replace unicode powers
-            clean_eqn = clean_eqn.replace("²", "**2").replace("³", "**3")
-            
-            # Normalize equality
-            sanitized_eqn = clean_eqn.strip().replace("==", "=")
-            
-            # Transformations for implicit multiplication (e.g. "5x" -> "5*x")
-            transformations = (standard_transformations + (implicit_multiplication_application,))
-            
-            # --- 2. Splitting LHS = RHS ---
-            if "=" in sanitized_eqn:
-                lhs_str, sep, rhs_str = sanitized_eqn.partition("=")
-            else:
-                lhs_str, rhs_str = sanitized_eqn, "0"
-            
-            # --- 3. Solving ---
-            # Use parse_expr instead of sympify to handle "5x"
-            # Note: parse_expr might interpret "x" as a symbol automatically
-            lhs = parse_expr(lhs_str, transformations=transformations)
-            rhs = parse_expr(rhs_str, transformations=transformations)
-            
-            # Find symbols
-            free_symbols = lhs.free_symbols.union(rhs.free_symbols)
-            if not free_symbols:
-                return "No variables found"
-            
-            # Solve
-            sol = solve(Eq(lhs, rhs), list(free_symbols))
-            return str(sol)
-            
-        except Exception as e:
-            return f"Symbolic solving error: {str(e)} \n(Input: {equation})"
+        return sympy_solve(equation)
     
     def _numpy_operations(self, operation: str) -> str:
         """Perform numpy operations"""
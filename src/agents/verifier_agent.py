@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from langchain_ollama import OllamaLLM
+from src.llm.client import LLMClient
 from src.agents.base_agent import BaseAgent
 import logging
 
@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 class VerifierAgent(BaseAgent):
     """Verify solution correctness"""
     
-    def __init__(self, llm: OllamaLLM):
+    def __init__(self, llm: LLMClient):
         super().__init__("verifier")
         self.llm = llm
     
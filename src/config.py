@@ -11,24 +11,79 @@ PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = Path(__file__).parent
 RAG_DOCS_PATH = Path(os.getenv("RAG_DOCS_PATH", "./src/rag/documents"))
 CHROMA_DB_PATH = Path(os.getenv("CHROMA_DB_PATH", "./data/chroma_db"))
+VECTOR_INDEX_PATH = Path(os.getenv("VECTOR_INDEX_PATH", "./data/vector_index"))
 MEMORY_DB_PATH = Path(os.getenv("MEMORY_DB_PATH", "./data/memory.db"))
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "./data/llm_cache.db"))
 
 # Create directories if they don't exist
 CHROMA_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 MEMORY_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+LLM_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
 RAG_DOCS_PATH.mkdir(parents=True, exist_ok=True)
 
 # LLM Configuration
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5:1.5b")
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))  # In-flight requests per backend
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "16"))  # Queued LLM calls before new requests are rejected
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded after a call
+OLLAMA_KEEP_ALIVE_PING_SECONDS = float(os.getenv("OLLAMA_KEEP_ALIVE_PING_SECONDS", "600"))  # 0 = no pings
+
+# Startup Warmup (ollama, embeddings, sympy, workflow, whisper, ocr)
+ENABLE_WARMUP = os.getenv("ENABLE_WARMUP", "true").lower() == "true"
+WARMUP_COMPONENTS = [c.strip() for c in os.getenv(
+    "WARMUP_COMPONENTS", "ollama,embeddings,sympy,workflow,whisper,ocr"
+).split(",") if c.strip()]
+
+# LLM Response Cache (on disk, shared across processes)
+ENABLE_LLM_CACHE = os.getenv("ENABLE_LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_DISABLED_AGENTS = [
+    name.strip() for name in os.getenv("LLM_CACHE_DISABLED_AGENTS", "").split(",") if name.strip()
+]  # e.g. "explainer,solver"
 
 # Embeddings Configuration
 EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))  # Cached text embeddings per process (0 = off)
+
+# Speech Recognition Configuration
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
 
 # RAG Configuration
 RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "500"))
 RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "100"))
 RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid").lower()  # dense | lexical | hybrid
+HYBRID_DENSE_WEIGHT = float(os.getenv("HYBRID_DENSE_WEIGHT", "0.6"))  # Dense share of the fused score
+LEXICAL_DECISIVE_MARGIN = float(os.getenv("LEXICAL_DECISIVE_MARGIN", "2.0"))  # Top BM25 doc vs. runner-up to skip embedding
+LEXICAL_DECISIVE_MIN_TERMS = int(os.getenv("LEXICAL_DECISIVE_MIN_TERMS", "2"))  # Query terms the top hit must match
+ENABLE_TOPIC_RETRIEVAL = os.getenv("ENABLE_TOPIC_RETRIEVAL", "true").lower() == "true"  # Search only the routed topic's docs
+TOPIC_RETRIEVAL_MIN_CONFIDENCE = float(os.getenv("TOPIC_RETRIEVAL_MIN_CONFIDENCE", "0.7"))  # Below: keep the global search
+TOPIC_RETRIEVAL_CANDIDATES = int(os.getenv("TOPIC_RETRIEVAL_CANDIDATES", "3"))  # Global hits fetched per kept doc, filtered at join
+
+# Vector Backend (chroma | numpy | faiss) for the knowledge base and memory search
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat").lower()  # flat | ivf
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "64"))  # Clusters for the ivf index
+FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "8"))  # Clusters searched per query
+MEMORY_INDEX_FLUSH_EVERY = int(os.getenv("MEMORY_INDEX_FLUSH_EVERY", "20"))  # Solves between numpy/faiss memory index writes (and at exit)
+KB_AUTO_INDEX = os.getenv("KB_AUTO_INDEX", "true").lower() == "true"  # Index new/changed docs when the KB opens
+SOLVER_CONTEXT_TOKEN_BUDGET = int(os.getenv("SOLVER_CONTEXT_TOKEN_BUDGET", "1200"))  # RAG docs + examples in the solver prompt (0 = unlimited)
+SOLVER_EXAMPLE_TOKEN_SHARE = float(os.getenv("SOLVER_EXAMPLE_TOKEN_SHARE", "0.4"))  # Max share of that budget for solved examples
+
+# Batch Solving Configuration
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))  # Problems in flight per solve_many call
+RETRIEVAL_BATCH_WAIT_MS = float(os.getenv("RETRIEVAL_BATCH_WAIT_MS", "5"))  # Window for coalescing retrievals
+
+# Result Cache (exact-match on normalized problem text)
+ENABLE_RESULT_CACHE = os.getenv("ENABLE_RESULT_CACHE", "true").lower() == "true"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))  # In-memory LRU entries
+RESULT_CACHE_TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", "24"))  # SQLite tier
+
+# Request Deadlines (0 = no deadline)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "120"))
+EXPLAIN_MIN_BUDGET_SECONDS = float(os.getenv("EXPLAIN_MIN_BUDGET_SECONDS", "20"))  # Skip the explainer below this
+SOLVER_WRITEUP_MIN_BUDGET_SECONDS = float(os.getenv("SOLVER_WRITEUP_MIN_BUDGET_SECONDS", "15"))  # Answer from the tool output below this
 
 # Confidence Thresholds
 OCR_CONFIDENCE_THRESHOLD = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.8"))
@@ -39,10 +94,24 @@ VERIFIER_CONFIDENCE_THRESHOLD = float(os.getenv("VERIFIER_CONFIDENCE_THRESHOLD",
 ENABLE_WEB_SEARCH = os.getenv("ENABLE_WEB_SEARCH", "true").lower() == "true"
 ENABLE_EVALUATOR_AGENT = os.getenv("ENABLE_EVALUATOR_AGENT", "true").lower() == "true"
 ENABLE_GUARDRAIL_AGENT = os.getenv("ENABLE_GUARDRAIL_AGENT", "true").lower() == "true"
+ENABLE_FAST_PATH = os.getenv("ENABLE_FAST_PATH", "true").lower() == "true"  # SymPy-only answers for plain equations/arithmetic
+FAST_PATH_TIMEOUT_SECONDS = float(os.getenv("FAST_PATH_TIMEOUT_SECONDS", "2"))  # SymPy time limit before falling back to the LLM
+ENABLE_COMBINED_PARSE_ROUTE = os.getenv("ENABLE_COMBINED_PARSE_ROUTE", "false").lower() == "true"  # One LLM call for parse + route
+DEFER_EXPLANATION = os.getenv("DEFER_EXPLANATION", "true").lower() == "true"  # Explain only when the user asks
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "256"))
+ENABLE_SPECULATIVE_SOLVE = os.getenv("ENABLE_SPECULATIVE_SOLVE", "false").lower() == "true"  # Tool selection alongside parse/route
+ENABLE_MEMORY_REUSE = os.getenv("ENABLE_MEMORY_REUSE", "false").lower() == "true"  # Reuse verified near-duplicate answers
+MEMORY_REUSE_THRESHOLD = float(os.getenv("MEMORY_REUSE_THRESHOLD", "0.95"))  # Minimum similarity of the memory hit
+MEMORY_REUSE_VERIFY = os.getenv("MEMORY_REUSE_VERIFY", "true").lower() == "true"  # Re-check reused answers with SymPy
+MEMORY_REUSE_TIMEOUT_SECONDS = float(os.getenv("MEMORY_REUSE_TIMEOUT_SECONDS", "1"))  # SymPy time limit per reuse check
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Tracing (per-node / LLM / tool timings persisted to the agent_traces table)
+ENABLE_TRACING = os.getenv("ENABLE_TRACING", "true").lower() == "true"
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
 # Math Topics
 SUPPORTED_TOPICS = {
     "algebra": ["quadratic_equations", "linear_equations", "systems", "polynomials", "inequalities"],
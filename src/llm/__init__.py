@@ -0,0 +1,18 @@
+"""LLM access layer shared by all agents"""
+
+from src.llm.client import LLMClient
+from src.llm.limiter import BackendLimiter, BackendOverloaded, current_priority, get_backend_limiter
+from src.llm.cache import LLMCache, bypass_llm_cache
+from src.llm.pool import PooledOllamaLLM, get_async_client
+
+__all__ = [
+    'LLMClient',
+    'BackendLimiter',
+    'BackendOverloaded',
+    'current_priority',
+    'get_backend_limiter',
+    'LLMCache',
+    'bypass_llm_cache',
+    'PooledOllamaLLM',
+    'get_async_client'
+]
@@ -0,0 +1,133 @@
+from sqlalchemy import create_engine, event, func, Column, String, Integer, Float
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from src.config import LLM_CACHE_PATH, LLM_CACHE_MAX_MB
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+# Generation options that change the output, hashed together with model and prompt
+LLM_OPTION_FIELDS = (
+    'temperature', 'top_p', 'top_k', 'num_predict', 'num_ctx', 'repeat_penalty',
+    'mirostat', 'mirostat_eta', 'mirostat_tau', 'seed', 'stop', 'format'
+)
+
+# Set by bypass_llm_cache(); cached responses are neither read nor written
+llm_cache_bypass: ContextVar[bool] = ContextVar('llm_cache_bypass', default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Run the enclosed calls against the model, ignoring the response cache (e.g. benchmarks)"""
+    token = llm_cache_bypass.set(True)
+    try:
+        yield
+    finally:
+        llm_cache_bypass.reset(token)
+
+
+class LLMCacheEntry(Base):
+    """SQLAlchemy model for cached LLM responses"""
+    __tablename__ = 'llm_cache'
+
+    key = Column(String, primary_key=True)  # sha256 of model, options and prompt
+    model = Column(String)
+    response = Column(String)
+    size = Column(Integer)  # bytes of prompt + response
+    last_used = Column(Float, index=True)  # unix time, for LRU eviction
+
+
+def cache_key(model: str, options: Dict, prompt: str) -> str:
+    payload = json.dumps({'model': model, 'options': options, 'prompt': prompt}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """On-disk LLM response cache shared by every process using the same file.
+
+    Entries live in a SQLite database in WAL mode, so several app or worker
+    processes can read and write it concurrently. When the total size goes
+    over `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, db_path=LLM_CACHE_PATH, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 ** 2)):
+        engine = create_engine(f'sqlite:///{db_path}', connect_args={'timeout': 30})
+
+        @event.listens_for(engine, "connect")
+        def _configure(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        Base.metadata.create_all(engine)
+        self.Session = sessionmaker(bind=engine)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'bypassed': 0}
+
+    def get(self, key: str) -> Optional[str]:
+        session = self.Session()
+        try:
+            entry = session.query(LLMCacheEntry).filter_by(key=key).first()
+            if entry is None:
+                self.count('misses')
+                return None
+            entry.last_used = time.time()
+            session.commit()
+            self.count('hits')
+            return entry.response
+        except Exception as e:
+            session.rollback()
+            logger.error(f"LLM cache read error: {str(e)}")
+            return None
+        finally:
+            session.close()
+
+    def put(self, key: str, model: str, prompt: str, response: str):
+        size = len(prompt.encode('utf-8')) + len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        session = self.Session()
+        try:
+            session.merge(LLMCacheEntry(key=key, model=model, response=response, size=size, last_used=time.time()))
+            session.commit()
+            self.count('writes')
+            self._evict(session)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"LLM cache write error: {str(e)}")
+        finally:
+            session.close()
+
+    def _evict(self, session):
+        total = session.query(func.coalesce(func.sum(LLMCacheEntry.size), 0)).scalar()
+        if total <= self.max_bytes:
+            return
+
+        # Free down to 90% so eviction doesn't run on every write
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for key, size in session.query(LLMCacheEntry.key, LLMCacheEntry.size).order_by(LLMCacheEntry.last_used):
+            victims.append(key)
+            excess -= size or 0
+            if excess <= 0:
+                break
+        session.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(victims)).delete(synchronize_session=False)
+        session.commit()
+        self.count('evictions', len(victims))
+
+    def count(self, name: str, amount: int = 1):
+        """Increment one of the `stats` counters"""
+        with self._lock:
+            self.stats[name] += amount
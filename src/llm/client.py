@@ -0,0 +1,116 @@
+from typing import AsyncIterator, Dict, Optional
+from langchain_ollama import OllamaLLM
+from src.config import OLLAMA_BASE_URL
+from src.llm.limiter import BackendLimiter, get_backend_limiter
+from src.llm.cache import LLMCache, LLM_OPTION_FIELDS, cache_key, llm_cache_bypass
+from src.utils.events import current_stage
+from src.utils.tracing import trace_span
+from src.utils.deadline import DeadlineExceeded, with_deadline, note_degraded
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    """Non-blocking access to an Ollama model shared by all agents.
+
+    Calls go through the model's async API (`agenerate` / `astream`) so they
+    never block the event loop, and every call holds a slot of the backend's
+    BackendLimiter so the number of in-flight requests per Ollama server
+    stays bounded. Each call is recorded as an 'llm' trace span with its
+    queue wait and token counts.
+    
+    With an LLMCache, responses are looked up by a hash of model, generation
+    options and prompt before the model is called.
+    
+    Calls are bounded by the request deadline (src/utils/deadline.py):
+    `ainvoke` raises DeadlineExceeded, `astream` stops early and records
+    the truncation.
+    """
+
+    def __init__(self, llm: OllamaLLM, limiter: Optional[BackendLimiter] = None,
+                 cache: Optional[LLMCache] = None):
+        self.llm = llm
+        self.base_url = getattr(llm, 'base_url', None) or OLLAMA_BASE_URL
+        self.model = llm.model
+        self.limiter = limiter or get_backend_limiter(self.base_url)
+        self.cache = cache
+        self.options = {name: getattr(llm, name, None) for name in LLM_OPTION_FIELDS}
+
+    def without_cache(self) -> 'LLMClient':
+        """Same model and backend limiter, never cached (per-agent opt-out)"""
+        return LLMClient(self.llm, limiter=self.limiter)
+
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        if llm_cache_bypass.get():
+            self.cache.count('bypassed')
+            return None
+        return cache_key(self.model, self.options, prompt)
+
+    async def ainvoke(self, prompt: str) -> str:
+        """Generate a completion for `prompt`"""
+        with trace_span('llm', current_stage.get() or 'llm', data={'model': self.model}) as span:
+            key = self._cache_key(prompt)
+            if key:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    span['data'] = {'model': self.model, 'cache_hit': True}
+                    return cached
+            
+            result = await with_deadline(self._agenerate(prompt, span))
+            
+            generation = result.generations[0][0]
+            info = generation.generation_info or {}
+            span['prompt_tokens'] = info.get('prompt_eval_count')
+            span['completion_tokens'] = info.get('eval_count')
+            if key:
+                await asyncio.to_thread(self.cache.put, key, self.model, prompt, generation.text)
+            return generation.text
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Generate a completion for `prompt`, yielding text chunks as they arrive"""
+        with trace_span('llm', current_stage.get() or 'llm', data={'model': self.model, 'stream': True}) as span:
+            key = self._cache_key(prompt)
+            if key:
+                cached = await asyncio.to_thread(self.cache.get, key)
+                if cached is not None:
+                    span['data'] = {'model': self.model, 'stream': True, 'cache_hit': True}
+                    yield cached
+                    return
+            
+            queued = time.perf_counter()
+            async with self.limiter.slot():
+                span['queue_wait'] = time.perf_counter() - queued
+                chunks = []
+                truncated = False
+                stream = self.llm.astream(prompt).__aiter__()
+                try:
+                    while True:
+                        try:
+                            chunk = await with_deadline(stream.__anext__())
+                        except StopAsyncIteration:
+                            break
+                        except DeadlineExceeded:
+                            # Keep what was generated so far rather than failing the stage
+                            truncated = True
+                            note_degraded('truncated', chunks=len(chunks))
+                            break
+                        chunks.append(chunk)
+                        yield chunk
+                finally:
+                    # Close the HTTP response so Ollama stops generating (deadline, error or early exit)
+                    await stream.aclose()
+            # Ollama streams roughly one token per chunk
+            span['completion_tokens'] = len(chunks)
+            if key and not truncated:
+                await asyncio.to_thread(self.cache.put, key, self.model, prompt, "".join(chunks))
+
+    async def _agenerate(self, prompt: str, span: Dict):
+        queued = time.perf_counter()
+        async with self.limiter.slot():
+            span['queue_wait'] = time.perf_counter() - queued
+            return await self.llm.agenerate([prompt])
@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict
+import logging
+
+from src.config import OLLAMA_MAX_CONCURRENCY, OLLAMA_MAX_QUEUE
+from src.utils.tracing import percentile
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES = {'interactive': 0, 'background': 1, 'batch': 2}
+
+# Priority of the LLM calls made by the current request (set by the workflow)
+current_priority: ContextVar[str] = ContextVar('llm_priority', default='interactive')
+
+
+class BackendOverloaded(Exception):
+    """Raised when a backend's queue is full; retry after `retry_after` seconds"""
+
+    def __init__(self, retry_after: float, waiting: int):
+        super().__init__(f"LLM backend overloaded ({waiting} requests queued), retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.waiting = waiting
+
+
+class BackendLimiter:
+    """Cap the number of in-flight requests to one LLM backend.
+
+    Unlike asyncio.Semaphore this is safe to share between event loops:
+    Streamlit sessions each run their own loop (asyncio.run per request) but
+    all talk to the same Ollama server, so the limit has to be process-wide.
+    
+    Waiting calls are served by priority (`current_priority`), then in
+    arrival order. `admit` rejects new requests while `max_queue` calls are
+    already waiting, so overload surfaces as a fast BackendOverloaded with a
+    retry-after estimate instead of an ever-growing queue.
+    """
+
+    def __init__(self, max_concurrency: int = OLLAMA_MAX_CONCURRENCY, max_queue: int = OLLAMA_MAX_QUEUE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = []  # heap of (priority, seq, loop, future)
+        self._seq = itertools.count()
+        self._waits = deque(maxlen=1000)  # recent queue waits in seconds
+        self._hold = 0.0  # moving average of slot hold time
+        self.stats = {'admitted': 0, 'rejected': 0, 'max_waiting': 0,
+                      'calls': {name: 0 for name in PRIORITIES}}
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Seconds until the current queue is expected to drain"""
+        with self._lock:
+            return self._retry_after()
+
+    def _retry_after(self) -> float:
+        hold = self._hold or 1.0
+        return max(1.0, round(hold * (len(self._waiters) + 1) / self.max_concurrency, 1))
+
+    def admit(self):
+        """Admission control for a new request: raise BackendOverloaded if the queue is full"""
+        with self._lock:
+            waiting = len(self._waiters)
+            if waiting >= self.max_queue and self._active >= self.max_concurrency:
+                self.stats['rejected'] += 1
+                raise BackendOverloaded(self._retry_after(), waiting)
+            self.stats['admitted'] += 1
+
+    def metrics(self) -> Dict:
+        """Queue depth, wait-time percentiles and admission counters"""
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'active': self._active,
+                'waiting': len(self._waiters),
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'wait_p50': percentile(waits, 50),
+                'wait_p95': percentile(waits, 95),
+                'avg_hold': self._hold,
+                **{k: (dict(v) if isinstance(v, dict) else v) for k, v in self.stats.items()}
+            }
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        priority = current_priority.get()
+        queued = time.perf_counter()
+        with self._lock:
+            self.stats['calls'][priority] = self.stats['calls'].get(priority, 0) + 1
+            if self._active < self.max_concurrency and not self._waiters:
+                self._active += 1
+                self._waits.append(0.0)
+                return
+            waiter = loop.create_future()
+            entry = (PRIORITIES.get(priority, len(PRIORITIES)), next(self._seq), loop, waiter)
+            heapq.heappush(self._waiters, entry)
+            self.stats['max_waiting'] = max(self.stats['max_waiting'], len(self._waiters))
+
+        try:
+            await waiter
+            with self._lock:
+                self._waits.append(time.perf_counter() - queued)
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    raise
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just before cancellation; pass it on.
+                # (A grant still in flight is returned by _grant itself.)
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                _, _, loop, waiter = heapq.heappop(self._waiters)
+                if waiter.done():
+                    continue
+                # Hand the slot over directly; _active stays the same
+                loop.call_soon_threadsafe(self._grant, waiter)
+                return
+            self._active -= 1
+
+    def _grant(self, waiter: asyncio.Future):
+        if waiter.done():
+            # Cancelled after being granted
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - started
+            with self._lock:
+                self._hold = held if not self._hold else 0.8 * self._hold + 0.2 * held
+            self.release()
+
+
+_limiters: Dict[str, BackendLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_backend_limiter(base_url: str) -> BackendLimiter:
+    """Return the shared limiter for an LLM backend URL"""
+    with _limiters_lock:
+        if base_url not in _limiters:
+            _limiters[base_url] = BackendLimiter()
+        return _limiters[base_url]
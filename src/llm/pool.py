@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional, Union
+
+from langchain_ollama import OllamaLLM
+from ollama import AsyncClient, Client, Options
+
+from src.config import OLLAMA_BASE_URL
+
+# One AsyncClient (and so one httpx connection pool) per Ollama server and
+# event loop: httpx connections cannot be shared across loops. Streamlit
+# reruns use a fresh loop for every interaction, so connections are only
+# reused by calls on the same loop (solve_many batches, benchmark runs).
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncClient]]" = weakref.WeakKeyDictionary()
+_sync_clients: Dict[str, Client] = {}
+_clients_lock = threading.Lock()
+
+
+def get_async_client(base_url: str, **client_kwargs: Any) -> AsyncClient:
+    """Shared AsyncClient for `base_url` on the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None:
+            client = clients[base_url] = AsyncClient(host=base_url, **client_kwargs)
+        return client
+
+
+def get_sync_client(base_url: str) -> Client:
+    """Shared blocking Client for `base_url` (usable from any thread)"""
+    with _clients_lock:
+        if base_url not in _sync_clients:
+            _sync_clients[base_url] = Client(host=base_url)
+        return _sync_clients[base_url]
+
+
+class PooledOllamaLLM(OllamaLLM):
+    """OllamaLLM whose async calls reuse a pooled HTTP client.
+
+    langchain-ollama 0.1 opens a new AsyncClient (and TCP connection) for
+    every generation; this keeps connections to the server alive between
+    calls on the same event loop (see get_async_client).
+
+    langchain-ollama 0.1 also has no `base_url` field (its clients always
+    use the default host), so it is declared here and used for both async
+    and sync calls.
+    """
+
+    base_url: Optional[str] = None
+    """Ollama server URL (defaults to OLLAMA_BASE_URL)"""
+
+    def _generate_params(self, stop: Optional[List[str]], **kwargs: Any) -> Dict[str, Any]:
+        if self.stop is not None and stop is not None:
+            raise ValueError("`stop` found in both the input and default params.")
+        elif self.stop is not None:
+            stop = self.stop
+
+        params = self._default_params
+        for key in self._default_params:
+            if key in kwargs:
+                params[key] = kwargs[key]
+        params["options"]["stop"] = stop
+        return params
+
+    async def _acreate_generate_stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Union[Mapping[str, Any], str]]:
+        params = self._generate_params(stop, **kwargs)
+        client = get_async_client(self.base_url or OLLAMA_BASE_URL)
+        async for part in await client.generate(
+            model=params["model"],
+            prompt=prompt,
+            stream=True,
+            options=Options(**params["options"]),
+            keep_alive=params["keep_alive"],
+            format=params["format"],
+        ):
+            yield part
+
+    def _create_generate_stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Iterator[Union[Mapping[str, Any], str]]:
+        params = self._generate_params(stop, **kwargs)
+        yield from get_sync_client(self.base_url or OLLAMA_BASE_URL).generate(
+            model=params["model"],
+            prompt=prompt,
+            stream=True,
+            options=Options(**params["options"]),
+            keep_alive=params["keep_alive"],
+            format=params["format"],
+        )
@@ -2,12 +2,21 @@
 
 from src.memory.store import MemoryStore
 from src.memory.retriever import MemoryRetriever
-from src.memory.models import SolvedProblem, AgentTrace, StudentProgress
+from src.memory.models import SolvedProblem, AgentTrace, StudentProgress, CachedResult, WorkflowCheckpoint
+from src.memory.traces import TraceRecorder
+from src.memory.result_cache import ResultCache, normalize_problem
+from src.memory.checkpoints import CheckpointStore
 
 __all__ = [
     'MemoryStore',
     'MemoryRetriever',
     'SolvedProblem',
     'AgentTrace',
-    'StudentProgress'
+    'StudentProgress',
+    'CachedResult',
+    'WorkflowCheckpoint',
+    'TraceRecorder',
+    'ResultCache',
+    'normalize_problem',
+    'CheckpointStore'
 ]
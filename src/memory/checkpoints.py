@@ -0,0 +1,60 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.memory.models import Base, WorkflowCheckpoint
+from src.memory.serialization import dumps_state, loads_state
+from src.config import MEMORY_DB_PATH
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Persist the graph state of problems paused for human input.
+
+    A checkpoint is written when a run ends in `needs_clarification` or
+    `human_review_required`, and removed once the problem is resumed to
+    completion (see MathMentorWorkflow.resume).
+    """
+
+    def __init__(self, db_path=MEMORY_DB_PATH):
+        engine = create_engine(f'sqlite:///{db_path}')
+        Base.metadata.create_all(engine, tables=[WorkflowCheckpoint.__table__])
+        self.Session = sessionmaker(bind=engine)
+
+    def save(self, state: Dict):
+        """Store (or replace) the checkpoint for state['problem_id']"""
+        session = self.Session()
+        try:
+            session.merge(WorkflowCheckpoint(
+                problem_id=state['problem_id'],
+                status=state.get('status'),
+                state=dumps_state(state),
+                updated_at=datetime.now()
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Checkpoint write error: {str(e)}")
+        finally:
+            session.close()
+
+    def load(self, problem_id: str) -> Optional[Dict]:
+        session = self.Session()
+        try:
+            checkpoint = session.query(WorkflowCheckpoint).filter_by(problem_id=problem_id).first()
+            return loads_state(checkpoint.state) if checkpoint else None
+        finally:
+            session.close()
+
+    def delete(self, problem_id: str):
+        session = self.Session()
+        try:
+            session.query(WorkflowCheckpoint).filter_by(problem_id=problem_id).delete()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Checkpoint delete error: {str(e)}")
+        finally:
+            session.close()
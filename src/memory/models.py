@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, JSON, Integer
+from sqlalchemy import Column, String, Float, DateTime, JSON, Integer, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -29,13 +29,17 @@ class AgentTrace(Base):
     __tablename__ = 'agent_traces'
     
     id = Column(String, primary_key=True)
-    problem_id = Column(String)
-    agent_name = Column(String)
-    success = Column(String)
+    problem_id = Column(String, index=True)
+    agent_name = Column(String, index=True)  # graph node, LLM caller stage or tool name
+    kind = Column(String)  # node, llm, tool
+    success = Column(Boolean)
     confidence = Column(Float)
-    execution_time = Column(Float)
+    execution_time = Column(Float)  # wall time in seconds
+    queue_wait = Column(Float)  # seconds waiting for a backend slot (LLM calls)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
     data = Column(String)  # JSON
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=datetime.now, index=True)
 
 class StudentProgress(Base):
     """Model for student learning progress"""
@@ -47,3 +51,22 @@ class StudentProgress(Base):
     correct_solutions = Column(Integer, default=0)
     average_confidence = Column(Float, default=0.0)
     last_updated = Column(DateTime, default=datetime.now)
+
+class CachedResult(Base):
+    """Model for cached workflow results (see ResultCache)"""
+    __tablename__ = 'result_cache'
+    
+    key = Column(String, primary_key=True)  # normalized problem text
+    problem_id = Column(String, index=True)
+    result = Column(String)  # JSON
+    created_at = Column(DateTime, default=datetime.now, index=True)
+
+class WorkflowCheckpoint(Base):
+    """Model for paused workflow states awaiting human input (see CheckpointStore)"""
+    __tablename__ = 'workflow_checkpoints'
+    
+    problem_id = Column(String, primary_key=True)
+    status = Column(String)  # needs_clarification, human_review_required
+    state = Column(String)  # JSON
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
@@ -0,0 +1,131 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.memory.models import Base, CachedResult
+from src.memory.serialization import dumps_state, loads_state
+from src.utils.math_tools import clean_equation
+from src.config import MEMORY_DB_PATH, RESULT_CACHE_SIZE, RESULT_CACHE_TTL_HOURS
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_problem(problem_text: str) -> str:
+    """Canonical cache key: the sympy tool's normalization plus collapsed whitespace"""
+    return " ".join(clean_equation(problem_text or "").split())
+
+
+class ResultCache:
+    """Two-tier cache of completed workflow results keyed on normalized problem text.
+
+    An in-memory LRU sits in front of the `result_cache` SQLite table;
+    entries older than `ttl` are ignored in both tiers. Entries are dropped
+    by problem id when feedback marks the answer incorrect (`on_feedback`).
+    """
+
+    def __init__(self, db_path=MEMORY_DB_PATH, max_entries: int = RESULT_CACHE_SIZE,
+                 ttl: timedelta = timedelta(hours=RESULT_CACHE_TTL_HOURS)):
+        engine = create_engine(f'sqlite:///{db_path}')
+        Base.metadata.create_all(engine, tables=[CachedResult.__table__])
+        self.Session = sessionmaker(bind=engine)
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (created_at, problem_id, payload)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+    def get(self, problem_text: str) -> Optional[Dict]:
+        """Cached result for `problem_text`, or None"""
+        key = normalize_problem(problem_text)
+        if not key:
+            return None
+        cutoff = datetime.now() - self.ttl
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] >= cutoff:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return loads_state(entry[2])
+            if entry:
+                del self._memory[key]
+
+        session = self.Session()
+        try:
+            row = session.query(CachedResult).filter(
+                CachedResult.key == key, CachedResult.created_at >= cutoff
+            ).first()
+            if row:
+                entry = (row.created_at, row.problem_id, row.result)
+        except Exception as e:
+            logger.error(f"Result cache read error: {str(e)}")
+            row = None
+        finally:
+            session.close()
+
+        with self._lock:
+            if not row:
+                self.stats['misses'] += 1
+                return None
+            self._remember(key, entry)
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+        return loads_state(entry[2])
+
+    def put(self, problem_text: str, result: Dict):
+        """Cache a completed result (anything else is ignored)"""
+        key = normalize_problem(problem_text)
+        if not key or not result.get('success') or result.get('status') != 'completed':
+            return
+
+        entry = (datetime.now(), result.get('id'), dumps_state(result))
+        session = self.Session()
+        try:
+            session.merge(CachedResult(key=key, problem_id=entry[1], result=entry[2], created_at=entry[0]))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Result cache write error: {str(e)}")
+        finally:
+            session.close()
+
+        with self._lock:
+            self._remember(key, entry)
+            self.stats['stores'] += 1
+
+    def invalidate(self, problem_id: str):
+        """Drop every cached entry produced by `problem_id`"""
+        with self._lock:
+            for key in [k for k, entry in self._memory.items() if entry[1] == problem_id]:
+                del self._memory[key]
+
+        session = self.Session()
+        try:
+            removed = session.query(CachedResult).filter(CachedResult.problem_id == problem_id).delete()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Result cache invalidation error: {str(e)}")
+            removed = 0
+        finally:
+            session.close()
+
+        with self._lock:
+            self.stats['invalidations'] += removed
+        if removed:
+            logger.info(f"Invalidated cached result for {problem_id}")
+
+    def on_feedback(self, problem_id: str, feedback: str, comment: str = None):
+        """MemoryStore feedback listener: incorrect answers must not be served again"""
+        if feedback == 'incorrect':
+            self.invalidate(problem_id)
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -13,3 +13,7 @@ class MemoryRetriever:
     def find_similar(self, problem_text: str, top_k: int = 3) -> List[Dict]:
         """Find similar past solutions"""
         return self.store.search_history(problem_text, k=top_k)
+
+    def find_similar_many(self, problem_texts: List[str], top_k: int = 3) -> List[List[Dict]]:
+        """Find similar past solutions for several problems in one batch"""
+        return self.store.search_history_many(problem_texts, k=top_k)
@@ -0,0 +1,16 @@
+from src.rag.context import RetrievalContext
+from typing import Dict
+import json
+
+
+def dumps_state(state: Dict) -> str:
+    """JSON-encode a workflow state or result (RetrievalContext via to_dict)"""
+    return json.dumps(state, default=lambda o: o.to_dict() if hasattr(o, 'to_dict') else str(o))
+
+
+def loads_state(payload: str) -> Dict:
+    """Inverse of dumps_state"""
+    state = json.loads(payload)
+    if isinstance(state.get('retrieval'), dict):
+        state['retrieval'] = RetrievalContext.from_dict(state['retrieval'])
+    return state
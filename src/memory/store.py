@@ -1,13 +1,15 @@
 from sqlalchemy import create_engine, Column, String, Float, DateTime, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from src.config import MEMORY_DB_PATH, CHROMA_DB_PATH
+from src.config import MEMORY_DB_PATH, MEMORY_INDEX_FLUSH_EVERY
 from datetime import datetime
+import atexit
 import json
 import logging
-from typing import Dict, List
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from typing import Callable, Dict, List
+from langchain_core.embeddings import Embeddings
+from src.rag.embedding_service import get_embedding_service
+from src.rag.vector_backends import VectorBackend, make_vector_backend
 
 logger = logging.getLogger(__name__)
 
@@ -31,21 +33,22 @@ class SolvedProblem(Base):
 class MemoryStore:
     """Persistent memory storage"""
     
-    def __init__(self):
+    def __init__(self, embeddings: Embeddings = None, backend: VectorBackend = None):
         engine = create_engine(f'sqlite:///{MEMORY_DB_PATH}')
         Base.metadata.create_all(engine)
         self.Session = sessionmaker(bind=engine)
         
+        # Called as listener(problem_id, feedback, comment) after feedback is stored
+        self._feedback_listeners: List[Callable] = []
+        
         # Initialize Vector Store for History
         try:
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
-            self.vectorstore = Chroma(
-                collection_name="solved_problems_history",
-                persist_directory=str(CHROMA_DB_PATH),
-                embedding_function=self.embeddings
-            )
+            # Process-wide cached embedding service unless one is injected
+            self.embeddings = embeddings or get_embedding_service()
+            self.vectorstore = backend or make_vector_backend("solved_problems_history")
+            # Index files are rewritten every MEMORY_INDEX_FLUSH_EVERY solves, not per solve
+            self._unflushed = 0
+            atexit.register(self.flush)
         except Exception as e:
             logger.error(f"Failed to init vector store: {e}")
             self.vectorstore = None
@@ -79,46 +82,75 @@ class MemoryStore:
                     "topic": result.get('parsed_problem', {}).get('topic', 'unknown'),
                     "answer": result.get('answer', '')[:100]
                 }
-                self.vectorstore.add_texts(
-                    texts=[result.get('problem_text', '')],
-                    metadatas=[meta],
-                    ids=[result.get('id')]
+                problem_text = result.get('problem_text', '')
+                self.vectorstore.add(
+                    ids=[result.get('id')],
+                    embeddings=self.embeddings.embed_documents([problem_text]),
+                    texts=[problem_text],
+                    metadatas=[meta]
                 )
+                self._unflushed += 1
+                if self._unflushed >= MEMORY_INDEX_FLUSH_EVERY:
+                    self.flush()
             
             logger.info(f"Stored problem {result.get('id')}")
         except Exception as e:
             logger.error(f"Storage error: {str(e)}")
     
+    def flush(self):
+        """Persist buffered vector index writes (SQL records are committed per solve)"""
+        if not self.vectorstore:
+            return
+        try:
+            self.vectorstore.flush()
+            self._unflushed = 0
+        except Exception as e:
+            logger.error(f"Memory index flush error: {str(e)}")
+
     def search_history(self, query: str, k: int = 3) -> List[Dict]:
         """Search similar solved problems"""
         if not self.vectorstore:
             return []
             
         try:
-            results = self.vectorstore.similarity_search_with_score(query, k=k)
-            formatted = []
-            for doc, score in results:
-                # Retrieve full solution from SQL if needed, but for now metadata is enough? 
-                # Actually we need the solution path. 
-                # Let's simple format what we have. 
-                # To get the full solution text, we might need to query SQL or store it in metadata.
-                # Storing full solution in metadata is easier for RAG context.
-                
+            return self._format_hits(self.vectorstore.query([self.embeddings.embed_query(query)], k=k)[0])
+        except Exception as e:
+            logger.error(f"History search error: {str(e)}")
+            return []
+
+    def search_history_many(self, queries: List[str], k: int = 3) -> List[List[Dict]]:
+        """Search similar solved problems for several queries in one batch"""
+        if not self.vectorstore or not queries:
+            return [[] for _ in queries]
+            
+        try:
+            query_embeddings = self.embeddings.embed_documents(list(queries))
+            return [self._format_hits(hits) for hits in self.vectorstore.query(query_embeddings, k=k)]
+        except Exception as e:
+            logger.error(f"Batch history search error: {str(e)}")
+            return [[] for _ in queries]
+
+    def _format_hits(self, hits: List[tuple]) -> List[Dict]:
+        """Join vector hits (problem_text, metadata, distance) with their SQL records"""
+        formatted = []
+        session = self.Session()
+        try:
+            for problem_text, metadata, score in hits:
                 # Fetch full details from SQL for better context
-                session = self.Session()
-                db_prob = session.query(SolvedProblem).filter_by(id=doc.metadata['id']).first()
+                db_prob = session.query(SolvedProblem).filter_by(id=metadata['id']).first()
                 if not db_prob:
-                    session.close()
                     continue
 
                 solution_text = db_prob.solution
                 is_valid = True
+                feedback = None
                 
                 # Check feedback
                 if db_prob.user_feedback:
                     try:
                         fb = json.loads(db_prob.user_feedback)
-                        if fb.get('feedback') == 'incorrect':
+                        feedback = fb.get('feedback')
+                        if feedback == 'incorrect':
                             # If incorrect, check if corrected solution is provided in comments
                             if fb.get('comment') and len(fb.get('comment')) > 10: # Heuristic for solution
                                 solution_text = f"Corrected Solution: {fb.get('comment')}"
@@ -126,19 +158,20 @@ class MemoryStore:
                                 is_valid = False # Skip this result if incorrect and no correction
                     except:
                         pass
-                
-                session.close()
 
                 if is_valid:
                     formatted.append({
-                        'problem': doc.page_content,
+                        'id': db_prob.id,
+                        'problem': problem_text,
                         'solution': solution_text,
+                        'answer': db_prob.answer,
+                        'confidence': db_prob.confidence,
+                        'feedback': feedback,
                         'similarity': 1 - score
                     })
-            return formatted
-        except Exception as e:
-            logger.error(f"History search error: {str(e)}")
-            return []
+        finally:
+            session.close()
+        return formatted
 
     def store_feedback(self, problem_id: str, feedback: str, comment: str = None):
         """Store user feedback"""
@@ -155,6 +188,16 @@ class MemoryStore:
                 logger.info(f"Stored feedback for {problem_id}")
         except Exception as e:
             logger.error(f"Feedback storage error: {str(e)}")
+        
+        for listener in self._feedback_listeners:
+            try:
+                listener(problem_id, feedback, comment)
+            except Exception as e:
+                logger.error(f"Feedback listener error: {str(e)}")
+
+    def add_feedback_listener(self, listener: Callable):
+        """Register a callback(problem_id, feedback, comment) run after store_feedback"""
+        self._feedback_listeners.append(listener)
 
     def get_statistics(self) -> Dict:
         """Get learning statistics"""
@@ -0,0 +1,119 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.memory.models import Base, AgentTrace
+from src.config import MEMORY_DB_PATH, TRACE_QUEUE_SIZE
+from datetime import datetime, timedelta
+from src.utils.tracing import percentile
+from typing import Dict, List, Optional
+import json
+import logging
+import queue
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecorder:
+    """Persist timing records to the AgentTrace table without blocking callers.
+
+    `record` only enqueues; a daemon thread batches the inserts. When the
+    queue is full, records are dropped (and counted) rather than slowing
+    down the request path.
+    """
+
+    def __init__(self, db_path=MEMORY_DB_PATH, max_queue: int = TRACE_QUEUE_SIZE):
+        engine = create_engine(f'sqlite:///{db_path}')
+        Base.metadata.create_all(engine, tables=[AgentTrace.__table__])
+        self.Session = sessionmaker(bind=engine)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, agent_name: str, kind: str, execution_time: float, success: bool = True,
+               problem_id: Optional[str] = None, confidence: Optional[float] = None,
+               queue_wait: Optional[float] = None, prompt_tokens: Optional[int] = None,
+               completion_tokens: Optional[int] = None, data: Optional[Dict] = None):
+        """Queue one trace record"""
+        try:
+            self._queue.put_nowait({
+                'id': str(uuid.uuid4()),
+                'problem_id': problem_id,
+                'agent_name': agent_name,
+                'kind': kind,
+                'success': success,
+                'confidence': confidence,
+                'execution_time': execution_time,
+                'queue_wait': queue_wait,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'data': json.dumps(data, default=str) if data else None,
+                'created_at': datetime.now()
+            })
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is waiting so bursts become one transaction
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            session = self.Session()
+            try:
+                session.bulk_insert_mappings(AgentTrace, batch)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Trace write error: {str(e)}")
+            finally:
+                session.close()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def latency_percentiles(self, window: timedelta = timedelta(hours=1), kind: Optional[str] = "node",
+                            agent_name: Optional[str] = None) -> Dict[str, Dict]:
+        """p50/p95/p99 wall time per agent over the last `window`.
+
+        kind: 'node', 'llm', 'tool', or None for all records.
+        """
+        session = self.Session()
+        try:
+            query = session.query(AgentTrace).filter(AgentTrace.created_at >= datetime.now() - window)
+            if kind:
+                query = query.filter(AgentTrace.kind == kind)
+            if agent_name:
+                query = query.filter(AgentTrace.agent_name == agent_name)
+            rows = query.all()
+        finally:
+            session.close()
+
+        grouped: Dict[str, List[AgentTrace]] = {}
+        for row in rows:
+            grouped.setdefault(row.agent_name, []).append(row)
+
+        report = {}
+        for name, traces in grouped.items():
+            times = sorted(t.execution_time or 0.0 for t in traces)
+            waits = [t.queue_wait for t in traces if t.queue_wait is not None]
+            report[name] = {
+                'count': len(traces),
+                'p50': percentile(times, 50),
+                'p95': percentile(times, 95),
+                'p99': percentile(times, 99),
+                'mean': sum(times) / len(times),
+                'error_rate': sum(1 for t in traces if not t.success) / len(traces),
+                'avg_queue_wait': sum(waits) / len(waits) if waits else None,
+                'prompt_tokens': sum(t.prompt_tokens or 0 for t in traces),
+                'completion_tokens': sum(t.completion_tokens or 0 for t in traces)
+            }
+        return report
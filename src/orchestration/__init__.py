@@ -1,5 +1,7 @@
 """Orchestration module for workflow management"""
 
 from src.orchestration.workflow import MathMentorWorkflow
+from src.orchestration.registry import ResourceRegistry, get_registry
+from src.orchestration.warmup import WarmupManager, get_warmup_manager
 
-__all__ = ['MathMentorWorkflow']
+__all__ = ['MathMentorWorkflow', 'ResourceRegistry', 'get_registry', 'WarmupManager', 'get_warmup_manager']
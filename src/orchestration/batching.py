@@ -0,0 +1,102 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from src.rag.context import RetrievalContext
+from src.rag.retriever import RAGRetriever
+from src.memory.retriever import MemoryRetriever
+from src.config import RAG_TOP_K, RETRIEVAL_BATCH_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+# Set inside solve_many tasks; the retrieve node routes through it when present
+current_batcher: ContextVar[Optional['RetrievalBatcher']] = ContextVar('retrieval_batcher', default=None)
+
+
+class RetrievalBatcher:
+    """Coalesce concurrent retrievals into batched embedding + vector searches.
+
+    Requests arriving within `max_wait_ms` of each other (or until
+    `max_batch_size` are pending) are served by a single `retrieve_many` /
+    `find_similar_many` call, so N in-flight solves cost one embedding
+    forward pass and one vector query per store instead of N. If a batched
+    call fails, each query is retried on its own, so only the queries that
+    really fail see the error.
+    """
+
+    def __init__(self, rag_retriever: RAGRetriever, memory_retriever: MemoryRetriever,
+                 max_batch_size: int = 32, max_wait_ms: float = RETRIEVAL_BATCH_WAIT_MS,
+                 k: int = RAG_TOP_K, top_k: int = 3):
+        self.rag_retriever = rag_retriever
+        self.memory_retriever = memory_retriever
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.k = k
+        self.top_k = top_k
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle = None
+        self._tasks = set()  # Running batches (the event loop only keeps weak references)
+        self.stats = {'batches': 0, 'queries': 0, 'largest_batch': 0, 'fallbacks': 0}
+
+    async def retrieve(self, query: str) -> RetrievalContext:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._pending.append((query, waiter))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await waiter
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        queries = list(dict.fromkeys(query for query, _ in batch))
+        self.stats['batches'] += 1
+        self.stats['queries'] += len(batch)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        try:
+            documents, examples = await asyncio.gather(
+                asyncio.to_thread(self.rag_retriever.retrieve_many, queries, self.k),
+                asyncio.to_thread(self.memory_retriever.find_similar_many, queries, self.top_k)
+            )
+        except Exception as e:
+            logger.error(f"Batched retrieval error, retrying {len(queries)} queries one by one: {str(e)}")
+            self.stats['fallbacks'] += 1
+            await asyncio.gather(*(self._run_single(query, [w for q, w in batch if q == query]) for query in queries))
+            return
+
+        contexts: Dict[str, Tuple[List[Dict], List[Dict]]] = dict(zip(queries, zip(documents, examples)))
+        for query, waiter in batch:
+            if not waiter.done():
+                docs, similar = contexts[query]
+                waiter.set_result(RetrievalContext(query=query, documents=list(docs), examples=list(similar)))
+
+    async def _run_single(self, query: str, waiters: List[asyncio.Future]):
+        try:
+            documents, examples = await asyncio.gather(
+                asyncio.to_thread(self.rag_retriever.retrieve, query, self.k),
+                asyncio.to_thread(self.memory_retriever.find_similar, query, self.top_k)
+            )
+        except Exception as e:
+            logger.error(f"Retrieval error: {str(e)}")
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(RetrievalContext(query=query, documents=list(documents), examples=list(examples)))
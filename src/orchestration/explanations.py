@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import threading
+
+from src.config import EXPLANATION_CACHE_SIZE
+
+# Fields of a finished result the explainer needs
+EXPLANATION_FIELDS = ('problem_text', 'parsed_problem', 'answer', 'steps', 'solution')
+
+
+class ExplanationStore:
+    """Bounded, thread-safe store of deferred explanations keyed by problem id.
+
+    `register` keeps the inputs the explainer needs; `put` caches the
+    generated text. The least recently used entries are evicted first.
+    """
+
+    def __init__(self, max_size: int = EXPLANATION_CACHE_SIZE):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'generated': 0}
+
+    def register(self, problem_id: str, result: Dict):
+        """Remember what is needed to explain `result` later"""
+        source = {field: result.get(field) for field in EXPLANATION_FIELDS}
+        with self._lock:
+            entry = self._entries.setdefault(problem_id, {'explanation': None})
+            entry['source'] = source
+            self._touch(problem_id)
+
+    def source(self, problem_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(problem_id)
+            return entry.get('source') if entry else None
+
+    def get(self, problem_id: str) -> Optional[str]:
+        """Cached explanation, or None if it has not been generated yet"""
+        with self._lock:
+            entry = self._entries.get(problem_id)
+            if entry and entry['explanation']:
+                self.stats['hits'] += 1
+                self._entries.move_to_end(problem_id)
+                return entry['explanation']
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, problem_id: str, explanation: str):
+        with self._lock:
+            entry = self._entries.setdefault(problem_id, {'source': None})
+            entry['explanation'] = explanation
+            self.stats['generated'] += 1
+            self._touch(problem_id)
+
+    def _touch(self, problem_id: str):
+        self._entries.move_to_end(problem_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from src.config import EMBEDDINGS_MODEL, WHISPER_MODEL
+
+logger = logging.getLogger(__name__)
+
+
+def _current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (None if unavailable)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ResourceRegistry:
+    """Process-wide registry of heavy resources (models, stores, workflow).
+
+    Every resource is built lazily on first request and then shared by all
+    sessions/threads of the process. Loads are serialized so the RSS delta
+    measured around each factory can be attributed to that resource.
+    """
+
+    def __init__(self):
+        self._resources: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict] = {}
+        # Re-entrant: building the workflow loads the knowledge base and memory store
+        self._load_lock = threading.RLock()
+        self._loading_stack: List[Dict] = []
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return resource `name`, building it with `factory` on first use"""
+        resource = self._resources.get(name)
+        if resource is not None:
+            return resource
+
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if name in self._resources:
+                return self._resources[name]
+
+            frame = {'name': name, 'nested_bytes': 0}
+            self._loading_stack.append(frame)
+            rss_before = _current_rss()
+            start = time.perf_counter()
+            try:
+                resource = factory()
+            finally:
+                self._loading_stack.pop()
+
+            load_seconds = time.perf_counter() - start
+            rss_after = _current_rss()
+            total_bytes = None
+            own_bytes = None
+            if rss_before is not None and rss_after is not None:
+                total_bytes = max(rss_after - rss_before, 0)
+                # Memory of resources loaded inside this factory is reported on their own entries
+                own_bytes = max(total_bytes - frame['nested_bytes'], 0)
+                if self._loading_stack:
+                    self._loading_stack[-1]['nested_bytes'] += total_bytes
+
+            self._resources[name] = resource
+            self._stats[name] = {
+                'name': name,
+                'type': type(resource).__name__,
+                'loaded_at': datetime.now().isoformat(),
+                'load_seconds': round(load_seconds, 3),
+                'memory_bytes': own_bytes
+            }
+            logger.info(f"Loaded shared resource '{name}' in {load_seconds:.2f}s")
+            return resource
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resources
+
+    def report(self) -> List[Dict]:
+        """Describe loaded resources and the memory each one added"""
+        with self._load_lock:
+            return [dict(stats) for stats in self._stats.values()]
+
+    def process_memory(self) -> Optional[int]:
+        """Current RSS of the whole process in bytes"""
+        return _current_rss()
+
+    # --- Resource Accessors ---
+
+    def embeddings(self):
+        def factory():
+            # Shared with KnowledgeBase / MemoryStore / Embedder built outside the registry
+            from src.rag.embedding_service import get_embedding_service
+            return get_embedding_service(EMBEDDINGS_MODEL)
+        return self.get('embeddings', factory)
+
+    def knowledge_base(self):
+        def factory():
+            from src.rag.knowledge_base import KnowledgeBase
+            return KnowledgeBase(embeddings=self.embeddings())
+        return self.get('knowledge_base', factory)
+
+    def memory_store(self):
+        def factory():
+            from src.memory.store import MemoryStore
+            return MemoryStore(embeddings=self.embeddings())
+        return self.get('memory_store', factory)
+
+    def workflow(self):
+        def factory():
+            from src.orchestration.workflow import MathMentorWorkflow
+            return MathMentorWorkflow(
+                knowledge_base=self.knowledge_base(),
+                memory_store=self.memory_store()
+            )
+        return self.get('workflow', factory)
+
+    def image_processor(self):
+        def factory():
+            from src.input_processing.image_processor import ImageProcessor
+            return ImageProcessor()
+        return self.get('image_processor', factory)
+
+    def audio_processor(self, model_name: str = WHISPER_MODEL):
+        def factory():
+            from src.input_processing.audio_processor import AudioProcessor
+            return AudioProcessor(model_name)
+        return self.get(f'audio_processor:{model_name}', factory)
+
+
+_registry: Optional[ResourceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ResourceRegistry:
+    """Return the process-wide ResourceRegistry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ResourceRegistry()
+    return _registry
@@ -0,0 +1,164 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import logging
+
+from src.config import (
+    OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, OLLAMA_KEEP_ALIVE_PING_SECONDS, WARMUP_COMPONENTS
+)
+from src.orchestration.registry import ResourceRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+# Run in this order; the model load on the Ollama server runs on its own thread
+LOCAL_COMPONENTS = ("embeddings", "sympy", "workflow", "whisper", "ocr")
+
+
+class WarmupManager:
+    """Prewarm models at process start and keep the Ollama model resident.
+
+    `start()` loads the configured components in the background:
+    'ollama' (model loaded into server memory), 'embeddings' (first forward
+    pass), 'sympy' (lazy import and parser), 'workflow' (knowledge base,
+    memory store, agents), 'whisper' and 'ocr'. Resources are built through
+    the ResourceRegistry, so requests reuse them. `readiness()` reports each
+    component as pending / warming / ready / failed.
+
+    After the model is loaded, an empty-prompt generate is sent every
+    `ping_interval` seconds so Ollama does not unload it (`keep_alive`).
+    """
+
+    def __init__(self, registry: ResourceRegistry = None, components: List[str] = None,
+                 base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL,
+                 keep_alive: str = OLLAMA_KEEP_ALIVE, ping_interval: float = OLLAMA_KEEP_ALIVE_PING_SECONDS):
+        self.registry = registry or get_registry()
+        self.components = list(WARMUP_COMPONENTS if components is None else components)
+        self.base_url = base_url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self._status: Dict[str, Dict] = {name: {'status': 'pending'} for name in self.components}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._client = None
+        self.pings = {'sent': 0, 'failed': 0, 'last': None}
+
+    def start(self) -> 'WarmupManager':
+        """Begin warming up in background threads (no-op if already started)"""
+        with self._lock:
+            if self._threads:
+                return self
+            if 'ollama' in self.components:
+                self._threads.append(threading.Thread(target=self._warm_ollama, name="warmup-ollama", daemon=True))
+            local = [name for name in LOCAL_COMPONENTS if name in self.components]
+            if local:
+                self._threads.append(threading.Thread(
+                    target=self._warm_local, args=(local,), name="warmup-local", daemon=True
+                ))
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def stop(self):
+        """Stop keep-alive pings"""
+        self._stop.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every component finished warming (or `timeout`); True if all are ready"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in self.components:
+            while self.status(name) in ('pending', 'warming'):
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.05)
+        return self.is_ready()
+
+    def status(self, name: str) -> str:
+        with self._lock:
+            return self._status.get(name, {}).get('status', 'unknown')
+
+    def is_ready(self, name: str = None) -> bool:
+        """True if `name` (or every component) warmed up successfully"""
+        with self._lock:
+            entries = [self._status.get(name, {})] if name else list(self._status.values())
+        return all(entry.get('status') == 'ready' for entry in entries)
+
+    def readiness(self) -> List[Dict]:
+        """Per-component status, warmup time and error"""
+        with self._lock:
+            return [{'name': name, **entry} for name, entry in self._status.items()]
+
+    # --- Warmup Steps ---
+
+    def _warmers(self) -> Dict[str, Callable[[], None]]:
+        return {
+            'embeddings': lambda: self.registry.embeddings().embed_query("warmup"),
+            'sympy': self._warm_sympy,
+            'workflow': self.registry.workflow,
+            'whisper': self.registry.audio_processor,
+            'ocr': self.registry.image_processor
+        }
+
+    def _warm_local(self, names: List[str]):
+        warmers = self._warmers()
+        for name in names:
+            self._warm(name, warmers[name])
+
+    def _warm(self, name: str, warmer: Callable[[], None]) -> bool:
+        self._set(name, status='warming', started_at=datetime.now().isoformat())
+        start = time.perf_counter()
+        try:
+            warmer()
+        except Exception as e:
+            logger.error(f"Warmup of {name} failed: {str(e)}")
+            self._set(name, status='failed', error=str(e), seconds=round(time.perf_counter() - start, 3))
+            return False
+        seconds = time.perf_counter() - start
+        self._set(name, status='ready', seconds=round(seconds, 3))
+        logger.info(f"Warmed up {name} in {seconds:.2f}s")
+        return True
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._status.setdefault(name, {}).update(fields)
+
+    def _warm_sympy(self):
+        from src.utils.math_tools import sympy_solve
+        sympy_solve("2*x + 1 = 5")
+
+    def _warm_ollama(self):
+        if self._warm('ollama', self._ping) and self.ping_interval > 0:
+            self._keep_alive_loop()
+
+    def _ping(self):
+        """Empty-prompt generate: loads the model (if needed) and resets its keep-alive timer"""
+        if self._client is None:
+            from ollama import Client
+            self._client = Client(host=self.base_url)
+        self._client.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+
+    def _keep_alive_loop(self):
+        while not self._stop.wait(self.ping_interval):
+            try:
+                self._ping()
+                self.pings['sent'] += 1
+            except Exception as e:
+                self.pings['failed'] += 1
+                logger.warning(f"Ollama keep-alive ping failed: {str(e)}")
+            self.pings['last'] = datetime.now().isoformat()
+
+
+_manager: Optional[WarmupManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_warmup_manager() -> WarmupManager:
+    """Return the process-wide WarmupManager (not started)"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = WarmupManager()
+    return _manager
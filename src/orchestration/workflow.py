@@ -6,76 +6,231 @@ from src.agents.solver_agent import SolverAgent
 from src.agents.verifier_agent import VerifierAgent
 from src.agents.explainer_agent import ExplainerAgent
 from src.agents.guardrail_agent import GuardrailAgent
+from src.agents.fast_path_agent import FastPathAgent
+from src.agents.parse_route_agent import ParseRouteAgent
+from src.agents.memory_reuse_agent import MemoryReuseAgent
 from src.rag.knowledge_base import KnowledgeBase
 from src.rag.retriever import RAGRetriever
+from src.rag.context import RetrievalContext
+from src.rag.topics import GENERAL_TOPIC, guess_problem_topic
 from src.memory.store import MemoryStore
 from src.memory.retriever import MemoryRetriever
-from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL
+from src.memory.traces import TraceRecorder
+from src.memory.result_cache import ResultCache, normalize_problem
+from src.memory.checkpoints import CheckpointStore
+from src.llm.client import LLMClient
+from src.llm.cache import LLMCache
+from src.llm.pool import PooledOllamaLLM
+from src.llm.limiter import BackendOverloaded, current_priority
+from src.orchestration.explanations import ExplanationStore
+from src.orchestration.batching import RetrievalBatcher, current_batcher
+from src.utils.tracing import current_trace, trace_span
+from src.utils.deadline import current_deadline, current_degradations, remaining_budget, budget_below, note_degraded
+from src.utils.events import (
+    current_event_sink, current_stage, emit_event,
+    STAGE_STARTED, STAGE_FINISHED, RESULT
+)
+from src.config import (
+    OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, RAG_TOP_K, BATCH_CONCURRENCY, ENABLE_TRACING, ENABLE_FAST_PATH,
+    ENABLE_COMBINED_PARSE_ROUTE, DEFER_EXPLANATION, ENABLE_RESULT_CACHE,
+    ENABLE_MEMORY_REUSE, ENABLE_LLM_CACHE, LLM_CACHE_DISABLED_AGENTS,
+    REQUEST_DEADLINE_SECONDS, EXPLAIN_MIN_BUDGET_SECONDS, ENABLE_SPECULATIVE_SOLVE,
+    ENABLE_TOPIC_RETRIEVAL, TOPIC_RETRIEVAL_MIN_CONFIDENCE, TOPIC_RETRIEVAL_CANDIDATES, SUPPORTED_TOPICS
+)
 import asyncio
+import threading
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Iterable, AsyncIterator, Union
+from typing_extensions import Annotated, TypedDict
 
 logger = logging.getLogger(__name__)
 
+# Stages that only depend on the raw problem text and run concurrently
+FAN_OUT_STAGES = ("parse", "route", "retrieve")
+# With the combined parse+route stage, "parse" also produces the routing
+COMBINED_FAN_OUT_STAGES = ("parse", "retrieve")
+# Outcomes that wait for a human; their state is checkpointed for resume()
+HITL_STATUSES = ("needs_clarification", "human_review_required")
+
+
+def _merge_dicts(left: Dict, right: Dict) -> Dict:
+    """Reducer for state keys written by several nodes in the same step"""
+    merged = dict(left or {})
+    merged.update(right or {})
+    return merged
+
+
+class WorkflowState(TypedDict, total=False):
+    """Graph state shared by all workflow nodes"""
+    problem_id: str
+    problem_text: str
+    input_mode: str
+    ocr_confidence: float
+    asr_confidence: float
+    input_path: Optional[str]
+    timestamp: str
+    request_started: float
+    resume_from: str
+    degraded_stages: List[Dict]
+    status: str
+    fast_path_solved: bool
+    memory_reuse: Dict[str, Any]
+    agents: Annotated[dict, _merge_dicts]
+    stage_timings: Annotated[dict, _merge_dicts]
+    trace: Annotated[dict, _merge_dicts]
+    guardrail_result: Dict[str, Any]
+    parsed_problem: Dict[str, Any]
+    clarification_message: str
+    routing: Dict[str, Any]
+    retrieval: RetrievalContext
+    speculation: Dict[str, Any]
+    retrieved_docs: List[Dict]
+    sources: List[Dict]
+    solution: str
+    steps: List[Dict]
+    answer: str
+    verification: Dict[str, Any]
+    confidence: float
+    reason: str
+    explanation: str
+    explanation_pending: bool
+    explanation_handle: str
+    id: str
+    success: bool
+
+
 class MathMentorWorkflow:
     """Main workflow orchestration using LangGraph"""
     
-    def __init__(self):
-        # Initialize LLM
-        self.llm = OllamaLLM(
+    def __init__(self, llm: OllamaLLM = None, knowledge_base: KnowledgeBase = None,
+                 memory_store: MemoryStore = None, trace_recorder: TraceRecorder = None,
+                 result_cache: ResultCache = None, llm_cache: LLMCache = None,
+                 checkpoints: CheckpointStore = None, speculative_solve: bool = ENABLE_SPECULATIVE_SOLVE,
+                 combined_parse_route: bool = ENABLE_COMBINED_PARSE_ROUTE,
+                 defer_explanation: bool = DEFER_EXPLANATION):
+        # Initialize LLM (async client shared by all agents, pooled connections, responses cached on disk)
+        self.llm = LLMClient(llm or PooledOllamaLLM(
             base_url=OLLAMA_BASE_URL,
             model=OLLAMA_MODEL,
-            temperature=0.1  # Low for math
-        )
+            temperature=0.1,  # Low for math
+            keep_alive=OLLAMA_KEEP_ALIVE
+        ), cache=llm_cache or (LLMCache() if ENABLE_LLM_CACHE else None))
         
-        # Initialize components
-        self.kb = KnowledgeBase()
+        # Initialize components (shared instances can be injected, see ResourceRegistry)
+        self.kb = knowledge_base or KnowledgeBase()
         self.rag_retriever = RAGRetriever(self.kb)
-        self.memory_store = MemoryStore()
+        self.memory_store = memory_store or MemoryStore()
         self.memory_retriever = MemoryRetriever(self.memory_store)
         
+        # Node / LLM / tool timings, written asynchronously to agent_traces
+        self.trace_recorder = trace_recorder or (TraceRecorder() if ENABLE_TRACING else None)
+        
+        # Exact-match cache of completed results; dropped when feedback says "incorrect"
+        self.result_cache = result_cache or (ResultCache() if ENABLE_RESULT_CACHE else None)
+        if self.result_cache:
+            self.memory_store.add_feedback_listener(self.result_cache.on_feedback)
+        
+        # Paused HITL states, resumed with resume()
+        self.checkpoints = checkpoints or CheckpointStore()
+        
         # Initialize agents
-        self.parser_agent = ParserAgent(self.llm)
-        self.router_agent = IntentRouterAgent(self.llm)
-        self.solver_agent = SolverAgent(self.llm, self.rag_retriever, self.memory_retriever)
-        self.verifier_agent = VerifierAgent(self.llm)
-        self.explainer_agent = ExplainerAgent(self.llm)
+        self.parser_agent = ParserAgent(self._agent_llm("parser"))
+        self.router_agent = IntentRouterAgent(self._agent_llm("intent_router"))
+        self.solver_agent = SolverAgent(self._agent_llm("solver"))
+        self.verifier_agent = VerifierAgent(self._agent_llm("verifier"))
+        self.explainer_agent = ExplainerAgent(self._agent_llm("explainer"))
         self.guardrail_agent = GuardrailAgent()
+        self.fast_path_agent = FastPathAgent()
+        self.parse_route_agent = ParseRouteAgent(self._agent_llm("parse_route"))
+        self.memory_reuse_agent = MemoryReuseAgent() if ENABLE_MEMORY_REUSE else None
+        self.combined_parse_route = combined_parse_route
+        self.fan_out_stages = COMBINED_FAN_OUT_STAGES if combined_parse_route else FAN_OUT_STAGES
+        
+        # Solver tool selection only needs the raw text: run it alongside parse/route
+        self.speculative_solve = speculative_solve
+        if speculative_solve:
+            self.fan_out_stages = self.fan_out_stages + ("speculate",)
+        self.speculation_stats = {'started': 0, 'hits': 0, 'misses': 0, 'failed': 0, 'wasted': 0, 'wasted_seconds': 0.0}
+        self._speculation_lock = threading.Lock()
+        
+        # Explanations generated on first request (see get_explanation)
+        self.defer_explanation = defer_explanation
+        self.explanations = ExplanationStore()
         
         # Build workflow graph
         self._build_graph()
     
+    def _agent_llm(self, agent_name: str) -> LLMClient:
+        """LLM client for one agent; agents in LLM_CACHE_DISABLED_AGENTS skip the response cache"""
+        if agent_name in LLM_CACHE_DISABLED_AGENTS:
+            return self.llm.without_cache()
+        return self.llm
+    
     def _build_graph(self):
         """Build LangGraph workflow"""
-        graph = StateGraph(dict)
+        graph = StateGraph(WorkflowState)
         
         # Define nodes
-        graph.add_node("guardrail", self._run_guardrail)
-        graph.add_node("parse", self._run_parser)
-        graph.add_node("route", self._run_router)
-        graph.add_node("retrieve", self._run_retrieve)
-        graph.add_node("solve", self._run_solver)
-        graph.add_node("verify", self._run_verifier)
-        graph.add_node("explain", self._run_explainer)
-        graph.add_node("finalize", self._run_finalize)
+        graph.add_node("fast_path", self._stage("fast_path", self._run_fast_path))
+        graph.add_node("guardrail", self._stage("guardrail", self._run_guardrail))
+        if self.combined_parse_route:
+            graph.add_node("parse", self._stage("parse", self._run_parse_route))
+        else:
+            graph.add_node("parse", self._stage("parse", self._run_parser))
+            graph.add_node("route", self._stage("route", self._run_router))
+        graph.add_node("retrieve", self._stage("retrieve", self._run_retrieve))
+        if self.speculative_solve:
+            graph.add_node("speculate", self._stage("speculate", self._run_speculate))
+        graph.add_node("join", self._stage("join", self._run_join))
+        if self.memory_reuse_agent:
+            graph.add_node("reuse", self._stage("reuse", self._run_memory_reuse))
+        graph.add_node("solve", self._stage("solve", self._run_solver))
+        graph.add_node("verify", self._stage("verify", self._run_verifier))
+        if not self.defer_explanation:
+            graph.add_node("explain", self._stage("explain", self._run_explainer))
+        graph.add_node("finalize", self._stage("finalize", self._run_finalize))
         
         # Define edges (workflow flow)
-        graph.add_edge("guardrail", "parse")
+        # Plain equations / arithmetic are answered by SymPy without any LLM call
+        graph.add_conditional_edges(
+            "fast_path",
+            self._check_fast_path,
+            {
+                "solved": "finalize",
+                "continue": "guardrail"
+            }
+        )
+        
+        # Parsing, routing and retrieval (RAG + memory lookup) only need the raw
+        # problem text, so they fan out after the guardrail and run concurrently.
+        for stage in self.fan_out_stages:
+            graph.add_edge("guardrail", stage)
+        graph.add_edge(list(self.fan_out_stages), "join")
         
         # Conditional edge for Parser HITL
         graph.add_conditional_edges(
-            "parse",
+            "join",
             self._check_parser_clarification,
             {
-                "continue": "route",
+                "continue": "reuse" if self.memory_reuse_agent else "solve",
                 "clarify": "finalize"
             }
         )
         
-        graph.add_edge("route", "retrieve")
-        graph.add_edge("retrieve", "solve")
+        # A verified near-duplicate from memory skips the solver LLM
+        if self.memory_reuse_agent:
+            graph.add_conditional_edges(
+                "reuse",
+                self._check_memory_reuse,
+                {
+                    "reused": "finalize",
+                    "continue": "solve"
+                }
+            )
+        
         graph.add_edge("solve", "verify")
         
         # Conditional edge for Verifier HITL
@@ -83,51 +238,199 @@ class MathMentorWorkflow:
             "verify",
             self._check_verification,
             {
-                "continue": "explain",
+                "continue": "finalize" if self.defer_explanation else "explain",
                 "review": "finalize"
             }
         )
         
-        graph.add_edge("explain", "finalize")
+        if not self.defer_explanation:
+            graph.add_edge("explain", "finalize")
         
-        # Set entry point
-        graph.set_entry_point("guardrail")
+        # Set entry point (resumed runs re-enter after the stages that didn't change)
+        graph.set_conditional_entry_point(self._route_entry)
         
         self.graph = graph.compile()
     
+    def _stage(self, name: str, runner):
+        """Wrap a node runner so its start/end offsets land in state['stage_timings']
+        and stage events reach solve_stream consumers"""
+        async def run(state):
+            request_started = state.get('request_started', 0.0)
+            stage_token = current_stage.set(name)
+            emit_event(STAGE_STARTED, name)
+            started = time.perf_counter()
+            try:
+                with trace_span('node', name) as span:
+                    update = runner(state)
+                    if asyncio.iscoroutine(update):
+                        update = await update
+                    results = list((update or {}).get('agents', {}).values())
+                    span['success'] = all(r.get('success', False) for r in results)
+                    if results:
+                        span['confidence'] = min(r.get('confidence', 0.0) for r in results)
+            finally:
+                current_stage.reset(stage_token)
+            finished = time.perf_counter()
+            emit_event(STAGE_FINISHED, name, duration=round(finished - started, 4))
+            
+            update = dict(update or {})
+            timing = {
+                'start': round(started - request_started, 4),
+                'end': round(finished - request_started, 4),
+                'duration': round(finished - started, 4)
+            }
+            remaining = remaining_budget()
+            if remaining is not None:
+                timing['budget_left'] = round(remaining, 2)
+            update['stage_timings'] = {name: timing}
+            return update
+        return run
+    
     async def solve(self, problem_text: str, input_mode: str = "text", 
-                   ocr_confidence: float = 1.0, asr_confidence: float = 1.0, input_path: str = None) -> Dict:
-        """Main solve method"""
+                   ocr_confidence: float = 1.0, asr_confidence: float = 1.0, input_path: str = None,
+                   priority: Optional[str] = None, deadline: Optional[float] = REQUEST_DEADLINE_SECONDS) -> Dict:
+        """Main solve method
         
-        problem_id = str(uuid.uuid4())
+        priority: 'interactive' (default), 'background' or 'batch'; orders this
+        request's LLM calls in the backend queue.
+        deadline: time budget in seconds (None/0 for none). Optional stages are
+        skipped or truncated when it runs low (see result['degraded_stages']);
+        past it the request returns status 'timeout'.
+        """
         
+        # Identical problems are answered from the cache (with the original id)
+        if self.result_cache:
+            cached = await asyncio.to_thread(self.result_cache.get, problem_text)
+            if cached:
+                cached['cache_hit'] = True
+                if cached.get('explanation_pending'):
+                    self.explanations.register(cached['id'], cached)
+                return cached
+        
+        state = {
+            'problem_id': str(uuid.uuid4()),
+            'request_started': time.perf_counter(),
+            'problem_text': problem_text,
+            'input_mode': input_mode,
+            'ocr_confidence': ocr_confidence,
+            'asr_confidence': asr_confidence,
+            'input_path': input_path,
+            'timestamp': datetime.now().isoformat(),
+            'agents': {},
+            'status': 'processing'
+        }
+        return await self._execute(state, priority, deadline)
+    
+    async def resume(self, problem_id: str, patch: Optional[Dict] = None,
+                     priority: Optional[str] = None, deadline: Optional[float] = REQUEST_DEADLINE_SECONDS) -> Dict:
+        """Continue a problem paused for human input from its checkpoint.
+
+        needs_clarification: patch {'clarification': str} is appended to the
+        problem text (or pass 'problem_text' to replace it); parse, route and
+        retrieve re-run, the guardrail and fast path are skipped.
+        human_review_required: patch {'approved': True}, optionally with a
+        corrected 'solution' / 'answer'; the run continues after verification.
+        The problem keeps its id. A missing checkpoint or an invalid patch
+        returns an error result, like a failed solve.
+        """
         try:
-            # Run workflow
-            state = {
-                'problem_id': problem_id,
-                'problem_text': problem_text,
-                'input_mode': input_mode,
-                'ocr_confidence': ocr_confidence,
-                'asr_confidence': asr_confidence,
-                'input_path': input_path,
-                'timestamp': datetime.now().isoformat(),
-                'agents': {},
-                'status': 'processing'
+            state = await self._resume_state(problem_id, patch)
+        except Exception as e:
+            logger.warning(f"Cannot resume {problem_id}: {str(e)}")
+            return {
+                'id': problem_id,
+                'success': False,
+                'error': str(e),
+                'confidence': 0.0,
+                'status': 'error'
             }
-            
-            # Execute graph
-            # Execute graph
-            result = await self.graph.ainvoke(state)
+        return await self._execute(state, priority, deadline)
+    
+    async def _resume_state(self, problem_id: str, patch: Optional[Dict]) -> Dict:
+        """Load the checkpoint and apply `patch` (raises ValueError if it can't be resumed)"""
+        state = await asyncio.to_thread(self.checkpoints.load, problem_id)
+        if state is None:
+            raise ValueError(f"No checkpoint for problem {problem_id}")
+        
+        patch = dict(patch or {})
+        paused = state.get('status')
+        if paused == 'needs_clarification':
+            clarification = patch.pop('clarification', None)
+            if clarification:
+                patch.setdefault('problem_text', f"{state.get('problem_text', '')} {clarification}".strip())
+            state['clarification_message'] = None
+            state['resume_from'] = 'fan_out'
+        elif paused == 'human_review_required':
+            if not patch.pop('approved', False):
+                raise ValueError("Resuming a review requires approved=True")
+            state['verification'] = {**(state.get('verification') or {}), 'human_approved': True}
+            state['reason'] = None
+            state['resume_from'] = 'finalize' if self.defer_explanation else 'explain'
+        else:
+            raise ValueError(f"Problem {problem_id} is not awaiting input (status: {paused})")
+        
+        state.update(patch)
+        state['status'] = 'processing'
+        state['request_started'] = time.perf_counter()
+        return state
+    
+    async def _execute(self, state: Dict, priority: Optional[str] = None,
+                       deadline: Optional[float] = None) -> Dict:
+        """Run the graph from `state`, then store, cache and checkpoint the result"""
+        problem_id = state['problem_id']
+        trace_token = current_trace.set(
+            {'recorder': self.trace_recorder, 'problem_id': problem_id} if self.trace_recorder else None
+        )
+        priority_token = current_priority.set(priority or current_priority.get())
+        deadline_token = current_deadline.set(time.monotonic() + deadline if deadline else None)
+        degradations = []
+        degraded_token = current_degradations.set(degradations)
+        
+        try:
+            # Execute graph (LLM calls inside are bounded by the same deadline;
+            # this is the backstop for anything that isn't)
+            result = await asyncio.wait_for(self.graph.ainvoke(state), timeout=deadline or None)
+            result['degraded_stages'] = degradations
             
             # Store in memory only if successful? Or always?
             # Store if success or if we need HITL (to resume later?)
             # As per assignment, "Memory must be used at runtime to... reuse solution patterns"
             # We should only store *successful* solutions for reuse.
             if result.get('success', False):
-                self.memory_store.store_solution(result)
+                await asyncio.to_thread(self.memory_store.store_solution, result)
+            if result.get('explanation_pending'):
+                self.explanations.register(problem_id, result)
+            if self.result_cache and not degradations:
+                await asyncio.to_thread(self.result_cache.put, result.get('problem_text', ''), result)
+            
+            # Paused for a human: keep the state so resume() only re-runs what changes
+            if result.get('status') in HITL_STATUSES:
+                await asyncio.to_thread(self.checkpoints.save, result)
+            elif state.get('resume_from'):
+                await asyncio.to_thread(self.checkpoints.delete, problem_id)
             
             return result
             
+        except asyncio.TimeoutError:
+            logger.warning(f"Deadline of {deadline}s exceeded for {problem_id}")
+            return {
+                'id': problem_id,
+                'success': False,
+                'error': f"No answer within {deadline:g}s",
+                'confidence': 0.0,
+                'status': 'timeout',
+                'degraded_stages': degradations
+            }
+        except BackendOverloaded as e:
+            logger.warning(f"Rejected {problem_id}: {str(e)}")
+            return {
+                'id': problem_id,
+                'success': False,
+                'error': str(e),
+                'retry_after': e.retry_after,
+                'confidence': 0.0,
+                'status': 'overloaded'
+            }
         except Exception as e:
             logger.error(f"Workflow error: {str(e)}")
             return {
@@ -137,9 +440,159 @@ class MathMentorWorkflow:
                 'confidence': 0.0,
                 'status': 'error'
             }
+        finally:
+            current_degradations.reset(degraded_token)
+            current_deadline.reset(deadline_token)
+            current_priority.reset(priority_token)
+            current_trace.reset(trace_token)
+            
+    async def solve_stream(self, problem_text: str, **kwargs) -> AsyncIterator[Dict]:
+        """Run `solve` and yield its events as they happen.
+
+        Events are dicts with 'type' and 'stage': `stage_started`,
+        `token` (with 'text', streamed by the solver and explainer),
+        `stage_finished` (with 'duration') and finally `result` (with 'result').
+        """
+        async for event in self._stream(self.solve(problem_text, **kwargs)):
+            yield event
+    
+    async def resume_stream(self, problem_id: str, patch: Optional[Dict] = None, **kwargs) -> AsyncIterator[Dict]:
+        """Run `resume` and yield its events as they happen (see solve_stream)"""
+        async for event in self._stream(self.resume(problem_id, patch, **kwargs)):
+            yield event
+    
+    async def _stream(self, run_coro) -> AsyncIterator[Dict]:
+        events: asyncio.Queue = asyncio.Queue()
+        
+        async def run():
+            current_event_sink.set(events)
+            try:
+                return await run_coro
+            finally:
+                events.put_nowait(None)
+        
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            yield {'type': RESULT, 'stage': None, 'result': await task}
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def solve_many(self, problems: Iterable[Union[str, Dict[str, Any]]],
+                         concurrency: int = BATCH_CONCURRENCY) -> AsyncIterator[Dict]:
+        """Solve many problems with bounded concurrency, yielding results as they finish.
+
+        Each problem is either the problem text or a dict of `solve` keyword
+        arguments. Results carry `batch_index` (position in `problems`);
+        a failing item yields an error result without affecting the others.
+        Retrieval for the in-flight set is batched through a RetrievalBatcher.
+        """
+        concurrency = max(1, concurrency)
+        batcher = RetrievalBatcher(self.rag_retriever, self.memory_retriever, max_batch_size=concurrency,
+                                   k=self.retrieval_k)
+        pending = iter(enumerate(problems))
+        in_flight = set()
+        
+        def launch():
+            while len(in_flight) < concurrency:
+                try:
+                    index, problem = next(pending)
+                except StopIteration:
+                    return
+                in_flight.add(asyncio.ensure_future(self._solve_batch_item(index, problem, batcher)))
+        
+        try:
+            launch()
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    yield task.result()
+                launch()
+        finally:
+            # Consumer stopped early: don't leave orphaned solves running
+            for task in in_flight:
+                task.cancel()
+    
+    async def _solve_batch_item(self, index: int, problem: Union[str, Dict[str, Any]],
+                                batcher: RetrievalBatcher) -> Dict:
+        # Runs in its own task, so the batcher (and batch priority) is only visible to this solve
+        current_batcher.set(batcher)
+        current_priority.set('batch')
+        try:
+            kwargs = {'problem_text': problem} if isinstance(problem, str) else dict(problem)
+            result = await self.solve(**kwargs)
+        except Exception as e:
+            logger.error(f"Batch item {index} error: {str(e)}")
+            result = {
+                'success': False,
+                'error': str(e),
+                'confidence': 0.0,
+                'status': 'error'
+            }
+        result['batch_index'] = index
+        return result
             
+    def latency_report(self, window_minutes: int = 60, kind: str = "node") -> Dict[str, Dict]:
+        """p50/p95/p99 latency per node (or per LLM caller / tool) over a time window"""
+        if not self.trace_recorder:
+            return {}
+        return self.trace_recorder.latency_percentiles(timedelta(minutes=window_minutes), kind=kind)
+    
+    async def explain(self, result: Dict) -> str:
+        """Generate the step-by-step explanation for a finished result on demand.
+
+        Used for answers that skipped the explainer (deferred explanations,
+        fast-path results). Cached against the result id.
+        """
+        return await self.get_explanation(result.get('explanation_handle') or result.get('id'), result)
+    
+    async def get_explanation(self, problem_id: str, result: Optional[Dict] = None) -> str:
+        """Return the explanation for `problem_id`, generating it on first request.
+
+        `result` is used when the problem is no longer in the explanation store.
+        """
+        cached = self.explanations.get(problem_id) if problem_id else None
+        if cached:
+            return cached
+        
+        source = (self.explanations.source(problem_id) if problem_id else None) or result
+        if not source:
+            raise KeyError(f"Unknown problem id: {problem_id}")
+        
+        explained = await self.explainer_agent.execute(source)
+        explanation = explained['data'].get('explanation', '')
+        if explained['success'] and explanation and problem_id:
+            self.explanations.put(problem_id, explanation)
+        return explanation
+    
     # --- Workflow Condition Checks ---
 
+    def _route_entry(self, state):
+        resume_from = state.get('resume_from')
+        if resume_from == 'fan_out':
+            # Resumed clarification skips the guardrail, so admission happens here
+            self.llm.limiter.admit()
+            return list(self.fan_out_stages)
+        if resume_from:
+            return resume_from
+        return "fast_path" if ENABLE_FAST_PATH else "guardrail"
+    
+    def _check_fast_path(self, state):
+        if state.get('fast_path_solved'):
+            return 'solved'
+        return 'continue'
+        
+    def _check_memory_reuse(self, state):
+        if state.get('memory_reuse'):
+            return 'reused'
+        return 'continue'
+        
     def _check_parser_clarification(self, state):
         if state.get('status') == 'needs_clarification':
             return 'clarify'
@@ -151,73 +604,272 @@ class MathMentorWorkflow:
         return 'continue'
 
     # --- Node Runners ---
+    # Runners return partial state updates: nodes in the fan-out run in the
+    # same step, so each one may only write the keys it owns.
+    
+    async def _run_fast_path(self, state):
+        result = await self.fast_path_agent.execute(state)
+        data = result['data']
+        if not data.get('matched'):
+            return {}
+        
+        return {
+            'fast_path_solved': True,
+            'parsed_problem': {
+                'problem_text': state['problem_text'],
+                'topic': data['topic'],
+                'subtopic': data['subtopic'],
+                'variables': [],
+                'constraints': [],
+                'needs_clarification': False
+            },
+            'solution': data['solution'],
+            'steps': data['steps'],
+            'answer': data['answer'],
+            'confidence': result['confidence'],
+            'verification': {'is_correct': data['verified'], 'method': 'sympy_substitution'},
+            'agents': {'fast_path': result}
+        }
     
     async def _run_guardrail(self, state):
+        # First stage that needs the LLM: reject now rather than queue behind a full backend
+        self.llm.limiter.admit()
         result = await self.guardrail_agent.execute(state)
-        state['guardrail_result'] = result
-        return state
+        return {'guardrail_result': result}
     
     async def _run_parser(self, state):
         result = await self.parser_agent.execute(state)
-        state['parsed_problem'] = result['data']
-        state['agents']['parser'] = result
+        update = {
+            'parsed_problem': result['data'],
+            'agents': {'parser': result}
+        }
         
         if result['data'].get('needs_clarification', False):
-            state['status'] = 'needs_clarification'
-            state['clarification_message'] = result['data'].get('clarification_message')
+            update['status'] = 'needs_clarification'
+            update['clarification_message'] = result['data'].get('clarification_message')
             
-        return state
+        return update
+    
+    async def _run_parse_route(self, state):
+        result = await self.parse_route_agent.execute(state)
+        parsed = result['data'].get('parsed', result['data'])
+        update = {
+            'parsed_problem': parsed,
+            'routing': result['data'].get('routing', {}),
+            'agents': {'parse_route': result}
+        }
+        
+        if parsed.get('needs_clarification', False):
+            update['status'] = 'needs_clarification'
+            update['clarification_message'] = parsed.get('clarification_message')
+            
+        return update
     
     async def _run_router(self, state):
-        result = await self.router_agent.execute(state['parsed_problem'])
-        state['routing'] = result['data']
-        state['agents']['router'] = result
-        return state
+        result = await self.router_agent.execute({'problem_text': state['problem_text']})
+        return {
+            'routing': result['data'],
+            'agents': {'router': result}
+        }
     
     async def _run_retrieve(self, state):
+        # Single retrieval per request: one search per store, run concurrently
         query = state.get('problem_text', '')
-        retrieved = self.rag_retriever.retrieve(query, k=5)
-        state['retrieved_docs'] = retrieved
-        state['sources'] = retrieved
-        return state
+        batcher = current_batcher.get()
+        if batcher is not None:
+            # Part of solve_many: share the embedding/vector search with other in-flight problems
+            retrieval = await batcher.retrieve(query)
+        else:
+            documents, examples = await asyncio.gather(
+                asyncio.to_thread(self.rag_retriever.retrieve, query, self.retrieval_k),
+                asyncio.to_thread(self.memory_retriever.find_similar, query, 3)
+            )
+            retrieval = RetrievalContext(query=query, documents=documents, examples=examples)
+        return {
+            'retrieval': retrieval,
+            'retrieved_docs': retrieval.documents,
+            'sources': retrieval.documents
+        }
+    
+    async def _run_join(self, state):
+        update = await self._scope_retrieval(state)
+        
+        # Report how much the fanned-out stages overlapped
+        timings = [state['stage_timings'][s] for s in self.fan_out_stages if s in state.get('stage_timings', {})]
+        if not timings:
+            return update
+        
+        wall = max(t['end'] for t in timings) - min(t['start'] for t in timings)
+        sequential = sum(t['duration'] for t in timings)
+        update.setdefault('trace', {})['fan_out'] = {
+            'stages': list(self.fan_out_stages),
+            'wall_seconds': round(wall, 4),
+            'sequential_seconds': round(sequential, 4),
+            'overlap_seconds': round(sequential - wall, 4),
+            'speedup': round(sequential / wall, 2) if wall > 0 else 1.0
+        }
+        return update
+    
+    @property
+    def retrieval_k(self) -> int:
+        """KB hits fetched by the retrieve stage: extra candidates when join filters them by topic"""
+        return RAG_TOP_K * max(1, TOPIC_RETRIEVAL_CANDIDATES) if ENABLE_TOPIC_RETRIEVAL else RAG_TOP_K
+    
+    async def _scope_retrieval(self, state) -> Dict:
+        """Keep the routed topic's KB documents (plus 'general' ones) when the router is confident.
+        
+        The retrieve stage ran alongside routing and fetched `retrieval_k`
+        global hits; they are filtered here rather than searched again. Low
+        confidence, or no hit of the topic, keeps the global top RAG_TOP_K.
+        """
+        retrieval = state.get('retrieval')
+        if not ENABLE_TOPIC_RETRIEVAL or retrieval is None:
+            return {}
+        routing = state.get('routing') or {}
+        topic = routing.get('topic')
+        confidence = routing.get('confidence', 0.0)
+        
+        documents, scope = retrieval.documents[:RAG_TOP_K], 'global'
+        if (topic in SUPPORTED_TOPICS and confidence >= TOPIC_RETRIEVAL_MIN_CONFIDENCE
+                and state.get('status') != 'needs_clarification'):
+            in_topic = [doc for doc in retrieval.documents if doc.get('topic') in (topic, GENERAL_TOPIC)]
+            if any(doc.get('topic') == topic for doc in in_topic):
+                documents, scope = in_topic[:RAG_TOP_K], 'topic'
+        
+        scoped = RetrievalContext(query=retrieval.query, documents=documents, examples=retrieval.examples)
+        return {
+            'retrieval': scoped,
+            'retrieved_docs': scoped.documents,
+            'sources': scoped.documents,
+            'trace': {'retrieval_scope': {'scope': scope, 'topic': topic, 'confidence': confidence}}
+        }
+    
+    async def _run_memory_reuse(self, state):
+        result = await self.memory_reuse_agent.execute(state)
+        data = result['data']
+        if not data.get('matched'):
+            return {'agents': {'memory_reuse': result}}
+        
+        return {
+            'memory_reuse': {
+                'source_id': data['source_id'],
+                'similarity': data['similarity'],
+                'verified': data['verified']
+            },
+            'solution': data['solution'],
+            'steps': [],
+            'answer': data['answer'],
+            'confidence': result['confidence'],
+            'verification': {
+                'is_correct': True,
+                'method': 'sympy_substitution' if data['verified'] else 'user_feedback'
+            },
+            'agents': {'memory_reuse': result}
+        }
+    
+    async def _run_speculate(self, state):
+        self._count_speculation('started')
+        started = time.perf_counter()
+        try:
+            selection = await self.solver_agent.select_tool(state['problem_text'])
+        except Exception as e:
+            # The solver simply redoes the tool selection
+            logger.warning(f"Speculative tool selection failed: {str(e)}")
+            self._count_speculation('failed')
+            self._discard_speculation({'seconds': time.perf_counter() - started})
+            return {'trace': {'speculation': {'outcome': 'failed'}}}
+        return {'speculation': {
+            'key': normalize_problem(state['problem_text']),
+            'topic': guess_problem_topic(state['problem_text']),
+            'selection': selection,
+            'seconds': time.perf_counter() - started
+        }}
+    
+    def _take_speculation(self, state) -> Optional[Dict]:
+        """The speculative tool selection, if it was made on the text and topic the solver uses"""
+        speculation = state.get('speculation')
+        if not speculation:
+            return None
+        parsed_text = (state.get('parsed_problem') or {}).get('problem_text') or state['problem_text']
+        routed_topic = (state.get('routing') or {}).get('topic')
+        if normalize_problem(parsed_text) == speculation['key'] and routed_topic == speculation.get('topic'):
+            self._count_speculation('hits')
+            return speculation['selection']
+        # The parser rewrote the problem or the router disagreed: redo tool selection
+        self._count_speculation('misses')
+        self._discard_speculation(speculation)
+        return None
+    
+    def _discard_speculation(self, speculation: Dict):
+        """Count a speculative solver call whose result was thrown away"""
+        self._count_speculation('wasted')
+        self._count_speculation('wasted_seconds', speculation.get('seconds', 0.0))
+    
+    def _count_speculation(self, name: str, amount: float = 1):
+        with self._speculation_lock:
+            self.speculation_stats[name] += amount
     
     async def _run_solver(self, state):
+        selection = self._take_speculation(state)
+        parsed_text = (state.get('parsed_problem') or {}).get('problem_text')
         result = await self.solver_agent.execute({
-            'problem_text': state['problem_text'],
-            'topic': state['parsed_problem'].get('topic')
+            'problem_text': parsed_text or state['problem_text'],
+            'topic': state['parsed_problem'].get('topic'),
+            'retrieval': state.get('retrieval'),
+            'tool_selection': selection
         })
-        state['solution'] = result['data']['solution']
-        state['steps'] = result['data'].get('steps', [])
-        state['agents']['solver'] = result
-        state['answer'] = result['data']['solution'][:200]  # First 200 chars as answer
-        return state
+        update = {
+            'solution': result['data']['solution'],
+            'steps': result['data'].get('steps', []),
+            'agents': {'solver': result},
+            'answer': result['data']['solution'][:200]  # First 200 chars as answer
+        }
+        if state.get('speculation'):
+            update['trace'] = {'speculation': {'outcome': 'hit' if selection is not None else 'miss'}}
+        return update
     
     async def _run_verifier(self, state):
         result = await self.verifier_agent.execute(state)
-        state['verification'] = result['data']
-        state['agents']['verifier'] = result
-        state['confidence'] = result['confidence']
+        update = {
+            'verification': result['data'],
+            'agents': {'verifier': result},
+            'confidence': result['confidence']
+        }
         
         if result['confidence'] < 0.75: # Threshold
-             state['status'] = 'human_review_required'
-             state['reason'] = 'Low verification confidence'
+             update['status'] = 'human_review_required'
+             update['reason'] = 'Low verification confidence'
              
-        return state
+        return update
     
     async def _run_explainer(self, state):
+        if budget_below(EXPLAIN_MIN_BUDGET_SECONDS):
+            # Optional stage: finalize marks the explanation pending (generated on request)
+            note_degraded('skipped')
+            return {}
         result = await self.explainer_agent.execute(state)
-        state['explanation'] = result['data'].get('explanation', '')
-        state['agents']['explainer'] = result
-        return state
+        return {
+            'explanation': result['data'].get('explanation', ''),
+            'agents': {'explainer': result}
+        }
     
     def _run_finalize(self, state):
         # Extract final response
-        state['id'] = state.get('problem_id')
+        update = {'id': state.get('problem_id')}
+        
+        if state.get('speculation') and 'solver' not in state.get('agents', {}):
+            # Speculated, but the request ended before the solver (clarification, memory reuse)
+            self._discard_speculation(state['speculation'])
+            update['trace'] = {'speculation': {'outcome': 'unused'}}
         
-        if state.get('status') in ['needs_clarification', 'human_review_required']:
-             state['success'] = False
+        if state.get('status') in HITL_STATUSES:
+             update['success'] = False
         else:
-             state['success'] = True
-             state['status'] = 'completed'
+             update['success'] = True
+             update['status'] = 'completed'
+             if not state.get('explanation'):
+                 # Skipped (deferred / fast path): generated by get_explanation on request
+                 update['explanation_pending'] = True
+                 update['explanation_handle'] = state.get('problem_id')
              
-        return state
+        return update
@@ -4,10 +4,24 @@ from src.rag.knowledge_base import KnowledgeBase
 from src.rag.retriever import RAGRetriever
 from src.rag.chunker import TextChunker
 from src.rag.embedder import Embedder
+from src.rag.embedding_service import EmbeddingService, get_embedding_service
+from src.rag.context import RetrievalContext, make_document
+from src.rag.prompt_budget import PromptBudget, estimate_tokens
+from src.rag.vector_backends import VectorBackend, make_vector_backend
+from src.rag.lexical import BM25Index
 
 __all__ = [
     'KnowledgeBase',
     'RAGRetriever',
     'TextChunker',
-    'Embedder'
+    'Embedder',
+    'EmbeddingService',
+    'get_embedding_service',
+    'RetrievalContext',
+    'make_document',
+    'PromptBudget',
+    'estimate_tokens',
+    'VectorBackend',
+    'make_vector_backend',
+    'BM25Index'
 ]
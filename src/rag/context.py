@@ -0,0 +1,55 @@
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Optional
+
+
+def make_document(content: str, source: str, relevance: float, topic: Optional[str] = None) -> Dict:
+    """Build a retrieved document in the schema shared by every RAG consumer"""
+    return {
+        'content': content,
+        'source': source,
+        'relevance': relevance,
+        'topic': topic
+    }
+
+
+@dataclass
+class RetrievalContext:
+    """Knowledge-base documents and similar solved problems for one request.
+
+    Computed once by the workflow's retrieve node and handed to the solver,
+    so each request embeds the query and searches each store exactly once.
+
+    documents: [{'content', 'source', 'relevance', 'topic'}]  (see make_document)
+    examples:  [{'id', 'problem', 'solution', 'answer', 'confidence', 'feedback', 'similarity'}]
+               (MemoryStore.search_history)
+    """
+    query: str
+    documents: List[Dict] = field(default_factory=list)
+    examples: List[Dict] = field(default_factory=list)
+
+    def format_documents(self) -> str:
+        """Render documents as prompt context"""
+        return "\n\n".join([
+            f"Source {i+1}: {doc.get('source', 'Unknown')}\n{doc.get('content', '')}"
+            for i, doc in enumerate(self.documents)
+        ])
+
+    def format_examples(self) -> str:
+        """Render similar solved problems as few-shot examples"""
+        if not self.examples:
+            return ""
+        return "\n\nSimilar Solved Problems:\n" + "\n".join([
+            f"Problem: {p['problem']}\nSolution: {p['solution']}\n---"
+            for p in self.examples
+        ])
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RetrievalContext':
+        return cls(
+            query=data.get('query', ''),
+            documents=list(data.get('documents', [])),
+            examples=list(data.get('examples', []))
+        )
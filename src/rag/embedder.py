@@ -1,15 +1,16 @@
-from sentence_transformers import SentenceTransformer
 from typing import List, Union
 import numpy as np
+from src.rag.embedding_service import EmbeddingService, get_embedding_service
 
 class Embedder:
     """Generate embeddings for text"""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", service: EmbeddingService = None):
+        # Same cached model as the knowledge base and memory store
+        self.service = service or get_embedding_service(model_name)
     
     def embed(self, text: Union[str, List[str]]) -> np.ndarray:
         """Generate embeddings"""
         if isinstance(text, str):
-            return self.model.encode(text)
-        return self.model.encode(text)
+            return np.asarray(self.service.embed_query(text))
+        return np.asarray(self.service.embed_documents(list(text)))
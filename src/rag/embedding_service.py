@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import logging
+import threading
+
+from langchain_core.embeddings import Embeddings
+from src.config import EMBEDDINGS_MODEL, EMBEDDING_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text: whitespace collapsed (the sentence-transformers tokenizer ignores it anyway)"""
+    return " ".join((text or "").split())
+
+
+class EmbeddingService(Embeddings):
+    """One embedding model per process with an LRU cache of vectors.
+
+    Keyed on (model name, normalized text), so the problem text embedded
+    for KB search is reused for memory search and for storing the solved
+    problem. Batches only encode texts that are not cached (each distinct
+    text once). Implements the langchain Embeddings interface, so it drops
+    in wherever HuggingFaceEmbeddings was used.
+    """
+
+    def __init__(self, model_name: str = EMBEDDINGS_MODEL, embeddings: Optional[Embeddings] = None,
+                 max_entries: int = EMBEDDING_CACHE_SIZE):
+        if embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(model_name=model_name)
+        self.model_name = model_name
+        self.embeddings = embeddings
+        self.max_entries = max(0, max_entries)
+        self._cache: "OrderedDict[tuple, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'encoded_batches': 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        normalized = [normalize_text(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        with self._lock:
+            for text in normalized:
+                if text in vectors:
+                    continue
+                cached = self._cache.get((self.model_name, text))
+                if cached is not None:
+                    self._cache.move_to_end((self.model_name, text))
+                    vectors[text] = cached
+            missing = [text for text in dict.fromkeys(normalized) if text not in vectors]
+            self.stats['hits'] += len(normalized) - len(missing)
+            self.stats['misses'] += len(missing)
+
+        if missing:
+            # Encode outside the lock: the model call is the slow part
+            encoded = self.embeddings.embed_documents(missing)
+            with self._lock:
+                self.stats['encoded_batches'] += 1
+                for text, vector in zip(missing, encoded):
+                    vectors[text] = vector
+                    self._remember(text, vector)
+        return [vectors[text] for text in normalized]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def cache_size(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def _remember(self, text: str, vector: List[float]):
+        if not self.max_entries:
+            return
+        self._cache[(self.model_name, text)] = vector
+        self._cache.move_to_end((self.model_name, text))
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = EMBEDDINGS_MODEL) -> EmbeddingService:
+    """Return the process-wide EmbeddingService for `model_name`"""
+    with _services_lock:
+        if model_name not in _services:
+            _services[model_name] = EmbeddingService(model_name)
+        return _services[model_name]
@@ -1,99 +1,299 @@
 from pathlib import Path
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from src.config import CHROMA_DB_PATH, RAG_DOCS_PATH, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP
+from langchain_core.embeddings import Embeddings
+from src.rag.context import make_document
+from src.rag.embedding_service import get_embedding_service
+from src.rag.vector_backends import VectorBackend, make_vector_backend
+from src.rag.lexical import BM25Index
+from src.rag.topics import classify_document
+from src.config import (
+    CHROMA_DB_PATH, RAG_DOCS_PATH, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP, EMBEDDINGS_MODEL, KB_AUTO_INDEX,
+    RAG_RETRIEVAL_MODE, HYBRID_DENSE_WEIGHT, LEXICAL_DECISIVE_MARGIN, LEXICAL_DECISIVE_MIN_TERMS
+)
+import hashlib
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 2  # 2: chunks carry topic/subtopic metadata
+# Collection name langchain's Chroma used before backends were pluggable
+KB_COLLECTION = "langchain"
+
+
+def file_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def chunk_id(source: str, digest: str, index: int) -> str:
+    """Stable id of a chunk: changes whenever its file's content does"""
+    return f"{source}:{digest[:12]}:{index}"
+
+
 class KnowledgeBase:
-    """Manage RAG knowledge base"""
+    """Manage RAG knowledge base.
     
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+    Indexing is incremental: a manifest next to the vector store records the
+    content hash and chunk ids of every indexed file, so only new or changed
+    files are split and embedded, and chunks of removed files are deleted.
+    Changing the chunking settings, embeddings model or vector backend
+    re-indexes everything.
+    
+    Chunks are embedded here and stored in a VectorBackend (VECTOR_BACKEND:
+    Chroma, or an in-process NumPy/FAISS index), and added to a BM25 index
+    with a math-aware tokenizer (src/rag/lexical.py).
+    
+    RAG_RETRIEVAL_MODE picks how `search` ranks chunks: 'dense' (embeddings
+    only), 'lexical' (BM25 only, no embedding) or 'hybrid' (weighted fusion
+    of both). In hybrid mode, queries whose BM25 hits are decisive (one
+    document clearly ahead) skip the embedding entirely.
+    
+    Every chunk carries its document's topic and subtopic (src/rag/topics.py),
+    so `search(..., topic=...)` can restrict the search to one topic.
+    """
+    
+    def __init__(self, embeddings: Embeddings = None, docs_path: Path = RAG_DOCS_PATH,
+                 backend: VectorBackend = None, auto_index: bool = KB_AUTO_INDEX):
+        # Process-wide cached embedding service unless one is injected
+        self.embeddings = embeddings or get_embedding_service()
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=RAG_CHUNK_SIZE,
             chunk_overlap=RAG_CHUNK_OVERLAP
         )
-        self.vectorstore = None
-        self._initialize()
+        self.docs_path = Path(docs_path)
+        self.manifest_path = CHROMA_DB_PATH / "kb_manifest.json"
+        self.vectorstore = backend
+        self.lexical = BM25Index(CHROMA_DB_PATH / "kb_lexical.json")
+        self.retrieval_mode = RAG_RETRIEVAL_MODE
+        self.search_stats = {'dense': 0, 'hybrid': 0, 'lexical': 0}
+        self._initialize(auto_index)
     
-    def _initialize(self):
-        """Initialize or load vector store"""
-        try:
-            # Try to load existing
-            self.vectorstore = Chroma(
-                persist_directory=str(CHROMA_DB_PATH),
-                embedding_function=self.embeddings
-            )
-            logger.info(f"Loaded existing vector store from {CHROMA_DB_PATH}")
-        except:
-            # Create new
-            self.build_from_documents()
+    def _initialize(self, auto_index: bool):
+        """Open the vector store and bring it up to date with the documents"""
+        self.vectorstore = self.vectorstore or make_vector_backend(KB_COLLECTION)
+        logger.info(f"Opened {self.vectorstore.name} vector store ({self.vectorstore.count()} chunks)")
+        if auto_index:
+            try:
+                self.index()
+            except Exception as e:
+                logger.error(f"Error indexing KB: {str(e)}")
     
-    def build_from_documents(self):
-        """Build vector store from KB documents"""
+    def build_from_documents(self) -> Dict:
+        """Re-index every KB document from scratch"""
+        return self.index(force=True)
+    
+    def index(self, force: bool = False) -> Dict:
+        """Embed new or changed documents and drop chunks of removed ones.
+        
+        Returns a report: files seen / added / updated / removed / unchanged,
+        chunks added / deleted and seconds spent.
+        """
+        start = time.perf_counter()
+        manifest = self._load_manifest()
+        settings = self._index_settings()
+        if force or manifest.get('settings') != settings or (manifest.get('files') and not len(self.lexical)):
+            # Unknown chunk ids (pre-manifest store), different chunking/model or no lexical index: start over
+            self._clear()
+            manifest = {'version': MANIFEST_VERSION, 'settings': settings, 'files': {}}
+        
+        indexed = manifest['files']
+        report = {'files': 0, 'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0,
+                  'chunks_added': 0, 'chunks_deleted': 0}
+        current = set()
         try:
-            docs = []
-            doc_files = list(RAG_DOCS_PATH.glob("*.md"))
-            
-            logger.info(f"Loading {len(doc_files)} documents from {RAG_DOCS_PATH}")
-            
-            for doc_file in doc_files:
+            for doc_file in sorted(self.docs_path.glob("*.md")):
                 try:
                     content = doc_file.read_text(encoding='utf-8')
-                    docs.append({
-                        'content': content,
-                        'source': doc_file.name,
-                        'metadata': {'filename': doc_file.name}
-                    })
                 except Exception as e:
                     logger.warning(f"Error loading {doc_file}: {str(e)}")
+                    continue
+                
+                name = doc_file.name
+                current.add(name)
+                report['files'] += 1
+                digest = file_hash(content)
+                entry = indexed.get(name)
+                if entry and entry['hash'] == digest:
+                    report['unchanged'] += 1
+                    continue
+                
+                if entry:
+                    report['chunks_deleted'] += self._delete_chunks(entry['chunk_ids'])
+                indexed[name] = self._index_file(name, content, digest)
+                report['chunks_added'] += len(indexed[name]['chunk_ids'])
+                report['updated' if entry else 'added'] += 1
             
-            # Split documents
-            all_chunks = []
-            for doc in docs:
-                chunks = self.splitter.create_documents(
-                    texts=[doc['content']],
-                    metadatas=[{'source': doc['source']}]
-                )
-                all_chunks.extend(chunks)
-            
-            # Create vector store
-            self.vectorstore = Chroma.from_documents(
-                documents=all_chunks,
-                embedding=self.embeddings,
-                persist_directory=str(CHROMA_DB_PATH)
+            for name in [name for name in indexed if name not in current]:
+                report['chunks_deleted'] += self._delete_chunks(indexed.pop(name)['chunk_ids'])
+                report['removed'] += 1
+        finally:
+            # Keep what was indexed so far even if a file failed to embed; vectors first, then the manifest
+            self.vectorstore.flush()
+            self._save_manifest(manifest)
+            self.lexical.save()
+        
+        report['chunks'] = sum(len(entry['chunk_ids']) for entry in indexed.values())
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"Indexed KB: {report['files']} files ({report['added']} added, {report['updated']} updated, "
+            f"{report['removed']} removed), {report['chunks_added']} chunks embedded in {report['seconds']:.2f}s"
+        )
+        return report
+    
+    def _index_file(self, name: str, content: str, digest: str) -> Dict:
+        """Split and embed one document; chunk ids are derived from its content hash"""
+        chunks = self.splitter.split_text(content)
+        chunk_ids = [chunk_id(name, digest, i) for i in range(len(chunks))]
+        topic, subtopic = classify_document(name, content)
+        metadatas = [
+            {'source': name, 'chunk': i, 'content_hash': digest, 'topic': topic, 'subtopic': subtopic}
+            for i in range(len(chunks))
+        ]
+        if chunks:
+            self.vectorstore.add(
+                ids=chunk_ids,
+                embeddings=self.embeddings.embed_documents(chunks),
+                texts=chunks,
+                metadatas=metadatas
             )
-            self.vectorstore.persist()
-            
-            logger.info(f"Built vector store with {len(all_chunks)} chunks")
-            
+            for cid, text, metadata in zip(chunk_ids, chunks, metadatas):
+                self.lexical.add(cid, text, metadata)
+        return {'hash': digest, 'chunk_ids': chunk_ids, 'topic': topic, 'subtopic': subtopic,
+                'indexed_at': datetime.now().isoformat()}
+    
+    def _delete_chunks(self, chunk_ids: List[str]) -> int:
+        self.vectorstore.delete(chunk_ids)
+        self.lexical.remove(chunk_ids)
+        return len(chunk_ids)
+    
+    def _clear(self):
+        """Remove every chunk from the KB collection"""
+        self.vectorstore.delete(self.vectorstore.ids())
+        self.lexical.clear()
+    
+    def _index_settings(self) -> Dict:
+        return {
+            'chunk_size': RAG_CHUNK_SIZE,
+            'chunk_overlap': RAG_CHUNK_OVERLAP,
+            'embeddings_model': getattr(self.embeddings, 'model_name', EMBEDDINGS_MODEL),
+            'vector_backend': self.vectorstore.name
+        }
+    
+    def _load_manifest(self) -> Dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+        except FileNotFoundError:
+            return {}
         except Exception as e:
-            logger.error(f"Error building KB: {str(e)}")
-            raise
+            logger.warning(f"Ignoring unreadable KB manifest {self.manifest_path}: {str(e)}")
+            return {}
+    
+    def _save_manifest(self, manifest: Dict):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        tmp_path.replace(self.manifest_path)
     
-    def search(self, query: str, k: int = 5) -> List[Dict]:
-        """Search vector store"""
-        if not self.vectorstore:
-            return []
+    def search(self, query: str, k: int = 5, topic: Optional[str] = None) -> List[Dict]:
+        """Search the knowledge base (only chunks of `topic` if given)"""
+        return self.search_many([query], k=k, topic=topic)[0]
+
+    def search_many(self, queries: List[str], k: int = 5, topic: Optional[str] = None) -> List[List[Dict]]:
+        """Search several queries with (at most) one embedding batch and one vector query"""
+        if not self.vectorstore or not queries:
+            return [[] for _ in queries]
         
+        where = {'topic': topic} if topic else None
         try:
-            results = self.vectorstore.similarity_search_with_score(query, k=k)
+            results: List[Optional[List[Dict]]] = [None] * len(queries)
+            lexical = [[] for _ in queries]
+            if self.retrieval_mode != 'dense':
+                lexical = [self.lexical.search(query, k=k * 2, where=where) for query in queries]
             
-            formatted = []
-            for doc, score in results:
-                formatted.append({
-                    'content': doc.page_content,
-                    'source': doc.metadata.get('source', 'unknown'),
-                    'relevance': 1 - score  # Convert distance to similarity
-                })
+            # Lexical answers first: anything left needs the embedding model
+            dense_needed = []
+            for i, hits in enumerate(lexical):
+                if self.retrieval_mode == 'lexical' or (self.retrieval_mode == 'hybrid' and self._decisive(hits)):
+                    results[i] = self._lexical_documents(hits[:k])
+                    self.search_stats['lexical'] += 1
+                else:
+                    dense_needed.append(i)
             
-            return formatted
+            if dense_needed:
+                query_embeddings = self.embeddings.embed_documents([queries[i] for i in dense_needed])
+                hybrid = self.retrieval_mode == 'hybrid'
+                dense = self.vectorstore.query(query_embeddings, k=k * 2 if hybrid else k, where=where)
+                for i, hits in zip(dense_needed, dense):
+                    if hybrid:
+                        results[i] = self._fuse(queries[i], hits, lexical[i], k)
+                    else:
+                        results[i] = [
+                            make_document(
+                                content=content,
+                                source=metadata.get('source', 'unknown'),
+                                relevance=1 - distance,  # Convert distance to similarity
+                                topic=metadata.get('topic')
+                            )
+                            for content, metadata, distance in hits
+                        ]
+                    self.search_stats['hybrid' if hybrid else 'dense'] += 1
+            return results
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
-            return []
+            return [[] for _ in queries]
+    
+    def _decisive(self, hits: List[Dict]) -> bool:
+        """True if the best BM25 hit matches enough query terms and clearly beats every other document"""
+        if not hits or hits[0]['matched'] < LEXICAL_DECISIVE_MIN_TERMS:
+            return False
+        top_source = self.lexical.entry(hits[0]['id'])[1].get('source')
+        runner_up = next(
+            (hit['score'] for hit in hits[1:] if self.lexical.entry(hit['id'])[1].get('source') != top_source), 0.0
+        )
+        return hits[0]['score'] >= LEXICAL_DECISIVE_MARGIN * runner_up
+    
+    def _lexical_documents(self, hits: List[Dict]) -> List[Dict]:
+        """BM25 hits as documents, relevance scaled so the best hit is 1.0"""
+        top = hits[0]['score'] if hits else 0.0
+        documents = []
+        for hit in hits:
+            content, metadata = self.lexical.entry(hit['id'])
+            documents.append(make_document(
+                content=content,
+                source=metadata.get('source', 'unknown'),
+                relevance=hit['score'] / top if top else 0.0,
+                topic=metadata.get('topic')
+            ))
+        return documents
+    
+    def _fuse(self, query: str, dense_hits: List[tuple], lexical_hits: List[Dict], k: int) -> List[Dict]:
+        """Rank the union of dense and BM25 candidates by a weighted sum of both scores"""
+        candidates = {}
+        for content, metadata, distance in dense_hits:
+            cid = chunk_id(metadata.get('source', 'unknown'), metadata.get('content_hash', ''), metadata.get('chunk', 0))
+            candidates[cid] = {
+                'content': content, 'metadata': metadata,
+                'dense': max(0.0, 1 - distance), 'lexical': self.lexical.score(query, cid)
+            }
+        for hit in lexical_hits:
+            if hit['id'] not in candidates:
+                content, metadata = self.lexical.entry(hit['id'])
+                # Not among the nearest neighbours: count its dense similarity as 0
+                candidates[hit['id']] = {'content': content, 'metadata': metadata, 'dense': 0.0, 'lexical': hit['score']}
+        
+        top_lexical = max((c['lexical'] for c in candidates.values()), default=0.0)
+        weight = HYBRID_DENSE_WEIGHT if top_lexical else 1.0
+        for candidate in candidates.values():
+            lexical = candidate['lexical'] / top_lexical if top_lexical else 0.0
+            candidate['relevance'] = weight * candidate['dense'] + (1 - weight) * lexical
+        
+        ranked = sorted(candidates.values(), key=lambda c: c['relevance'], reverse=True)[:k]
+        return [
+            make_document(content=c['content'], source=c['metadata'].get('source', 'unknown'),
+                          relevance=c['relevance'], topic=c['metadata'].get('topic'))
+            for c in ranked
+        ]
@@ -0,0 +1,185 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import math
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Order matters: longer math forms before plain words
+LEXICAL_TOKEN = re.compile(r"""
+    \\?[a-z]+_\{?[a-z0-9]+\}?     # subscripted names: log_a, a_n, \log_{10}
+  | d/d[a-z]                      # derivative operators: d/dx
+  | \\?[a-z]+'*                   # words, LaTeX commands (\binom, \frac), primes (f')
+  | \d+(?:\.\d+)?                 # numbers
+  | [∫∑∏√π∞≤≥≠±∂∇θ!]              # symbols
+""", re.VERBOSE)
+
+# Spellings of the same concept in problems (plain text, unicode) and KB docs (LaTeX)
+ALIASES = {
+    '∫': 'integral', 'int': 'integral', 'integrate': 'integral', 'integration': 'integral',
+    '∑': 'sum', 'sigma': 'sum', '∏': 'prod', '√': 'sqrt', 'root': 'sqrt',
+    'π': 'pi', '∞': 'infty', 'infinity': 'infty', '≤': 'leq', 'le': 'leq', '≥': 'geq', 'ge': 'geq',
+    '≠': 'neq', 'ne': 'neq', '±': 'pm', '∂': 'partial', '∇': 'nabla', 'θ': 'theta', '!': 'factorial',
+    'ncr': 'binom', 'choose': 'binom', 'combination': 'binom', 'npr': 'permutation',
+    'matrices': 'matrix', 'vertices': 'vertex', 'derivatives': 'derivative', 'differentiate': 'derivative',
+    'ln': 'log', 'dfrac': 'frac'
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for find from given how if in into is it its let of on or
+that the then this to us using what when where which with we you your solve calculate determine
+compute value show prove
+""".split())
+
+
+def _normalize(token: str) -> str:
+    token = token.lstrip("\\").replace("{", "").replace("}", "")
+    token = ALIASES.get(token, token)
+    # Light plural stemming (eigenvalues -> eigenvalue), leaving 'ss' and short words alone
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss") and "_" not in token:
+        token = ALIASES.get(token[:-1], token[:-1])
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms that keep math notation: log_a, d/dx, binom (nCr), f', sqrt (√)"""
+    terms = []
+    for raw in LEXICAL_TOKEN.findall((text or "").lower()):
+        token = _normalize(raw)
+        if token in STOPWORDS:
+            continue
+        if "_" in token:
+            # log_a also counts as log; bare subscripted variables (a_n) keep only the compound
+            base = token.split("_", 1)[0]
+            if len(base) > 1:
+                terms.append(_normalize(base))
+        elif len(token) == 1 and token.isalpha():
+            # Single-letter variables say nothing about the topic
+            continue
+        terms.append(token)
+    return terms
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over KB chunks, persisted as JSON.
+
+    Built alongside the vector index by KnowledgeBase.index (same chunk
+    ids), so lexical search needs no embedding. `search` also reports how
+    many distinct query terms each hit matched.
+    """
+
+    def __init__(self, path: Optional[Path] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict] = {}  # chunk id -> {'text', 'metadata', 'tf', 'length'}
+        self._postings: Dict[str, set] = {}
+        self._total_length = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, chunk_id: str, text: str, metadata: Dict):
+        with self._lock:
+            self.remove([chunk_id])
+            terms = tokenize(text)
+            tf = dict(Counter(terms))
+            self._docs[chunk_id] = {'text': text, 'metadata': dict(metadata or {}), 'tf': tf, 'length': len(terms)}
+            self._total_length += len(terms)
+            for term in tf:
+                self._postings.setdefault(term, set()).add(chunk_id)
+
+    def remove(self, chunk_ids: List[str]):
+        with self._lock:
+            for chunk_id in chunk_ids:
+                doc = self._docs.pop(chunk_id, None)
+                if not doc:
+                    continue
+                self._total_length -= doc['length']
+                for term in doc['tf']:
+                    posting = self._postings.get(term)
+                    if posting:
+                        posting.discard(chunk_id)
+                        if not posting:
+                            del self._postings[term]
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._total_length = 0
+
+    def entry(self, chunk_id: str) -> Tuple[str, Dict]:
+        doc = self._docs[chunk_id]
+        return doc['text'], doc['metadata']
+
+    def search(self, query: str, k: int, where: Optional[Dict] = None) -> List[Dict]:
+        """Top-k chunks as {'id', 'score', 'matched'}, best first"""
+        with self._lock:
+            terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+            if not terms:
+                return []
+            candidates = set().union(*(self._postings[term] for term in terms))
+            hits = []
+            for chunk_id in candidates:
+                doc = self._docs[chunk_id]
+                if where and any(doc['metadata'].get(key) != value for key, value in where.items()):
+                    continue
+                score, matched = self._score(terms, doc)
+                hits.append({'id': chunk_id, 'score': score, 'matched': matched})
+            hits.sort(key=lambda hit: hit['score'], reverse=True)
+            return hits[:k]
+
+    def score(self, query: str, chunk_id: str) -> float:
+        """BM25 score of one chunk for `query` (0 if unknown)"""
+        with self._lock:
+            doc = self._docs.get(chunk_id)
+            if not doc:
+                return 0.0
+            return self._score([term for term in dict.fromkeys(tokenize(query)) if term in self._postings], doc)[0]
+
+    def _score(self, terms: List[str], doc: Dict) -> Tuple[float, int]:
+        n = len(self._docs)
+        avg_length = self._total_length / n if n else 0.0
+        score, matched = 0.0, 0
+        for term in terms:
+            freq = doc['tf'].get(term)
+            if not freq:
+                continue
+            matched += 1
+            df = len(self._postings[term])
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * doc['length'] / avg_length) if avg_length else self.k1
+            score += idf * freq * (self.k1 + 1) / (freq + norm)
+        return score, matched
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            payload = {cid: {'text': d['text'], 'metadata': d['metadata'], 'tf': d['tf']} for cid, d in self._docs.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable lexical index {self.path}: {str(e)}")
+            return
+        for chunk_id, doc in payload.items():
+            length = sum(doc['tf'].values())
+            self._docs[chunk_id] = {**doc, 'length': length}
+            self._total_length += length
+            for term in doc['tf']:
+                self._postings.setdefault(term, set()).add(chunk_id)
@@ -0,0 +1,141 @@
+import logging
+import re
+from typing import Dict, List, Set, Tuple
+
+from src.rag.context import RetrievalContext
+from src.config import SOLVER_CONTEXT_TOKEN_BUDGET, SOLVER_EXAMPLE_TOKEN_SHARE
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token for English/math text with Qwen-style BPE tokenizers
+CHARS_PER_TOKEN = 4
+# Don't bother keeping a truncated piece smaller than this
+MIN_PIECE_TOKENS = 32
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round-trip)"""
+    return -(-len(text or "") // CHARS_PER_TOKEN)
+
+
+def _sentence_key(sentence: str) -> str:
+    return " ".join(sentence.lower().split())
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut `text` to about `max_tokens`, preferring a sentence then a word boundary"""
+    if len(text) <= max_tokens * CHARS_PER_TOKEN:
+        return text
+    limit = max(0, max_tokens * CHARS_PER_TOKEN - len(" ..."))
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return cut[:boundary + 1].rstrip() + " ..." if boundary > 0 else cut
+
+
+class PromptBudget:
+    """Fit a RetrievalContext into a token budget for the solver prompt.
+
+    Documents are ranked by relevance and examples by similarity. Sentences
+    already present in a higher-ranked chunk (chunker overlap, near-duplicate
+    documents) are removed. Examples may use at most `example_share` of the
+    budget; whatever they leave goes to documents. The lowest-ranked item that
+    still fits partly is truncated, the rest are dropped. A budget of 0
+    disables trimming (dedupe still applies).
+    """
+
+    def __init__(self, max_tokens: int = SOLVER_CONTEXT_TOKEN_BUDGET,
+                 example_share: float = SOLVER_EXAMPLE_TOKEN_SHARE):
+        self.max_tokens = max(0, max_tokens)
+        self.example_share = min(max(example_share, 0.0), 1.0)
+
+    def fit(self, retrieval: RetrievalContext) -> Tuple[RetrievalContext, Dict]:
+        """Trimmed copy of `retrieval` and a usage report"""
+        documents, deduped = self._dedupe(sorted(
+            retrieval.documents, key=lambda d: d.get('relevance', 0.0), reverse=True
+        ))
+        examples = sorted(retrieval.examples, key=lambda e: e.get('similarity', 0.0), reverse=True)
+
+        if self.max_tokens:
+            example_budget = int(self.max_tokens * self.example_share)
+            examples, example_tokens = self._fill(examples, example_budget, self._example_cost, self._trim_example)
+            documents, document_tokens = self._fill(documents, self.max_tokens - example_tokens,
+                                                    self._document_cost, self._trim_document)
+        else:
+            example_tokens = sum(self._example_cost(e) for e in examples)
+            document_tokens = sum(self._document_cost(d) for d in documents)
+
+        usage = {
+            'budget': self.max_tokens,
+            'tokens': document_tokens + example_tokens,
+            'document_tokens': document_tokens,
+            'example_tokens': example_tokens,
+            'documents': len(documents),
+            'documents_dropped': len(retrieval.documents) - len(documents),
+            'duplicate_sentences': deduped,
+            'examples': len(examples),
+            'examples_dropped': len(retrieval.examples) - len(examples),
+            'truncated': sum(1 for item in documents + examples if item.get('truncated'))
+        }
+        logger.info(
+            f"Solver context: {usage['tokens']}/{self.max_tokens or 'unlimited'} tokens, "
+            f"{usage['documents']} docs ({usage['documents_dropped']} dropped, {deduped} duplicate sentences), "
+            f"{usage['examples']} examples ({usage['examples_dropped']} dropped), {usage['truncated']} truncated"
+        )
+        fitted = RetrievalContext(query=retrieval.query, documents=documents, examples=examples)
+        return fitted, usage
+
+    def _dedupe(self, documents: List[Dict]) -> Tuple[List[Dict], int]:
+        """Drop sentences already seen in a higher-ranked document"""
+        seen: Set[str] = set()
+        kept, removed = [], 0
+        for doc in documents:
+            sentences = []
+            for sentence in SENTENCE_SPLIT.split(doc.get('content', '')):
+                key = _sentence_key(sentence)
+                if not key:
+                    continue
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+                sentences.append(sentence.strip())
+            if sentences:
+                kept.append({**doc, 'content': " ".join(sentences)})
+        return kept, removed
+
+    def _fill(self, items: List[Dict], budget: int, cost, trim) -> Tuple[List[Dict], int]:
+        """Greedily keep ranked items within `budget`, truncating the first that overflows"""
+        kept, used = [], 0
+        for item in items:
+            tokens = cost(item)
+            if used + tokens <= budget:
+                kept.append(item)
+                used += tokens
+                continue
+            remaining = budget - used
+            if remaining >= MIN_PIECE_TOKENS:
+                item = trim(item, remaining)
+                kept.append(item)
+                used += cost(item)
+            break
+        return kept, used
+
+    # Costs mirror RetrievalContext.format_documents / format_examples
+
+    def _document_cost(self, doc: Dict) -> int:
+        return estimate_tokens(f"Source 00: {doc.get('source', 'Unknown')}\n{doc.get('content', '')}\n\n")
+
+    def _example_cost(self, example: Dict) -> int:
+        return estimate_tokens(f"Problem: {example.get('problem', '')}\nSolution: {example.get('solution', '')}\n---\n")
+
+    def _trim_document(self, doc: Dict, max_tokens: int) -> Dict:
+        overhead = self._document_cost({**doc, 'content': ''})
+        return {**doc, 'content': _truncate(doc.get('content', ''), max_tokens - overhead), 'truncated': True}
+
+    def _trim_example(self, example: Dict, max_tokens: int) -> Dict:
+        overhead = self._example_cost({**example, 'solution': ''})
+        return {**example, 'solution': _truncate(example.get('solution', ''), max_tokens - overhead), 'truncated': True}
@@ -0,0 +1,32 @@
+"""Bring the knowledge-base vector store up to date with RAG_DOCS_PATH.
+
+    python -m src.rag.reindex            # embed new/changed files, drop removed ones
+    python -m src.rag.reindex --force    # re-embed everything
+"""
+
+import argparse
+import json
+
+from src.rag.knowledge_base import KnowledgeBase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally index the math knowledge base")
+    parser.add_argument("--force", action="store_true", help="Drop the index and re-embed every document")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = KnowledgeBase(auto_index=False).index(force=args.force)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Files:  {report['files']} ({report['added']} added, {report['updated']} updated, "
+          f"{report['removed']} removed, {report['unchanged']} unchanged)")
+    print(f"Chunks: {report['chunks']} indexed ({report['chunks_added']} embedded, "
+          f"{report['chunks_deleted']} deleted)")
+    print(f"Time:   {report['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.rag.knowledge_base import KnowledgeBase
 import logging
 
@@ -10,6 +10,10 @@ class RAGRetriever:
     def __init__(self, kb: KnowledgeBase):
         self.kb = kb
     
-    def retrieve(self, query: str, k: int = 5) -> List[Dict]:
-        """Retrieve top-k relevant documents"""
-        return self.kb.search(query, k=k)
+    def retrieve(self, query: str, k: int = 5, topic: Optional[str] = None) -> List[Dict]:
+        """Retrieve top-k relevant documents (restricted to `topic` if given)"""
+        return self.kb.search(query, k=k, topic=topic)
+
+    def retrieve_many(self, queries: List[str], k: int = 5) -> List[List[Dict]]:
+        """Retrieve top-k documents for several queries in one batch"""
+        return self.kb.search_many(queries, k=k)
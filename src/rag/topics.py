@@ -0,0 +1,82 @@
+import re
+from typing import Tuple
+
+from src.config import SUPPORTED_TOPICS
+
+GENERAL_TOPIC = "general"
+
+# Title keywords per topic and subtopic, checked in order (first match wins)
+TOPIC_KEYWORDS = {
+    "linear_algebra": ["linear algebra", "matri", "determinant", "eigen"],
+    "probability": ["probabilit", "bayes", "distribution"],
+    "calculus": ["calculus", "limit", "continuity", "derivative", "differentiation", "integra", "optimization"],
+    "algebra": ["algebra", "equation", "polynomial", "inequalit", "logarithm", "exponential",
+                "sequence", "series", "binomial", "trigonometr"],
+}
+SUBTOPIC_KEYWORDS = {
+    "systems": ["system"],
+    "quadratic_equations": ["quadratic"],
+    "linear_equations": ["linear equation"],
+    "polynomials": ["polynomial"],
+    "inequalities": ["inequalit"],
+    "conditional_probability": ["conditional", "bayes", "tree"],
+    "distributions": ["distribution"],
+    "basic_probability": ["probabilit"],
+    "limits": ["limit", "continuity"],
+    "derivatives": ["derivative", "differentiation"],
+    "integrals": ["integra"],
+    "optimization": ["optimization"],
+    "determinants": ["determinant"],
+    "eigenvalues": ["eigen"],
+    "matrices": ["matri"],
+}
+
+TITLE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+LABEL = re.compile(r"\(([^)]+)\)\s*$")
+EQUATION = re.compile(r"=(?!=)")
+
+
+def classify_document(filename: str, content: str) -> Tuple[str, str]:
+    """(topic, subtopic) of a KB document, from SUPPORTED_TOPICS or 'general'.
+
+    The topic comes from the title's label, e.g. "# Matrices (Linear Algebra)",
+    when it names a supported topic; otherwise from keywords in the title and
+    filename. The subtopic is the first matching subtopic of that topic.
+    """
+    match = TITLE.search(content or "")
+    title = match.group(1).strip() if match else ""
+    text = f"{title} {filename.replace('-', ' ')}".lower()
+
+    topic = None
+    label = LABEL.search(title)
+    if label:
+        candidate = label.group(1).strip().lower().replace(" ", "_")
+        if candidate in SUPPORTED_TOPICS:
+            topic = candidate
+    if topic is None:
+        topic = next(
+            (name for name, keywords in TOPIC_KEYWORDS.items() if any(k in text for k in keywords)),
+            GENERAL_TOPIC
+        )
+    if topic == GENERAL_TOPIC:
+        return topic, GENERAL_TOPIC
+
+    subtopic = next(
+        (name for name, keywords in SUBTOPIC_KEYWORDS.items()
+         if name in SUPPORTED_TOPICS[topic] and any(k in text for k in keywords)),
+        GENERAL_TOPIC
+    )
+    return topic, subtopic
+
+
+def guess_problem_topic(problem_text: str) -> str:
+    """Cheap topic guess for a raw problem, before the router has answered.
+
+    Uses the same keywords as the KB titles; a bare equation counts as
+    algebra. 'general' when nothing matches.
+    """
+    text = (problem_text or "").lower()
+    topic = next((name for name, keywords in TOPIC_KEYWORDS.items() if any(k in text for k in keywords)), None)
+    if topic is None and EQUATION.search(text):
+        topic = "algebra"
+    return topic or GENERAL_TOPIC
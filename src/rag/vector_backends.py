@@ -0,0 +1,354 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import threading
+
+import numpy as np
+
+from src.config import (
+    CHROMA_DB_PATH, VECTOR_BACKEND, VECTOR_INDEX_PATH, FAISS_INDEX_TYPE, FAISS_IVF_NLIST, FAISS_IVF_NPROBE
+)
+
+logger = logging.getLogger(__name__)
+
+# (text, metadata, distance) - distance is squared L2, like Chroma's default space
+Hit = Tuple[str, Dict, float]
+
+
+def _matches(metadata: Dict, where: Optional[Dict]) -> bool:
+    return not where or all(metadata.get(key) == value for key, value in where.items())
+
+
+def _chroma_where(where: Optional[Dict]) -> Optional[Dict]:
+    """Chroma needs an explicit $and for more than one condition"""
+    if not where or len(where) == 1:
+        return where or None
+    return {'$and': [{key: value} for key, value in where.items()]}
+
+
+class VectorBackend(ABC):
+    """Storage and nearest-neighbour search for precomputed embeddings.
+
+    Callers embed texts themselves (KnowledgeBase, MemoryStore) and hand
+    the vectors over, so every backend returns comparable squared-L2
+    distances. `where` filters on exact metadata values. Writes may be
+    buffered until `flush()`; reads always see them.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: List[List[float]], texts: List[str], metadatas: List[Dict]):
+        """Insert or replace entries by id"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Remove entries by id (unknown ids are ignored)"""
+
+    @abstractmethod
+    def query(self, embeddings: List[List[float]], k: int, where: Optional[Dict] = None) -> List[List[Hit]]:
+        """k nearest entries for each query embedding, closest first"""
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        """Ids of every stored entry"""
+
+    def count(self) -> int:
+        return len(self.ids())
+
+    def flush(self):
+        """Persist buffered writes (no-op for backends that write through)"""
+
+
+class ChromaBackend(VectorBackend):
+    """Chroma collection (SQLite-backed, persisted in CHROMA_DB_PATH)"""
+
+    name = "chroma"
+
+    def __init__(self, collection_name: str, persist_directory: Path = CHROMA_DB_PATH):
+        from langchain_community.vectorstores import Chroma
+        self.store = Chroma(collection_name=collection_name, persist_directory=str(persist_directory))
+        self.collection = self.store._collection
+
+    def add(self, ids, embeddings, texts, metadatas):
+        if ids:
+            self.collection.upsert(ids=list(ids), embeddings=[list(e) for e in embeddings],
+                                   documents=list(texts), metadatas=list(metadatas))
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def query(self, embeddings, k, where=None):
+        if not embeddings:
+            return []
+        count = self.collection.count()
+        if not count:
+            return [[] for _ in embeddings]
+        results = self.collection.query(
+            query_embeddings=[list(e) for e in embeddings],
+            n_results=min(k, count),
+            where=_chroma_where(where),
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [(text, metadata or {}, distance) for text, metadata, distance in zip(texts, metadatas, distances)]
+            for texts, metadatas, distances in zip(results['documents'], results['metadatas'], results['distances'])
+        ]
+
+    def ids(self):
+        return self.collection.get(include=[])['ids']
+
+    def count(self):
+        return self.collection.count()
+
+
+class NumpyBackend(VectorBackend):
+    """Exact in-process search over a float32 matrix.
+
+    Persisted as `<name>.npy` (memory-mapped on load) plus `<name>.json`
+    with ids, texts and metadata under VECTOR_INDEX_PATH. Adds are buffered
+    until the next read; new ids are then appended to the matrix (which
+    keeps spare rows, like a list), and only replaced ids force a rebuild.
+    Both files are rewritten only by `flush()`, so indexing n files costs
+    one write and callers choose how often to persist.
+    """
+
+    name = "numpy"
+
+    def __init__(self, collection_name: str, directory: Path = VECTOR_INDEX_PATH):
+        self.directory = Path(directory)
+        self.vectors_path = self.directory / f"{collection_name}.npy"
+        self.entries_path = self.directory / f"{collection_name}.json"
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._buffer: Optional[np.ndarray] = None  # _vectors is a view of its first rows
+        self._pending: List[Tuple[List[str], np.ndarray, List[str], List[Dict]]] = []
+        self._dirty = False
+        self._load()
+
+    def add(self, ids, embeddings, texts, metadatas):
+        if not ids:
+            return
+        with self._lock:
+            vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+            self._pending.append((list(ids), vectors, list(texts), [dict(m or {}) for m in metadatas]))
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            self._merge_pending()
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    def delete(self, ids):
+        with self._lock:
+            self._merge_pending()
+            removed = set(ids)
+            keep = [i for i, entry_id in enumerate(self._ids) if entry_id not in removed]
+            if len(keep) == len(self._ids):
+                return
+            self._set([self._ids[i] for i in keep], [self._texts[i] for i in keep],
+                      [self._metadatas[i] for i in keep], self._vectors[keep])
+
+    def query(self, embeddings, k, where=None):
+        if not embeddings:
+            return []
+        with self._lock:
+            self._merge_pending()
+            rows = np.arange(len(self._ids))
+            if where:
+                rows = np.array([i for i in rows if _matches(self._metadatas[i], where)], dtype=np.int64)
+            queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+            if not len(rows) or not len(queries):
+                return [[] for _ in embeddings]
+            positions, distances = self._search(queries, rows, min(k, len(rows)))
+            return [
+                [(self._texts[i], self._metadatas[i], float(d)) for i, d in zip(row_ids, row_distances) if i >= 0]
+                for row_ids, row_distances in zip(positions, distances)
+            ]
+
+    def ids(self):
+        with self._lock:
+            self._merge_pending()
+            return list(self._ids)
+
+    def _search(self, queries: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force squared L2 over `rows`: ||q||^2 + ||x||^2 - 2 q.x"""
+        vectors = self._vectors[rows]
+        distances = (
+            (queries ** 2).sum(axis=1)[:, None]
+            + (vectors ** 2).sum(axis=1)[None, :]
+            - 2 * queries @ vectors.T
+        )
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1)
+        return rows[np.take_along_axis(top, order, axis=1)], np.maximum(np.take_along_axis(top_distances, order, axis=1), 0)
+
+    def _merge_pending(self):
+        """Fold buffered adds into the matrix: an append for new ids, else one rebuild"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        new_ids = [entry_id for ids, _, _, _ in pending for entry_id in ids]
+        # A later add of the same id replaces the earlier one
+        latest = {entry_id: position for position, entry_id in enumerate(new_ids)}
+        positions = sorted(latest.values())
+        new_vectors = np.vstack([vectors for _, vectors, _, _ in pending])[positions]
+        new_texts = [text for _, _, texts, _ in pending for text in texts]
+        new_metadatas = [metadata for _, _, _, metadatas in pending for metadata in metadatas]
+
+        if len(latest) == len(new_ids) and latest.keys().isdisjoint(self._ids) \
+                and (not self._ids or new_vectors.shape[1] == self._vectors.shape[1]):
+            self._append(new_ids, new_texts, new_metadatas, new_vectors)
+            return
+
+        keep = [i for i, entry_id in enumerate(self._ids) if entry_id not in latest]
+        self._set(
+            [self._ids[i] for i in keep] + [new_ids[p] for p in positions],
+            [self._texts[i] for i in keep] + [new_texts[p] for p in positions],
+            [self._metadatas[i] for i in keep] + [new_metadatas[p] for p in positions],
+            np.vstack([self._vectors[keep], new_vectors]) if keep else new_vectors
+        )
+
+    def _append(self, ids, texts, metadatas, vectors: np.ndarray):
+        """Add new entries at the end, growing the spare rows geometrically"""
+        count, needed = len(self._ids), len(self._ids) + len(ids)
+        if self._buffer is None or len(self._buffer) < needed:
+            self._buffer = np.empty((max(needed, 2 * count, 64), vectors.shape[1]), dtype=np.float32)
+            if count:
+                self._buffer[:count] = self._vectors
+        self._buffer[count:needed] = vectors
+        self._vectors = self._buffer[:needed]
+        self._ids, self._texts, self._metadatas = self._ids + ids, self._texts + texts, self._metadatas + metadatas
+        self._dirty = True
+        self._appended(self._vectors[count:])
+
+    def _set(self, ids, texts, metadatas, vectors):
+        self._ids, self._texts, self._metadatas = ids, texts, metadatas
+        self._vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._buffer = None
+        self._dirty = True
+        self._changed()
+
+    def _changed(self):
+        """Hook for subclasses that keep a derived index"""
+
+    def _appended(self, vectors: np.ndarray):
+        """Hook for subclasses that keep a derived index: `vectors` were added at the end"""
+        self._changed()
+
+    def _load(self):
+        if not (self.vectors_path.exists() and self.entries_path.exists()):
+            return
+        try:
+            entries = json.loads(self.entries_path.read_text(encoding='utf-8'))
+            vectors = np.load(self.vectors_path, mmap_mode='r')
+        except Exception as e:
+            logger.error(f"Failed to load vector index {self.vectors_path}: {str(e)}")
+            return
+        if len(entries['ids']) != len(vectors):
+            logger.error(f"Vector index {self.vectors_path} does not match its entries; starting empty")
+            return
+        self._ids, self._texts, self._metadatas = entries['ids'], entries['texts'], entries['metadatas']
+        self._vectors = vectors
+        self._changed()
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to temp files and swap them in, so a crash never leaves a half-written index
+        tmp_vectors = self.vectors_path.with_name(self.vectors_path.stem + ".tmp.npy")
+        tmp_entries = self.entries_path.with_suffix(".tmp")
+        np.save(tmp_vectors, self._vectors)
+        tmp_entries.write_text(json.dumps({'ids': self._ids, 'texts': self._texts, 'metadatas': self._metadatas}),
+                               encoding='utf-8')
+        tmp_vectors.replace(self.vectors_path)
+        tmp_entries.replace(self.entries_path)
+
+
+class FaissBackend(NumpyBackend):
+    """NumpyBackend storage searched through a FAISS index.
+
+    'flat' is exact (IndexFlatL2); 'ivf' (IndexIVFFlat) probes `nprobe` of
+    `nlist` clusters and needs ~40 vectors per cluster to train, so smaller
+    collections use a flat index. Appended vectors are added to the
+    existing index; it is rebuilt only when entries are replaced or
+    removed, or when an 'ivf' collection grows large enough to train.
+    Filtered queries search the matching rows exactly.
+    """
+
+    name = "faiss"
+
+    def __init__(self, collection_name: str, directory: Path = VECTOR_INDEX_PATH,
+                 index_type: str = FAISS_INDEX_TYPE, nlist: int = FAISS_IVF_NLIST, nprobe: int = FAISS_IVF_NPROBE):
+        import faiss
+        self.faiss = faiss
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.index = None
+        super().__init__(collection_name, directory)
+
+    def query(self, embeddings, k, where=None):
+        if where:
+            return super().query(embeddings, k, where)
+        if not embeddings:
+            return []
+        with self._lock:
+            self._merge_pending()
+            queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+            if self.index is None or not len(queries):
+                return [[] for _ in embeddings]
+            distances, positions = self.index.search(queries, min(k, len(self._ids)))
+            return [
+                [(self._texts[i], self._metadatas[i], float(d)) for i, d in zip(row_ids, row_distances) if i >= 0]
+                for row_ids, row_distances in zip(positions, distances)
+            ]
+
+    def _changed(self):
+        if not len(self._ids):
+            self.index = None
+            return
+        vectors = np.ascontiguousarray(self._vectors, dtype=np.float32)
+        dimension = vectors.shape[1]
+        if self.index_type == "ivf" and len(vectors) >= self.nlist * 39:
+            index = self.faiss.IndexIVFFlat(self.faiss.IndexFlatL2(dimension), dimension, self.nlist)
+            index.train(vectors)
+            index.nprobe = self.nprobe
+        else:
+            index = self.faiss.IndexFlatL2(dimension)
+        index.add(vectors)
+        self.index = index
+
+    def _appended(self, vectors):
+        outgrown = (self.index_type == "ivf" and isinstance(self.index, self.faiss.IndexFlatL2)
+                    and len(self._ids) >= self.nlist * 39)
+        if self.index is None or outgrown:
+            self._changed()
+        else:
+            self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+
+BACKENDS = {
+    'chroma': ChromaBackend,
+    'numpy': NumpyBackend,
+    'faiss': FaissBackend
+}
+
+
+def make_vector_backend(collection_name: str, backend: str = VECTOR_BACKEND) -> VectorBackend:
+    """Build the configured backend for `collection_name` (falls back to numpy without faiss)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    try:
+        return BACKENDS[backend](collection_name)
+    except ImportError:
+        logger.warning(f"Vector backend '{backend}' is not installed, using numpy")
+        return NumpyBackend(collection_name)
@@ -3,9 +3,12 @@
 from src.utils.validators import MathValidator
 from src.utils.formatters import MathFormatter
 from src.utils.logging_config import setup_logging
+from src.utils.events import emit_event, is_streaming
 
 __all__ = [
     'MathValidator',
     'MathFormatter',
-    'setup_logging'
+    'setup_logging',
+    'emit_event',
+    'is_streaming'
 ]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional
+
+from src.utils.events import current_stage
+
+# time.monotonic() by which the current request must finish (None = no deadline)
+current_deadline: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+# Stages skipped or shortened to stay within the deadline, shared by all nodes of a request
+current_degradations: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar('degraded_stages', default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's deadline passed before an operation finished"""
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one"""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def budget_below(seconds: float) -> bool:
+    """True if the request has a deadline and less than `seconds` are left"""
+    remaining = remaining_budget()
+    return remaining is not None and remaining < seconds
+
+
+async def with_deadline(awaitable: Awaitable) -> Any:
+    """Await `awaitable`, cancelling it when the request deadline passes"""
+    remaining = remaining_budget()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Request deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded("Request deadline exceeded") from e
+
+
+def note_degraded(reason: str, stage: Optional[str] = None, **details: Any):
+    """Record that a stage was skipped or truncated because of the deadline"""
+    degradations = current_degradations.get()
+    if degradations is None:
+        return
+    degradations.append({
+        'stage': stage or current_stage.get(),
+        'reason': reason,
+        'remaining': round(remaining_budget() or 0.0, 2),
+        **details
+    })
@@ -0,0 +1,29 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# Queue receiving workflow events for the current request (set by solve_stream)
+current_event_sink: ContextVar[Optional[asyncio.Queue]] = ContextVar('event_sink', default=None)
+# Graph node currently executing in this task (set by the workflow's stage wrapper)
+current_stage: ContextVar[Optional[str]] = ContextVar('current_stage', default=None)
+
+# Event types
+STAGE_STARTED = "stage_started"
+TOKEN = "token"
+STAGE_FINISHED = "stage_finished"
+RESULT = "result"
+
+
+def is_streaming() -> bool:
+    """True when someone is consuming events for the current request"""
+    return current_event_sink.get() is not None
+
+
+def emit_event(event_type: str, stage: str = None, **data: Any) -> None:
+    """Push an event to the current request's sink (no-op when not streaming)"""
+    sink = current_event_sink.get()
+    if sink is None:
+        return
+    event: Dict[str, Any] = {'type': event_type, 'stage': stage or current_stage.get()}
+    event.update(data)
+    sink.put_nowait(event)
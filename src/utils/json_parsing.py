@@ -0,0 +1,100 @@
+import copy
+import json
+import re
+from typing import Any, Dict, Tuple
+
+FENCED_BLOCK = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def extract_json(response: str) -> Dict[str, Any]:
+    """Extract the first JSON object from an LLM response.
+
+    Handles markdown code fences, prose before/after the object and
+    trailing commas. Raises ValueError when no object can be decoded or
+    the response is a top-level array or scalar.
+    """
+    text = (response or "").strip()
+
+    # Prefer the content of a fenced block if there is one
+    fenced = FENCED_BLOCK.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    # A bare array or scalar is valid JSON but not an object; don't dig objects out of it
+    try:
+        whole = json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    else:
+        if not isinstance(whole, dict):
+            raise ValueError("JSON value is not an object")
+        return whole
+
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object in response")
+
+    decoder = json.JSONDecoder()
+    candidate = text[start:]
+    try:
+        obj, _ = decoder.raw_decode(candidate)
+    except json.JSONDecodeError:
+        # Small models often leave trailing commas; retry on the outermost braces without them
+        end = candidate.rfind("}")
+        cleaned = re.sub(r",\s*([}\]])", r"\1", candidate[:end + 1])
+        try:
+            obj = json.loads(cleaned)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in response: {e}") from e
+
+    if not isinstance(obj, dict):
+        raise ValueError("JSON value is not an object")
+    return obj
+
+
+def _coerce(value: Any, expected: type, default: Any) -> Any:
+    if isinstance(value, expected) and not (expected is not bool and isinstance(value, bool)):
+        return value
+    try:
+        if expected is float:
+            return float(value)
+        if expected is int:
+            return int(value)
+        if expected is bool:
+            if isinstance(value, str):
+                return value.strip().lower() in ("true", "yes", "1")
+            return bool(value)
+        if expected is str:
+            return "" if value is None else str(value)
+        if expected is list:
+            if value in (None, ""):
+                return []
+            return [value]
+    except (TypeError, ValueError):
+        pass
+    return default
+
+
+def validate_fields(data: Dict[str, Any], schema: Dict[str, Tuple[type, Any]]) -> Dict[str, Any]:
+    """Return `data` restricted to `schema`, with missing or mistyped fields defaulted.
+
+    schema: {field: (expected_type, default)}
+    """
+    validated = {}
+    for field, (expected, default) in schema.items():
+        if field in data:
+            validated[field] = _coerce(data[field], expected, copy.copy(default))
+        else:
+            validated[field] = copy.copy(default)
+    return validated
+
+
+def parse_llm_json(response: str, schema: Dict[str, Tuple[type, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Extract and validate a JSON object; returns (data, ok).
+
+    When no object can be extracted, `data` is the schema defaults and ok is False.
+    """
+    try:
+        return validate_fields(extract_json(response), schema), True
+    except ValueError:
+        return validate_fields({}, schema), False
@@ -0,0 +1,307 @@
+import ast
+import asyncio
+import math
+import operator
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+# Instruction phrases stripped before parsing an equation
+EQUATION_LEAD_INS = ["solve for x:", "solve for", "solve:", "calculate:", "find x:", "equation:"]
+
+# Numbers, single-letter variables and operators: the math content of a problem statement
+MATH_TOKEN = re.compile(r"\*\*|\d+(?:\.\d+)?|(?<![a-z])[a-z](?![a-z])|[+\-*/^=()]")
+OPERATORS = set("+-*/^=")
+
+# Arithmetic the calculator accepts; ** only with a small literal exponent
+ARITHMETIC_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow
+}
+MAX_EXPONENT = 100
+MAX_DIGITS = 100  # Every operand and intermediate result stays below 10**MAX_DIGITS
+MAX_MAGNITUDE = 10 ** MAX_DIGITS
+MAX_TERMS = 1000  # Terms an expression may expand to before it goes to SymPy
+
+# SymPy calls can't be interrupted: a call that outlives its time limit keeps
+# its worker until it finishes. They get their own small pool so a runaway
+# call never ties up asyncio's default executor.
+SYMPY_WORKERS = 2
+_sympy_executor = ThreadPoolExecutor(max_workers=SYMPY_WORKERS, thread_name_prefix="sympy")
+
+# "2x", "3(x + 1)", "x(x - 1)", "(x + 1)2" -> explicit products, so one side of an equation parses as Python
+IMPLICIT_PRODUCT = re.compile(r"(?<=[\d)a-z])\s*(?=[(a-z])|(?<=[)a-z])\s*(?=\d)")
+
+
+def clean_equation(equation: str) -> str:
+    """Normalize an equation string the way the sympy tool expects it"""
+    clean_eqn = equation.lower()
+    for trash in EQUATION_LEAD_INS:
+        clean_eqn = clean_eqn.replace(trash, "")
+
+    # Replace unicode powers
+    clean_eqn = clean_eqn.replace("²", "**2").replace("³", "**3")
+
+    # Normalize equality
+    return clean_eqn.strip().replace("==", "=")
+
+
+def parse_equation(equation: str) -> Tuple[Any, Any]:
+    """Parse "lhs = rhs" (or a bare expression, meaning "= 0") into sympy expressions"""
+    from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
+
+    sanitized_eqn = clean_equation(equation)
+
+    # Transformations for implicit multiplication (e.g. "5x" -> "5*x")
+    transformations = (standard_transformations + (implicit_multiplication_application,))
+
+    if "=" in sanitized_eqn:
+        lhs_str, sep, rhs_str = sanitized_eqn.partition("=")
+    else:
+        lhs_str, rhs_str = sanitized_eqn, "0"
+
+    # Use parse_expr instead of sympify to handle "5x"
+    lhs = parse_expr(lhs_str, transformations=transformations)
+    rhs = parse_expr(rhs_str, transformations=transformations)
+    return lhs, rhs
+
+
+def solve_equation(equation: str) -> Tuple[List[Any], List[Any]]:
+    """Solve an equation symbolically, returning (symbols, solutions).
+
+    Raises ValueError if the equation has no variables.
+    """
+    from sympy import Eq, solve
+
+    lhs, rhs = parse_equation(equation)
+    free_symbols = sorted(lhs.free_symbols.union(rhs.free_symbols), key=str)
+    if not free_symbols:
+        raise ValueError("No variables found")
+
+    return free_symbols, solve(Eq(lhs, rhs), free_symbols)
+
+
+def sympy_solve(equation: str) -> str:
+    """Tool wrapper around solve_equation: always returns text"""
+    try:
+        _, sol = solve_equation(equation)
+        return str(sol)
+    except ValueError as e:
+        return str(e)
+    except Exception as e:
+        return f"Symbolic solving error: {str(e)} \n(Input: {equation})"
+
+
+def _literal_exponent(node: ast.AST) -> Optional[float]:
+    """The exponent if `node` is a numeric literal (optionally signed), else None"""
+    sign = 1
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        sign = -1 if isinstance(node.op, ast.USub) else 1
+        node = node.operand
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return sign * node.value
+    return None
+
+
+def _evaluate_node(node: ast.AST) -> Any:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _evaluate_node(node.operand)
+        if isinstance(node.op, ast.USub):
+            value = -value
+    elif isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC_OPERATORS:
+        left = _evaluate_node(node.left)
+        if isinstance(node.op, ast.Pow):
+            right = _literal_exponent(node.right)
+            if right is None or abs(right) > MAX_EXPONENT:
+                raise ValueError(f"Exponents must be numbers up to {MAX_EXPONENT}")
+            # Size check before computing: 9**99 is fine, 99999**99 is not
+            if left and right * math.log10(abs(left)) > MAX_DIGITS:
+                raise ValueError("Result too large")
+        else:
+            right = _evaluate_node(node.right)
+        value = ARITHMETIC_OPERATORS[type(node.op)](left, right)
+    else:
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+    if isinstance(value, complex):
+        raise ValueError("Result is not a real number")
+    if abs(value) > MAX_MAGNITUDE:
+        raise ValueError("Result too large")
+    return value
+
+
+def evaluate_arithmetic(expression: str) -> Any:
+    """Evaluate numbers, + - * / and parentheses (raises on anything else).
+
+    Walks the AST instead of calling eval: ** needs a literal exponent up to
+    MAX_EXPONENT and every value stays below MAX_MAGNITUDE, so inputs like
+    9**(99*99*99*99) are rejected instead of pinning the CPU.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {expression}") from e
+    return _evaluate_node(tree.body)
+
+
+def _expansion_size(node: ast.AST, variables: int) -> Tuple[float, float, int]:
+    """Upper bounds on (degree, digits, terms) of `node` once fully expanded.
+
+    Raises ValueError for anything other than numbers, names, + - * / and
+    ** with a literal exponent.
+    """
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return 0, abs(math.log10(abs(node.value))) if node.value else 0, 1
+    if isinstance(node, ast.Name):
+        return 1, 0, 1
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        return _expansion_size(node.operand, variables)
+    if not (isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC_OPERATORS):
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+    degree, digits, terms = _expansion_size(node.left, variables)
+    if isinstance(node.op, ast.Pow):
+        exponent = _literal_exponent(node.right)
+        if exponent is None:
+            raise ValueError("Exponent is not a number")
+        power = math.ceil(abs(exponent))
+        degree, digits = degree * abs(exponent), digits * abs(exponent)
+        terms = math.comb(terms + power - 1, power) if power else 1
+    else:
+        right_degree, right_digits, right_terms = _expansion_size(node.right, variables)
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            degree, digits, terms = max(degree, right_degree), max(digits, right_digits), terms + right_terms
+        else:
+            degree, digits, terms = degree + right_degree, digits + right_digits, terms * right_terms
+
+    # A polynomial of this degree in this many variables has no more terms than that
+    return degree, digits, min(terms, math.comb(math.ceil(degree) + variables, variables))
+
+
+def has_bounded_powers(expression: str, max_exponent: int = MAX_EXPONENT) -> bool:
+    """True if an expression or "lhs = rhs" equation is small enough to hand to SymPy.
+
+    Every ** needs a literal exponent up to `max_exponent`, and once expanded
+    each side must have degree at most `max_exponent`, numbers below
+    10**MAX_DIGITS and at most MAX_TERMS terms. SymPy would otherwise try
+    to expand x = 9**(99*99*99*99) or ((x + 1)**100)**100 exactly, and
+    there is no way to stop it once it has started.
+    """
+    sides = []
+    for side in clean_equation(expression).replace("^", "**").split("="):
+        try:
+            sides.append(ast.parse(IMPLICIT_PRODUCT.sub("*", side.strip()), mode='eval'))
+        except SyntaxError:
+            return False
+
+    names: Set[str] = {node.id for tree in sides for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    for tree in sides:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+                exponent = _literal_exponent(node.right)
+                if exponent is None or abs(exponent) > max_exponent:
+                    return False
+        try:
+            degree, digits, terms = _expansion_size(tree.body, max(1, len(names)))
+        except (ValueError, RecursionError):
+            return False
+        if degree > max_exponent or digits > MAX_DIGITS or terms > MAX_TERMS:
+            return False
+    return True
+
+
+async def run_sympy(function: Callable, *args, timeout: float) -> Any:
+    """Run a SymPy helper on the SymPy worker pool; raises asyncio.TimeoutError after `timeout`.
+
+    The time limit only stops the wait: the call itself runs to completion
+    in the background, so check input with has_bounded_powers first.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(_sympy_executor, function, *args), timeout)
+
+
+def python_calculate(expression: str) -> str:
+    """Tool wrapper around evaluate_arithmetic: always returns text"""
+    try:
+        return str(evaluate_arithmetic(expression))
+    except:
+        return "Calculation error"
+
+
+def _math_expression(text: str) -> Tuple[List[str], str]:
+    """Math tokens of `text` and the expression they form when joined"""
+    tokens = MATH_TOKEN.findall(clean_equation(text or ""))
+    return tokens, "".join(tokens).replace("^", "**")
+
+
+def structure_signature(text: str) -> Optional[str]:
+    """Canonical form of the math in a problem statement, or None if it has none.
+
+    Equations and expressions are compared symbolically (so "2x + 3 = 7" and
+    "3 + 2*x = 7" match); anything SymPy can't parse falls back to the
+    sequence of numbers, variables and operators, as does anything with
+    powers too large to expand cheaply.
+    """
+    from sympy import expand
+
+    tokens, expression = _math_expression(text)
+    if not any(token[0].isdigit() for token in tokens):
+        return None
+
+    if OPERATORS & set(tokens) and expression.count("=") <= 1 and has_bounded_powers(expression):
+        try:
+            lhs, rhs = parse_equation(expression)
+            moved = expand(lhs - rhs)
+            if "=" in expression:
+                # a = b and b = a are the same equation
+                return "eq:" + min(str(moved), str(-moved))
+            return "expr:" + str(moved)
+        except Exception:
+            pass
+    return "tokens:" + " ".join(tokens)
+
+
+def check_solution(text: str, answer: str) -> Optional[bool]:
+    """Substitute a stored answer ("x = 2 or x = -2", "5") into the equation in `text`.
+
+    Returns None when there is no single-variable equation, the answer
+    can't be parsed, or either has powers too large for SymPy, so the
+    caller can decide how to treat "unknown".
+    """
+    from sympy import expand, simplify
+    from sympy.parsing.sympy_parser import parse_expr, standard_transformations, implicit_multiplication_application
+
+    _, expression = _math_expression(text)
+    if expression.count("=") != 1 or not answer or not has_bounded_powers(expression):
+        return None
+
+    try:
+        lhs, rhs = parse_equation(expression)
+        moved = expand(lhs - rhs)
+        if len(moved.free_symbols) != 1:
+            return None
+        variable = next(iter(moved.free_symbols))
+
+        transformations = (standard_transformations + (implicit_multiplication_application,))
+        values = []
+        for part in re.split(r",|;|\bor\b|\band\b|\n", clean_equation(answer)):
+            part = part.strip().strip("$.")
+            if not part:
+                continue
+            name, sep, value = part.rpartition("=")
+            if sep and name.strip() != str(variable):
+                return None
+            if not has_bounded_powers(value):
+                return None
+            values.append(parse_expr(value.strip(), transformations=transformations))
+        if not values:
+            return None
+
+        return all(simplify(moved.subs(variable, value)) == 0 for value in values)
+    except Exception:
+        return None
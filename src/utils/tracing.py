@@ -0,0 +1,44 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# {'recorder': TraceRecorder, 'problem_id': str} for the request being traced
+current_trace: ContextVar[Optional[Dict[str, Any]]] = ContextVar('current_trace', default=None)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@contextmanager
+def trace_span(kind: str, name: str, **fields: Any):
+    """Time a block and record it to the current request's trace recorder.
+
+    Yields a dict the caller can fill with extra fields (queue_wait,
+    prompt_tokens, completion_tokens, confidence, success, data). The span
+    is marked unsuccessful if the block raises. Without an active trace
+    this only measures time.
+    """
+    span: Dict[str, Any] = dict(fields)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span['success'] = False
+        raise
+    finally:
+        span['execution_time'] = time.perf_counter() - started
+        trace = current_trace.get()
+        if trace is not None:
+            trace['recorder'].record(
+                agent_name=name,
+                kind=kind,
+                problem_id=trace.get('problem_id'),
+                **span
+            )
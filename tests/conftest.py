@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Point every store at a scratch directory before src.config is imported
+_data_dir = tempfile.mkdtemp(prefix="mathmentor-tests-")
+for _name, _value in {
+    'CHROMA_DB_PATH': os.path.join(_data_dir, "chroma_db"),
+    'VECTOR_INDEX_PATH': os.path.join(_data_dir, "vector_index"),
+    'MEMORY_DB_PATH': os.path.join(_data_dir, "memory.db"),
+    'LLM_CACHE_PATH': os.path.join(_data_dir, "llm_cache.db"),
+    'ENABLE_RESULT_CACHE': "false",
+    'ENABLE_LLM_CACHE': "false",
+    'ENABLE_TRACING': "false",
+    'KB_AUTO_INDEX': "false",
+}.items():
+    os.environ.setdefault(_name, _value)
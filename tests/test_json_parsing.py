@@ -0,0 +1,133 @@
+import pytest
+
+from src.utils.json_parsing import extract_json, validate_fields, parse_llm_json
+
+SCHEMA = {
+    'topic': (str, "algebra"),
+    'confidence': (float, 0.5),
+    'steps': (int, 0),
+    'needs_clarification': (bool, False),
+    'variables': (list, [])
+}
+
+
+class TestExtractJson:
+    def test_plain_object(self):
+        assert extract_json('{"topic": "calculus"}') == {'topic': "calculus"}
+
+    def test_fenced_json_block(self):
+        response = 'Here you go:\n```json\n{"topic": "probability", "confidence": 0.9}\n```\nDone.'
+        assert extract_json(response) == {'topic': "probability", 'confidence': 0.9}
+
+    def test_fenced_block_without_language(self):
+        assert extract_json('```\n{"a": 1}\n```') == {'a': 1}
+
+    def test_prose_around_object(self):
+        response = 'Sure! The parsed problem is {"topic": "algebra", "variables": ["x"]} - let me know.'
+        assert extract_json(response) == {'topic': "algebra", 'variables': ["x"]}
+
+    def test_nested_braces_in_strings(self):
+        response = 'Result: {"problem_text": "Solve {x | x > 2}", "topic": "algebra"} end'
+        assert extract_json(response)['problem_text'] == "Solve {x | x > 2}"
+
+    def test_trailing_commas(self):
+        response = '{"topic": "calculus", "variables": ["x", "y",], "steps": 3,}'
+        assert extract_json(response) == {'topic': "calculus", 'variables': ["x", "y"], 'steps': 3}
+
+    def test_trailing_commas_with_prose(self):
+        response = 'Answer:\n{"topic": "algebra",\n "confidence": 0.8,\n}\nHope that helps.'
+        assert extract_json(response) == {'topic': "algebra", 'confidence': 0.8}
+
+    def test_multiple_objects_takes_first(self):
+        response = '{"topic": "algebra"}\n{"topic": "calculus"}'
+        assert extract_json(response) == {'topic': "algebra"}
+
+    def test_multiple_objects_in_prose_takes_first(self):
+        response = 'First attempt: {"steps": 1} and a correction: {"steps": 2}'
+        assert extract_json(response) == {'steps': 1}
+
+    @pytest.mark.parametrize("response", ['[1, 2, 3]', '[{"topic": "algebra"}]', '```json\n[{"a": 1}]\n```'])
+    def test_top_level_array_rejected(self, response):
+        with pytest.raises(ValueError, match="not an object"):
+            extract_json(response)
+
+    @pytest.mark.parametrize("response", ['42', '"algebra"', 'true', 'null'])
+    def test_top_level_scalar_rejected(self, response):
+        with pytest.raises(ValueError):
+            extract_json(response)
+
+    @pytest.mark.parametrize("response", ['', None, 'no json here', '{"topic": "algebra"'])
+    def test_nothing_decodable(self, response):
+        with pytest.raises(ValueError):
+            extract_json(response)
+
+
+class TestValidateFields:
+    def test_missing_fields_get_defaults(self):
+        assert validate_fields({'topic': "calculus"}, SCHEMA) == {
+            'topic': "calculus",
+            'confidence': 0.5,
+            'steps': 0,
+            'needs_clarification': False,
+            'variables': []
+        }
+
+    def test_unknown_fields_dropped(self):
+        assert 'extra' not in validate_fields({'extra': 1}, SCHEMA)
+
+    def test_mutable_defaults_are_copied(self):
+        first = validate_fields({}, SCHEMA)
+        first['variables'].append("x")
+        assert validate_fields({}, SCHEMA)['variables'] == []
+
+    def test_numeric_strings_coerced(self):
+        data = validate_fields({'confidence': "0.85", 'steps': "4"}, SCHEMA)
+        assert data['confidence'] == 0.85
+        assert data['steps'] == 4
+
+    def test_int_coerced_to_float(self):
+        data = validate_fields({'confidence': 1}, SCHEMA)
+        assert data['confidence'] == 1.0 and isinstance(data['confidence'], float)
+
+    @pytest.mark.parametrize("value, expected", [
+        ("true", True), ("Yes", True), ("1", True), ("false", False), ("no", False), (0, False), (1, True)
+    ])
+    def test_bool_coercion(self, value, expected):
+        assert validate_fields({'needs_clarification': value}, SCHEMA)['needs_clarification'] is expected
+
+    def test_bool_is_not_accepted_as_number(self):
+        assert validate_fields({'steps': True}, SCHEMA)['steps'] == 1
+        assert validate_fields({'confidence': False}, SCHEMA)['confidence'] == 0.0
+
+    def test_str_coercion(self):
+        assert validate_fields({'topic': 3}, SCHEMA)['topic'] == "3"
+        assert validate_fields({'topic': None}, SCHEMA)['topic'] == ""
+
+    def test_scalar_wrapped_in_list(self):
+        assert validate_fields({'variables': "x"}, SCHEMA)['variables'] == ["x"]
+        assert validate_fields({'variables': ""}, SCHEMA)['variables'] == []
+        assert validate_fields({'variables': None}, SCHEMA)['variables'] == []
+
+    def test_uncoercible_value_falls_back_to_default(self):
+        data = validate_fields({'confidence': "high", 'steps': [1, 2]}, SCHEMA)
+        assert data['confidence'] == 0.5
+        assert data['steps'] == 0
+
+
+class TestParseLlmJson:
+    def test_valid_response(self):
+        data, ok = parse_llm_json('```json\n{"topic": "probability", "confidence": "0.7"}\n```', SCHEMA)
+        assert ok
+        assert data['topic'] == "probability"
+        assert data['confidence'] == 0.7
+        assert data['variables'] == []
+
+    def test_invalid_response_returns_defaults(self):
+        data, ok = parse_llm_json("I could not parse this problem.", SCHEMA)
+        assert not ok
+        assert data == validate_fields({}, SCHEMA)
+
+    def test_top_level_array_is_not_ok(self):
+        data, ok = parse_llm_json('[{"topic": "calculus"}]', SCHEMA)
+        assert not ok
+        assert data['topic'] == "algebra"
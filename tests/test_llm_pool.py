@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_ollama")
+
+from benchmarks.fake_ollama import FakeOllama, FakeOllamaServer
+from src.llm.pool import PooledOllamaLLM, get_async_client
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOllamaServer(FakeOllama(first_token_ms=0, per_token_ms=0)) as server:
+        yield server
+
+
+def test_async_generation_uses_base_url(fake_server):
+    llm = PooledOllamaLLM(base_url=fake_server.url, model="qwen2.5:1.5b")
+    assert llm.base_url == fake_server.url
+
+    assert asyncio.run(llm.ainvoke("Say something")) == "OK"
+    assert fake_server.fake.stats['requests'] == 1
+
+
+def test_streamed_generation(fake_server):
+    llm = PooledOllamaLLM(base_url=fake_server.url, model="qwen2.5:1.5b")
+
+    async def collect():
+        return "".join([chunk async for chunk in llm.astream("Say something")])
+
+    assert asyncio.run(collect()) == "OK"
+
+
+def test_sync_generation_uses_base_url(fake_server):
+    llm = PooledOllamaLLM(base_url=fake_server.url, model="qwen2.5:1.5b")
+    assert llm.invoke("Say something") == "OK"
+
+
+def test_client_shared_within_event_loop(fake_server):
+    async def clients():
+        return get_async_client(fake_server.url), get_async_client(fake_server.url)
+
+    first, second = asyncio.run(clients())
+    assert first is second
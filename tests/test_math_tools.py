@@ -0,0 +1,96 @@
+import pytest
+
+from src.utils.math_tools import (
+    evaluate_arithmetic, has_bounded_powers, python_calculate, structure_signature, check_solution
+)
+
+
+class TestEvaluateArithmetic:
+    @pytest.mark.parametrize("expression, expected", [
+        ("123*456", 56088),
+        ("(1 + 2) / 4", 0.75),
+        ("-3**2", -9),
+        ("2**10", 1024),
+        ("2**-3", 0.125),
+        ("1.5 * 4 - 2", 4.0),
+        ("10**100", 10 ** 100)
+    ])
+    def test_values(self, expression, expected):
+        assert evaluate_arithmetic(expression) == expected
+
+    @pytest.mark.parametrize("expression", [
+        "9**(99*99*99*99)",
+        "2**(9*9*9*9*9*9)",
+        "2**3**2",
+        "2**101",
+        "99999**99",
+        "10**100 * 10**100",
+        "0.001**-100"
+    ])
+    def test_huge_results_rejected(self, expression):
+        with pytest.raises(ValueError):
+            evaluate_arithmetic(expression)
+
+    @pytest.mark.parametrize("expression", [
+        "__import__('os')",
+        "x + 1",
+        "abs(-2)",
+        "7 % 3",
+        "7 // 2",
+        "'a' * 3",
+        "(-8)**0.5",
+        "1 +"
+    ])
+    def test_unsupported_input_rejected(self, expression):
+        with pytest.raises(ValueError):
+            evaluate_arithmetic(expression)
+
+    def test_division_by_zero_raises(self):
+        with pytest.raises(ZeroDivisionError):
+            evaluate_arithmetic("1/0")
+
+    def test_tool_wrapper_returns_text(self):
+        assert python_calculate("6*7") == "42"
+        assert python_calculate("9**(99*99*99*99)") == "Calculation error"
+
+
+class TestHasBoundedPowers:
+    @pytest.mark.parametrize("expression", ["2x + 3 = 7", "x**2 - 4 = 0", "x^3 = 8", "3(x + 1) = x(2)"])
+    def test_small_literal_exponents(self, expression):
+        assert has_bounded_powers(expression, 6)
+
+    @pytest.mark.parametrize("expression", ["x = 9**(99*99*99*99)", "x**50 = 1", "x**x = 4", "2**x = 8"])
+    def test_large_or_symbolic_exponents(self, expression):
+        assert not has_bounded_powers(expression, 6)
+
+    @pytest.mark.parametrize("expression", ["(x**3)**3 = 1", "x**4 * x**4 = 2", "(x + 1)(x + 2)(x + 3)(x**2)**2 = 0"])
+    def test_expanded_degree(self, expression):
+        assert not has_bounded_powers(expression, 6)
+
+    @pytest.mark.parametrize("expression", [
+        "((x + 1)**100)**100",
+        "(a + b + c + d + e + f + g)**100 = 1",
+        "x = (99**100)**100",
+        "x = 123456789**100"
+    ])
+    def test_expensive_expansions(self, expression):
+        assert not has_bounded_powers(expression)
+
+    @pytest.mark.parametrize("expression", ["(x + 1)**100 = 1", "(a + b)**10 = c", "x = 10**100", "x/2 + 1/3 = 0.5"])
+    def test_cheap_expansions(self, expression):
+        assert has_bounded_powers(expression)
+
+
+class TestSympyGuards:
+    """Large powers must never reach SymPy's expand/simplify"""
+
+    def test_signature_falls_back_to_tokens(self):
+        pytest.importorskip("sympy")
+        assert structure_signature("Solve (x+1)^2000 = 1").startswith("tokens:")
+        assert structure_signature("Solve 2x + 3 = 7") == structure_signature("Solve 3 + 2*x = 7")
+
+    def test_check_solution_skips_large_powers(self):
+        pytest.importorskip("sympy")
+        assert check_solution("Solve (x+1)^2000 = 1", "x = 0") is None
+        assert check_solution("Solve 2x + 3 = 7", "x = 9**(99*99*99*99)") is None
+        assert check_solution("Solve 2x + 3 = 7", "x = 2") is True
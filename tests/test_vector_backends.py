@@ -0,0 +1,56 @@
+import importlib.util
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.rag.vector_backends import FaissBackend, NumpyBackend
+
+BACKENDS = [
+    NumpyBackend,
+    pytest.param(FaissBackend, marks=pytest.mark.skipif(
+        importlib.util.find_spec("faiss") is None, reason="faiss not installed"
+    ))
+]
+
+
+def vector(*values):
+    return [float(v) for v in values]
+
+
+@pytest.fixture(params=BACKENDS)
+def make_backend(request, tmp_path):
+    return lambda: request.param("history", directory=tmp_path)
+
+
+def test_appends_are_searchable_before_flush(make_backend):
+    backend = make_backend()
+    for i in range(100):
+        backend.add([f"p{i}"], [vector(i, 0)], [f"problem {i}"], [{'id': f"p{i}"}])
+        assert backend.query([vector(i, 0)], k=1)[0][0][0] == f"problem {i}"
+    assert backend.count() == 100
+    assert not backend.vectors_path.exists()
+
+
+def test_replacing_an_id_keeps_one_entry(make_backend):
+    backend = make_backend()
+    backend.add(["a", "b"], [vector(0, 0), vector(5, 5)], ["old a", "b"], [{}, {}])
+    backend.query([vector(0, 0)], k=1)
+    backend.add(["a"], [vector(9, 9)], ["new a"], [{}])
+
+    assert sorted(backend.ids()) == ["a", "b"]
+    assert backend.query([vector(9, 9)], k=1)[0][0][0] == "new a"
+
+
+def test_flush_persists_appended_rows(make_backend):
+    backend = make_backend()
+    backend.add(["a"], [vector(1, 0)], ["a"], [{'topic': "algebra"}])
+    backend.query([vector(1, 0)], k=1)
+    backend.add(["b"], [vector(0, 1)], ["b"], [{'topic': "calculus"}])
+    backend.flush()
+
+    reloaded = make_backend()
+    assert reloaded.ids() == ["a", "b"]
+    assert reloaded.query([vector(0, 1)], k=1, where={'topic': "calculus"})[0][0][0] == "b"
+    reloaded.add(["c"], [vector(1, 1)], ["c"], [{}])
+    assert reloaded.query([vector(1, 1)], k=1)[0][0][0] == "c"
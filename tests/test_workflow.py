@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from src.orchestration.workflow import MathMentorWorkflow
+
+
+class StubKnowledgeBase:
+    """KnowledgeBase stand-in: no embedding model, no documents"""
+
+    def search(self, query, k=5, topic=None):
+        return []
+
+    def search_many(self, queries, k=5, topic=None):
+        return [[] for _ in queries]
+
+
+class StubMemoryStore:
+    """MemoryStore stand-in that remembers nothing"""
+
+    def __init__(self):
+        self.stored = []
+
+    def store_solution(self, result):
+        self.stored.append(result)
+
+    def search_history(self, query, k=3):
+        return []
+
+    def search_history_many(self, queries, k=3):
+        return [[] for _ in queries]
+
+    def add_feedback_listener(self, listener):
+        pass
+
+
+def make_workflow(**kwargs):
+    return MathMentorWorkflow(knowledge_base=StubKnowledgeBase(), memory_store=StubMemoryStore(), **kwargs)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {'combined_parse_route': True},
+    {'speculative_solve': True},
+    {'defer_explanation': False}
+])
+def test_graph_builds(options):
+    workflow = make_workflow(**options)
+    assert workflow.graph is not None
+
+
+def test_fast_path_solves_without_llm():
+    pytest.importorskip("sympy")
+    workflow = make_workflow()
+    result = asyncio.run(workflow.solve("Solve 2x + 3 = 7", deadline=None))
+
+    assert result['status'] == 'completed'
+    assert result['fast_path_solved']
+    assert result['answer'] == "x = 2"
+    assert workflow.memory_store.stored
+
+
+def test_llm_path_runs_against_fake_ollama():
+    pytest.importorskip("sympy")
+    from benchmarks.fake_ollama import FakeOllama, FakeOllamaServer
+    from src.llm.pool import PooledOllamaLLM
+
+    with FakeOllamaServer(FakeOllama(first_token_ms=0, per_token_ms=0)) as server:
+        llm = PooledOllamaLLM(base_url=server.url, model="qwen2.5:1.5b", temperature=0.1)
+        workflow = make_workflow(llm=llm)
+        result = asyncio.run(workflow.solve("A train travels 120 km in 2 hours. What is its speed?", deadline=None))
+
+    assert result['status'] != 'error', result.get('error')
+    assert server.fake.stats['requests'] > 0
+
+
+def test_deadline_error_shows_fractional_seconds():
+    from benchmarks.fake_ollama import FakeOllama, FakeOllamaServer
+    from src.llm.pool import PooledOllamaLLM
+
+    with FakeOllamaServer(FakeOllama(first_token_ms=2000, per_token_ms=0)) as server:
+        llm = PooledOllamaLLM(base_url=server.url, model="qwen2.5:1.5b")
+        result = asyncio.run(make_workflow(llm=llm).solve("A train travels 120 km in 2 hours. What is its speed?",
+                                                          deadline=0.5))
+
+    assert result['status'] == 'timeout'
+    assert result['error'] == "No answer within 0.5s"